@@ -0,0 +1,263 @@
+"""
+Precompiled ABI registry shared by every agent.
+
+All compiled contract artifacts (`artifacts/contracts/**/*.json`, then the ABI copies next to
+the agents and in `abi/`) are parsed once into `CompiledABI` entries, with 4-byte function
+selectors, event topics and collapsed input / output types precomputed, and pickled to
+ABI_CACHE_PATH. Later processes load the pickle after a stat() of the artifact files; it is
+rebuilt automatically when any artifact changes.
+
+    from abi_registry import load_abi, get_registry
+    vault_abi = load_abi("Vault.json")
+    vault = get_registry().contract(w3, "AuroraMultiVault", MULTI_VAULT_ADDRESS)
+
+`compile_abi()` gives the same precomputed view of any ABI list (inline ABIs, contract.abi),
+memoised per list, for calldata encoding and log decoding.
+"""
+
+import glob
+import json
+import os
+import pickle
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from eth_utils import keccak
+from eth_utils.abi import collapse_if_tuple
+
+AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FORMAT = 1
+
+DEFAULT_SEARCH_PATHS = [
+    os.path.normpath(os.path.join(AGENT_DIR, "..", "artifacts", "contracts")),
+    AGENT_DIR,
+    os.path.join(AGENT_DIR, "abi"),
+    "abi"
+]
+
+
+@dataclass
+class FunctionInfo:
+    name: str
+    signature: str
+    selector: bytes
+    input_types: List[str]
+    output_types: List[str]
+
+    def encode_call(self, codec, args) -> bytes:
+        """Calldata: precomputed selector + ABI-encoded arguments."""
+        return self.selector + codec.encode(self.input_types, list(args))
+
+    def decode_output(self, codec, data: bytes):
+        decoded = codec.decode(self.output_types, data)
+        return decoded[0] if len(decoded) == 1 else decoded
+
+
+@dataclass
+class EventInfo:
+    name: str
+    signature: str
+    topic: bytes
+    abi: Dict[str, Any]
+
+
+@dataclass
+class CompiledABI:
+    name: str
+    abi: List[Dict[str, Any]]
+    functions: Dict[str, FunctionInfo] = field(default_factory=dict)  # signature -> info
+    functions_by_name: Dict[str, FunctionInfo] = field(default_factory=dict)  # first overload
+    events: Dict[bytes, EventInfo] = field(default_factory=dict)  # topic0 -> info
+    events_by_name: Dict[str, EventInfo] = field(default_factory=dict)
+    source: Optional[str] = None
+
+    def function(self, name: str) -> FunctionInfo:
+        return self.functions.get(name) or self.functions_by_name[name]
+
+    def event(self, name: str) -> EventInfo:
+        return self.events_by_name[name]
+
+
+def _signature(entry: Dict[str, Any]) -> str:
+    return f"{entry['name']}({','.join(collapse_if_tuple(i) for i in entry.get('inputs', []))})"
+
+
+def compile_entries(name: str, abi: List[Dict[str, Any]], source: Optional[str] = None) -> CompiledABI:
+    compiled = CompiledABI(name=name, abi=abi, source=source)
+    for entry in abi:
+        if entry.get("type") == "function":
+            signature = _signature(entry)
+            info = FunctionInfo(
+                name=entry["name"],
+                signature=signature,
+                selector=keccak(text=signature)[:4],
+                input_types=[collapse_if_tuple(i) for i in entry.get("inputs", [])],
+                output_types=[collapse_if_tuple(o) for o in entry.get("outputs", [])]
+            )
+            compiled.functions[signature] = info
+            compiled.functions_by_name.setdefault(info.name, info)
+        elif entry.get("type") == "event":
+            signature = _signature(entry)
+            info = EventInfo(name=entry["name"], signature=signature, topic=keccak(text=signature), abi=entry)
+            compiled.events[info.topic] = info
+            compiled.events_by_name.setdefault(info.name, info)
+    return compiled
+
+
+class ABIRegistry:
+    """Contract name -> CompiledABI for every artifact found, backed by a pickle cache."""
+
+    def __init__(self, search_paths: Optional[List[str]] = None, cache_path: Optional[str] = None):
+        env_paths = [p for p in os.getenv("ABI_SEARCH_PATHS", "").split(os.pathsep) if p]
+        self.search_paths = search_paths or env_paths or DEFAULT_SEARCH_PATHS
+        self.cache_path = cache_path or os.getenv("ABI_CACHE_PATH", os.path.join(AGENT_DIR, "data", "abi_registry.pickle"))
+
+        self._contracts: Dict[str, CompiledABI] = {}
+        self._aliases: Dict[str, str] = {}
+        self._instances: Dict[Tuple[int, str, str], Any] = {}
+        self._compiled_lists: Dict[int, Tuple[List[Dict[str, Any]], CompiledABI]] = {}
+        self._lock = threading.Lock()
+        self.loaded_from_cache = False
+        self._load()
+
+    # --------------------------------------------------------------------------
+    # Lookups
+    # --------------------------------------------------------------------------
+
+    def get(self, name: str) -> CompiledABI:
+        """Compiled ABI by contract name, artifact file name ("Vault.json") or source file stem."""
+        key = os.path.splitext(os.path.basename(name))[0]
+        key = key if key in self._contracts else self._aliases.get(key, key)
+        if key not in self._contracts:
+            raise FileNotFoundError(f"No ABI for {name} in {self.search_paths}")
+        return self._contracts[key]
+
+    def abi(self, name: str) -> List[Dict[str, Any]]:
+        return self.get(name).abi
+
+    def names(self) -> List[str]:
+        return sorted(self._contracts)
+
+    def event_by_topic(self, topic: bytes) -> Optional[EventInfo]:
+        for compiled in self._contracts.values():
+            if topic in compiled.events:
+                return compiled.events[topic]
+        return None
+
+    def contract(self, w3, name: str, address: str):
+        """Contract object for `name` at `address`, built once per Web3 instance."""
+        address = w3.to_checksum_address(address)
+        key = (id(w3), self.get(name).name, address)
+        with self._lock:
+            if key not in self._instances:
+                self._instances[key] = w3.eth.contract(address=address, abi=self.get(name).abi)
+            return self._instances[key]
+
+    def compile_abi(self, abi: List[Dict[str, Any]]) -> CompiledABI:
+        """Precomputed view of an arbitrary ABI list, memoised per list object."""
+        with self._lock:
+            cached = self._compiled_lists.get(id(abi))
+            if cached is not None and cached[0] is abi:
+                return cached[1]
+        for compiled in self._contracts.values():
+            if compiled.abi is abi:
+                return compiled
+        compiled = compile_entries("<inline>", abi)
+        with self._lock:
+            # Holding the list keeps its id from being reused while the entry exists
+            self._compiled_lists[id(abi)] = (abi, compiled)
+        return compiled
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "contracts": len(self._contracts),
+            "loaded_from_cache": self.loaded_from_cache,
+            "cache_path": self.cache_path,
+            "contract_instances": len(self._instances)
+        }
+
+    # --------------------------------------------------------------------------
+    # Build / cache
+    # --------------------------------------------------------------------------
+
+    def _artifact_files(self) -> List[str]:
+        files = []
+        for root in self.search_paths:
+            if os.path.isdir(root):
+                found = glob.glob(os.path.join(root, "**", "*.json"), recursive=True) if "artifacts" in root else \
+                    glob.glob(os.path.join(root, "*.json"))
+                files += sorted(f for f in found if not f.endswith(".dbg.json"))
+        return files
+
+    def _load(self):
+        files = self._artifact_files()
+        fingerprint = (CACHE_FORMAT, tuple((f, os.stat(f).st_mtime_ns, os.stat(f).st_size) for f in files))
+
+        try:
+            with open(self.cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get("fingerprint") == fingerprint:
+                self._contracts, self._aliases = cached["contracts"], cached["aliases"]
+                self.loaded_from_cache = True
+                return
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+            pass
+
+        self._build(files)
+        try:
+            if os.path.dirname(self.cache_path):
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"fingerprint": fingerprint, "contracts": self._contracts, "aliases": self._aliases}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"⚠️ Could not write ABI cache {self.cache_path}: {e}")
+
+    def _build(self, files: List[str]):
+        sources: Dict[str, List[str]] = {}
+        for path in files:
+            try:
+                with open(path, "r") as f:
+                    artifact = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(artifact, list):  # bare ABI file
+                artifact = {"contractName": os.path.splitext(os.path.basename(path))[0], "abi": artifact}
+            if not isinstance(artifact, dict) or not isinstance(artifact.get("abi"), list) or not artifact.get("contractName"):
+                continue
+            name = artifact["contractName"]
+            if name in self._contracts:  # earlier search paths win
+                continue
+            self._contracts[name] = compile_entries(name, artifact["abi"], source=path)
+            if artifact.get("sourceName"):
+                sources.setdefault(os.path.splitext(os.path.basename(artifact["sourceName"]))[0], []).append(name)
+
+        # "NearVrfStrategy" -> NearVrfYieldStrategy: source file stems that hold a single contract
+        self._aliases = {
+            stem: names[0] for stem, names in sources.items() if len(names) == 1 and stem not in self._contracts
+        }
+
+
+_registry: Optional[ABIRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ABIRegistry:
+    """Process-wide registry (built or loaded from the cache on first use)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ABIRegistry()
+        return _registry
+
+
+def load_abi(filename: str) -> List[Dict[str, Any]]:
+    """ABI list for an artifact file name, e.g. load_abi("Vault.json")."""
+    return get_registry().abi(filename)
+
+
+def compile_abi(abi: List[Dict[str, Any]]) -> CompiledABI:
+    return get_registry().compile_abi(abi)
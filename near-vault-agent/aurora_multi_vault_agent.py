@@ -7,12 +7,14 @@ from typing import Dict, Any, List
 from dotenv import load_dotenv
 from web3 import Web3
 from web3.exceptions import ContractLogicError
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI, BackgroundTasks, Response
 from pydantic import BaseModel
 from langchain_openai import ChatOpenAI
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain_core.prompts import PromptTemplate
 from langchain.tools import tool
+from metrics import PROMETHEUS_CONTENT_TYPE, PROVIDER_METRICS, instrument_tools, llm_callbacks, render as render_metrics
+from rpc_client import get_web3
 
 load_dotenv()
 
@@ -80,7 +82,7 @@ RISK_THRESHOLDS = {
 }
 
 # Web3 Setup
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+w3 = get_web3(RPC_URL)
 agent_account = w3.eth.account.from_key(AGENT_PRIVATE_KEY)
 print(f"🚀 Aurora Multi-Strategy Agent: {agent_account.address}")
 
@@ -144,7 +146,8 @@ class RefFinanceProvider:
     def get_pools_data(self) -> Dict[str, Any]:
         """Get current pool data from Ref Finance with ML risk assessment."""
         try:
-            response = requests.get(f"{self.api_url}/list-pools", timeout=5)
+            with PROVIDER_METRICS.time(provider="ref_finance"):
+                response = requests.get(f"{self.api_url}/list-pools", timeout=5)
             pools = response.json()
             
             # Find USDC pools
@@ -204,7 +207,8 @@ class TriSolarisProvider:
     def get_farms_data(self) -> Dict[str, Any]:
         """Get farming data from TriSolaris with ML risk assessment."""
         try:
-            response = requests.get("https://api.trisolaris.io/farms", timeout=5)
+            with PROVIDER_METRICS.time(provider="trisolaris"):
+                response = requests.get("https://api.trisolaris.io/farms", timeout=5)
             farms = response.json()
             
             usdc_farms = [f for f in farms if 'USDC' in f.get('name', '')]
@@ -325,7 +329,7 @@ class AuroraAIOptimizer:
     """AI-powered strategy optimization for Aurora protocols."""
     
     def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, api_key=OPENAI_API_KEY)
+        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, api_key=OPENAI_API_KEY, callbacks=llm_callbacks("allocation_advisor"))
     
     def optimize_allocation(self, current_data: Dict[str, Any]) -> Dict[str, float]:
         """Use AI to optimize portfolio allocation."""
@@ -955,7 +959,10 @@ Thought: {agent_scratchpad}
 """
 
 prompt = PromptTemplate.from_template(aurora_ai_prompt)
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, api_key=OPENAI_API_KEY)
+# Latency / error histograms for every tool, served on /metrics
+instrument_tools(tools)
+
+llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, api_key=OPENAI_API_KEY, callbacks=llm_callbacks("agent"))
 react_agent = create_react_agent(llm, tools, prompt)
 agent_executor = AgentExecutor(
     agent=react_agent, 
@@ -1084,6 +1091,11 @@ async def vault_status():
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint: tool, RPC, provider and LLM latency histograms and error counts."""
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.get("/health")
 async def health_check():
     """Enhanced health check."""
@@ -0,0 +1,108 @@
+"""
+Long-lived asyncio event loop on a background thread.
+
+Async clients (py_near's JsonProvider / Account) keep their HTTP sessions bound to the loop
+they were first used on. Creating a fresh loop per call with `asyncio.run` throws those
+connections away every time; instead one daemon thread runs a loop for the whole process,
+owns the clients, and synchronous code (LangChain tools, worker threads) submits coroutines
+to it with `run()`. Async code on another loop (FastAPI routes) awaits `run_async()`.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Any, Awaitable, Dict, Optional
+
+
+class BackgroundEventLoop:
+    """One event loop on a daemon thread, started on first use."""
+
+    def __init__(self, name: str = "background-loop", default_timeout: Optional[float] = None):
+        self.name = name
+        self.default_timeout = default_timeout if default_timeout is not None else float(os.getenv("BACKGROUND_LOOP_TIMEOUT", 120))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.failed = 0
+        self.timed_out = 0
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._run_forever, args=(loop, ready), name=self.name, daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        """Schedule `coro` on the loop; returns a thread-safe future."""
+        loop = self.start()
+        self.submitted += 1
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run `coro` on the loop and block until it finishes (from any thread except the loop's own)."""
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError(f"{self.name}.run() called from its own loop thread; await the coroutine instead")
+
+        timeout = timeout if timeout is not None else self.default_timeout
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            self.timed_out += 1
+            raise TimeoutError(f"{self.name}: call did not finish within {timeout:g}s")
+        except Exception:
+            self.failed += 1
+            raise
+
+    async def run_async(self, coro: Awaitable[Any]) -> Any:
+        """Await `coro` on the background loop from a different running loop."""
+        if self.in_loop_thread():
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def stop(self, timeout: float = 5.0):
+        """Cancel pending tasks, stop the loop and join its thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        loop = self._loop
+        return {
+            "running": loop is not None and loop.is_running(),
+            "submitted": self.submitted,
+            "failed": self.failed,
+            "timed_out": self.timed_out
+        }
+
+    @staticmethod
+    def _run_forever(loop: asyncio.AbstractEventLoop, ready: threading.Event):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+        finally:
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the ML vault agent's hot paths.
+
+Deploys the compiled `artifacts/` contracts (MockUSDC, AuroraMultiVault and the Ref /
+TriSolaris / Bastion strategies) to an in-process py-evm chain and serves the Ref Finance
+indexer, the Trisolaris subgraph and the OpenAI API from a local stub server. It then
+imports aurora_multi_vault_agent_with_ml against that chain and measures the latency
+(p50 / p99), throughput, RPC calls and upstream HTTP calls of every operation.
+
+    pip install "eth-tester[py-evm]"
+    cd near-vault-agent && python benchmark_agent.py --iterations 50 --json bench.json
+
+Every RPC goes through the same block-scoped read cache as the production provider
+(RPC_READ_CACHE_ENABLED=false measures without it). Run it before and after a change and
+compare the JSON reports.
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+from web3 import Web3
+
+from read_cache import BlockReadCache, block_pinned
+from rpc_client import register_web3
+from vault_snapshot import MULTICALL3_ADDRESS
+
+try:
+    from eth_account import Account
+    from eth_tester import EthereumTester, PyEVMBackend
+    from web3.providers.eth_tester import EthereumTesterProvider
+    ETH_TESTER_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ eth-tester not available ({e}); install with: pip install \"eth-tester[py-evm]\"")
+    ETH_TESTER_AVAILABLE = False
+
+ARTIFACTS_DIR = os.getenv(
+    "BENCHMARK_ARTIFACTS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "artifacts", "contracts")
+)
+BENCHMARK_RPC_URL = "http://eth-tester.benchmark"
+
+STRATEGIES = [
+    # (artifact, vault strategy name -> registry key, allocation bps)
+    ("RefFinanceStrategy", "Ref Finance", 4000),
+    ("TriSolarisStrategy", "TriSolaris", 3000),
+    ("BastionStrategy", "Bastion", 2000)
+]
+INITIAL_DEPOSIT_USDC = 100_000
+REBALANCE_TOP_UP_USDC = 1_000
+
+# Canonical Multicall3 runtime code (github.com/mds1/multicall3), installed at MULTICALL3_ADDRESS in genesis
+MULTICALL3_RUNTIME_CODE = (
+    "0x6080604052600436106100f35760003560e01c80634d2301cc1161008a578063a8b0574e11610059578063a8b0574e"
+    "1461025a578063bce38bd714610275578063c3077fa914610288578063ee82ac5e1461029b57600080fd5b80634d2301"
+    "cc146101ec57806372425d9d1461022157806382ad56cb1461023457806386d516e81461024757600080fd5b80633408"
+    "e470116100c65780633408e47014610191578063399542e9146101a45780633e64a696146101c657806342cbb15c1461"
+    "01d957600080fd5b80630f28c97d146100f8578063174dea711461011a578063252dba421461013a57806327e86d6e14"
+    "61015b575b600080fd5b34801561010457600080fd5b50425b6040519081526020015b60405180910390f35b61012d61"
+    "0128366004610a85565b6102ba565b6040516101119190610bbe565b61014d610148366004610a85565b6104ef565b60"
+    "4051610111929190610bd8565b34801561016757600080fd5b50437fffffffffffffffffffffffffffffffffffffffff"
+    "ffffffffffffffffffffffff0140610107565b34801561019d57600080fd5b5046610107565b6101b76101b236600461"
+    "0c60565b610690565b60405161011193929190610cba565b3480156101d257600080fd5b5048610107565b3480156101"
+    "e557600080fd5b5043610107565b3480156101f857600080fd5b50610107610207366004610ce2565b73ffffffffffff"
+    "ffffffffffffffffffffffffffff163190565b34801561022d57600080fd5b5044610107565b61012d61024236600461"
+    "0a85565b6106ab565b34801561025357600080fd5b5045610107565b34801561026657600080fd5b5060405141815260"
+    "2001610111565b61012d610283366004610c60565b61085a565b6101b7610296366004610a85565b610a1a565b348015"
+    "6102a757600080fd5b506101076102b6366004610d18565b4090565b60606000828067ffffffffffffffff8111156102"
+    "d8576102d8610d31565b60405190808252806020026020018201604052801561031e57816020015b6040805180820190"
+    "915260008152606060208201528152602001906001900390816102f65790505b5092503660005b828110156104775760"
+    "0085828151811061034157610341610d60565b6020026020010151905087878381811061035d5761035d610d60565b90"
+    "5060200281019061036f9190610d8f565b6040810135958601959093506103886020850185610ce2565b73ffffffffff"
+    "ffffffffffffffffffffffffffffff16816103ac6060870187610dcd565b6040516103ba929190610e32565b60006040"
+    "518083038185875af1925050503d80600081146103f7576040519150601f19603f3d011682016040523d82523d600060"
+    "2084013e6103fc565b606091505b50602080850191909152901515808452908501351761046d577f08c379a000000000"
+    "000000000000000000000000000000000000000000000000600052602060045260176024527f4d756c746963616c6c33"
+    "3a2063616c6c206661696c656400000000000000000060445260846000fd5b5050600101610325565b508234146104e6"
+    "576040517f08c379a000000000000000000000000000000000000000000000000000000000815260206004820152601a"
+    "60248201527f4d756c746963616c6c333a2076616c7565206d69736d6174636800000000000060448201526064015b60"
+    "405180910390fd5b50505092915050565b436060828067ffffffffffffffff81111561050c5761050c610d31565b6040"
+    "5190808252806020026020018201604052801561053f57816020015b606081526020019060019003908161052a579050"
+    "5b5091503660005b8281101561068657600087878381811061056257610562610d60565b905060200281019061057491"
+    "90610e42565b92506105836020840184610ce2565b73ffffffffffffffffffffffffffffffffffffffff166105a66020"
+    "850185610dcd565b6040516105b4929190610e32565b6000604051808303816000865af19150503d80600081146105f1"
+    "576040519150601f19603f3d011682016040523d82523d6000602084013e6105f6565b606091505b5086848151811061"
+    "060957610609610d60565b602090810291909101015290508061067d576040517f08c379a00000000000000000000000"
+    "0000000000000000000000000000000000815260206004820152601760248201527f4d756c746963616c6c333a206361"
+    "6c6c206661696c656400000000000000000060448201526064016104dd565b50600101610546565b5050509250929050"
+    "565b43804060606106a086868661085a565b905093509350939050565b6060818067ffffffffffffffff8111156106c7"
+    "576106c7610d31565b60405190808252806020026020018201604052801561070d57816020015b604080518082019091"
+    "5260008152606060208201528152602001906001900390816106e55790505b5091503660005b828110156104e6576000"
+    "84828151811061073057610730610d60565b6020026020010151905086868381811061074c5761074c610d60565b9050"
+    "60200281019061075e9190610e76565b925061076d6020840184610ce2565b73ffffffffffffffffffffffffffffffff"
+    "ffffffff166107906040850185610dcd565b60405161079e929190610e32565b6000604051808303816000865af19150"
+    "503d80600081146107db576040519150601f19603f3d011682016040523d82523d6000602084013e6107e0565b606091"
+    "505b506020808401919091529015158083529084013517610851577f08c379a000000000000000000000000000000000"
+    "000000000000000000000000600052602060045260176024527f4d756c746963616c6c333a2063616c6c206661696c65"
+    "6400000000000000000060445260646000fd5b50600101610714565b6060818067ffffffffffffffff81111561087657"
+    "610876610d31565b6040519080825280602002602001820160405280156108bc57816020015b60408051808201909152"
+    "60008152606060208201528152602001906001900390816108945790505b5091503660005b82811015610a1057600084"
+    "82815181106108df576108df610d60565b602002602001015190508686838181106108fb576108fb610d60565b905060"
+    "200281019061090d9190610e42565b925061091c6020840184610ce2565b73ffffffffffffffffffffffffffffffffff"
+    "ffffff1661093f6020850185610dcd565b60405161094d929190610e32565b6000604051808303816000865af1915050"
+    "3d806000811461098a576040519150601f19603f3d011682016040523d82523d6000602084013e61098f565b60609150"
+    "5b506020830152151581528715610a07578051610a07576040517f08c379a00000000000000000000000000000000000"
+    "0000000000000000000000815260206004820152601760248201527f4d756c746963616c6c333a2063616c6c20666169"
+    "6c656400000000000000000060448201526064016104dd565b506001016108c3565b5050509392505050565b60008060"
+    "60610a2b60018686610690565b919790965090945092505050565b60008083601f840112610a4b57600080fd5b508135"
+    "67ffffffffffffffff811115610a6357600080fd5b6020830191508360208260051b8501011115610a7e57600080fd5b"
+    "9250929050565b60008060208385031215610a9857600080fd5b823567ffffffffffffffff811115610aaf57600080fd"
+    "5b610abb85828601610a39565b90969095509350505050565b6000815180845260005b81811015610aed576020818501"
+    "81015186830182015201610ad1565b81811115610aff576000602083870101525b50601f017fffffffffffffffffffff"
+    "ffffffffffffffffffffffffffffffffffffffffffe0169290920160200192915050565b600082825180855260208086"
+    "019550808260051b84010181860160005b84811015610bb1578583037fffffffffffffffffffffffffffffffffffffff"
+    "ffffffffffffffffffffffffe001895281518051151584528401516040858501819052610b9d81860183610ac7565b9a"
+    "86019a9450505090830190600101610b4f565b5090979650505050505050565b602081526000610bd16020830184610b"
+    "32565b9392505050565b600060408201848352602060408185015281855180845260608601915060608160051b870101"
+    "935082870160005b82811015610c52577fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff"
+    "a0888703018452610c40868351610ac7565b95509284019290840190600101610c06565b509398975050505050505050"
+    "565b600080600060408486031215610c7557600080fd5b83358015158114610c8557600080fd5b9250602084013567ff"
+    "ffffffffffffff811115610ca157600080fd5b610cad86828701610a39565b9497909650939450505050565b83815282"
+    "6020820152606060408201526000610cd96060830184610b32565b95945050505050565b600060208284031215610cf4"
+    "57600080fd5b813573ffffffffffffffffffffffffffffffffffffffff81168114610bd157600080fd5b600060208284"
+    "031215610d2a57600080fd5b5035919050565b7f4e487b71000000000000000000000000000000000000000000000000"
+    "00000000600052604160045260246000fd5b7f4e487b7100000000000000000000000000000000000000000000000000"
+    "000000600052603260045260246000fd5b600082357fffffffffffffffffffffffffffffffffffffffffffffffffffff"
+    "ffffffffff81833603018112610dc357600080fd5b9190910192915050565b60008083357fffffffffffffffffffffff"
+    "ffffffffffffffffffffffffffffffffffffffffe1843603018112610e0257600080fd5b83018035915067ffffffffff"
+    "ffffff821115610e1d57600080fd5b602001915036819003821315610a7e57600080fd5b818382376000910190815291"
+    "9050565b600082357fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffc183360301811261"
+    "0dc357600080fd5b600082357fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffa1833603"
+    "018112610dc357600080fdfea2646970667358221220bb2b5c71a328032f97c676ae39a1ec2148d3e5d6f73d95e9b179"
+    "10152d61f16264736f6c634300080c0033"
+)
+
+# ==============================================================================
+# LOCAL UPSTREAM STUBS (Ref Finance indexer, Trisolaris subgraph, OpenAI)
+# ==============================================================================
+
+REF_POOLS = [
+    {"id": str(i), "token_symbols": ["USDC", symbol], "tvl": str(1_000_000 + i * 250_000), "total_fee": "0.003"}
+    for i, symbol in enumerate(["wNEAR", "ETH", "AURORA", "USDT", "WBTC"])
+]
+
+TRISOLARIS_FARMS = {
+    "data": {
+        "liquidityPools": [
+            {"id": f"0x{i:040x}", "name": f"USDC-{symbol}", "totalValueLockedUSD": str(2_000_000 + i * 500_000),
+             "rewardTokenEmissionsUSD": [str(600 + i * 50)]}
+            for i, symbol in enumerate(["wNEAR", "ETH", "TRI", "USDT"])
+        ]
+    }
+}
+
+ADVISOR_ALLOCATION = {"ref_finance": 0.40, "trisolaris": 0.30, "bastion": 0.20, "reserve": 0.10}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/ref/list-top-pools"):
+            return self._reply("ref", REF_POOLS)
+        self._reply("unknown", {"error": "not found"}, status=404)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.startswith("/graph"):
+            return self._reply("graph", TRISOLARIS_FARMS)
+        if self.path.startswith("/openai/v1/chat/completions"):
+            return self._reply("openai", {
+                "id": "chatcmpl-benchmark",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "gpt-4o-mini",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": json.dumps(ADVISOR_ALLOCATION)},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+            })
+        self._reply("unknown", {"error": "not found"}, status=404)
+
+    def _reply(self, upstream: str, payload: Any, status: int = 200):
+        self.server.record(upstream)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubAPIServer(ThreadingHTTPServer):
+    """Local stand-in for every external HTTP API the agent calls, with request counters."""
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def record(self, upstream: str):
+        with self._lock:
+            self.calls[upstream] += 1
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="benchmark-stubs", daemon=True).start()
+        return self
+
+# ==============================================================================
+# IN-PROCESS CHAIN
+# ==============================================================================
+
+if ETH_TESTER_AVAILABLE:
+    class BenchmarkChainProvider(EthereumTesterProvider):
+        """eth-tester provider with RPC counters and the production read cache in front of it."""
+
+        def __init__(self, ethereum_tester):
+            super().__init__(ethereum_tester)
+            self.rpc_calls = Counter()
+            self._chain_lock = threading.RLock()  # py-evm is not thread safe
+            self._ids = itertools.count()
+            read_cache = os.getenv("RPC_READ_CACHE_ENABLED", "true").lower() == "true"
+            self.read_cache = BlockReadCache(self._head) if read_cache else None
+
+        def make_request(self, method, params):
+            send = lambda sent_params: self._send(method, sent_params)
+            if self.read_cache is None:
+                return send(params)
+            return self.read_cache.route(method, params, send, request_id=next(self._ids))
+
+        def _send(self, method, params):
+            with self._chain_lock:
+                self.rpc_calls[method] += 1
+                return super().make_request(method, params)
+
+        def _head(self) -> int:
+            with self._chain_lock:
+                self.rpc_calls["eth_blockNumber"] += 1
+                return self.ethereum_tester.get_block_by_number("latest")["number"]
+
+        def stats(self) -> List[Dict[str, Any]]:
+            return [{"url": BENCHMARK_RPC_URL, "requests": sum(self.rpc_calls.values())}]
+
+        def read_cache_stats(self) -> Optional[Dict[str, Any]]:
+            return self.read_cache.stats() if self.read_cache else None
+
+
+def chain_with_multicall3():
+    """eth-tester chain whose genesis has Multicall3 at MULTICALL3_ADDRESS, so snapshots take the batched path."""
+    genesis_state = dict(PyEVMBackend.generate_genesis_state())
+    genesis_state[Web3.to_bytes(hexstr=MULTICALL3_ADDRESS)] = {
+        "balance": 0,
+        "nonce": 1,
+        "code": Web3.to_bytes(hexstr=MULTICALL3_RUNTIME_CODE),
+        "storage": {}
+    }
+    return EthereumTester(PyEVMBackend(genesis_state=genesis_state))
+
+
+def load_artifact(name: str) -> Dict[str, Any]:
+    for root, _, files in os.walk(ARTIFACTS_DIR):
+        if f"{name}.json" in files:
+            with open(os.path.join(root, f"{name}.json")) as f:
+                artifact = json.load(f)
+            if artifact.get("bytecode", "0x") != "0x":
+                return artifact
+    raise FileNotFoundError(f"No compiled artifact for {name} under {ARTIFACTS_DIR}")
+
+
+class LocalDeployment:
+    """Vault, USDC and strategies deployed from the chain's first account, vault owned by the agent."""
+
+    def __init__(self, w3: Web3, tester, agent_address: str):
+        self.w3 = w3
+        self.tester = tester
+        self.deployer = w3.eth.accounts[0]
+        self.agent_address = agent_address
+
+        self.usdc = self._deploy("MockUSDC")
+        self.vault = self._deploy("AuroraMultiVault", self.usdc.address, "Aurora Multi Vault", "amvUSDC")
+        self.strategies = {}
+        for artifact, name, allocation in STRATEGIES:
+            strategy = self._deploy(artifact, self.usdc.address, self.vault.address)
+            self._transact(self.vault.functions.addStrategy(strategy.address, name, allocation))
+            self.strategies[name] = strategy
+
+        self.deposit(INITIAL_DEPOSIT_USDC)
+        self._transact(self.vault.functions.transferOwnership(agent_address))
+        w3.eth.send_transaction({"from": self.deployer, "to": agent_address, "value": Web3.to_wei(100, "ether")})
+
+    def deposit(self, amount_usdc: float):
+        amount = int(amount_usdc * 10**6)
+        self._transact(self.usdc.functions.approve(self.vault.address, amount))
+        self._transact(self.vault.functions.deposit(amount, self.deployer))
+
+    def advance_time(self, seconds: int):
+        """Move past the vault's REBALANCE_INTERVAL."""
+        latest = self.w3.eth.get_block("latest")["timestamp"]
+        self.tester.time_travel(latest + seconds)
+
+    def env(self) -> Dict[str, str]:
+        keys = {"Ref Finance": "REF_FINANCE", "TriSolaris": "TRISOLARIS", "Bastion": "BASTION"}
+        return {
+            "MULTI_VAULT_ADDRESS": self.vault.address,
+            "USDC_TOKEN_ADDRESS": self.usdc.address,
+            **{f"{keys[name]}_STRATEGY_ADDRESS": strategy.address for name, strategy in self.strategies.items()}
+        }
+
+    def _deploy(self, name: str, *args):
+        artifact = load_artifact(name)
+        factory = self.w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"])
+        receipt = self.w3.eth.wait_for_transaction_receipt(factory.constructor(*args).transact({"from": self.deployer}))
+        return self.w3.eth.contract(address=receipt.contractAddress, abi=artifact["abi"])
+
+    def _transact(self, call):
+        receipt = self.w3.eth.wait_for_transaction_receipt(call.transact({"from": self.deployer}))
+        if receipt.status != 1:
+            raise RuntimeError(f"Benchmark setup transaction reverted: {receipt.transactionHash.hex()}")
+        return receipt
+
+# ==============================================================================
+# MEASUREMENT
+# ==============================================================================
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def measure(name: str, fn: Callable[[], Any], iterations: int, provider, stubs: StubAPIServer,
+            concurrency: int = 1, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Run `fn` `iterations` times; `setup` runs untimed (and uncounted) before each sequential call."""
+    latencies: List[float] = []
+    rpc_before, http_before = Counter(provider.rpc_calls), Counter(stubs.calls)
+    setup_rpc, setup_http = Counter(), Counter()
+
+    def timed_call():
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+
+    wall_started = time.perf_counter()
+    if concurrency > 1 and setup is None:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(lambda _: timed_call(), range(iterations)))
+        wall = time.perf_counter() - wall_started
+    else:
+        wall = 0.0
+        for _ in range(iterations):
+            if setup:
+                rpc_mark, http_mark = Counter(provider.rpc_calls), Counter(stubs.calls)
+                setup()
+                setup_rpc += Counter(provider.rpc_calls) - rpc_mark
+                setup_http += Counter(stubs.calls) - http_mark
+            started = time.perf_counter()
+            timed_call()
+            wall += time.perf_counter() - started
+
+    rpc = Counter(provider.rpc_calls) - rpc_before - setup_rpc
+    http = Counter(stubs.calls) - http_before - setup_http
+    latencies.sort()
+    return {
+        "operation": name,
+        "iterations": iterations,
+        "concurrency": concurrency if setup is None else 1,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "throughput_ops": round(iterations / wall, 2) if wall else None,
+        "rpc_per_op": round(sum(rpc.values()) / iterations, 2),
+        "rpc_methods": {method: round(count / iterations, 2) for method, count in rpc.most_common()},
+        "http_per_op": round(sum(http.values()) / iterations, 2),
+        "http_upstreams": {upstream: round(count / iterations, 2) for upstream, count in http.most_common()}
+    }
+
+
+def print_report(results: List[Dict[str, Any]]):
+    print("\n📊 Agent hot-path benchmark")
+    print("=" * 96)
+    print(f"{'operation':<18}{'n':>5}{'p50 ms':>11}{'p99 ms':>11}{'mean ms':>11}{'ops/s':>10}{'rpc/op':>9}{'http/op':>9}  top RPC methods")
+    print("-" * 96)
+    for r in results:
+        top = ", ".join(f"{m} {c:g}" for m, c in list(r["rpc_methods"].items())[:3])
+        throughput = f"{r['throughput_ops']:.1f}" if r["throughput_ops"] else "-"
+        print(f"{r['operation']:<18}{r['iterations']:>5}{r['p50_ms']:>11.2f}{r['p99_ms']:>11.2f}{r['mean_ms']:>11.2f}"
+              f"{throughput:>10}{r['rpc_per_op']:>9.2f}{r['http_per_op']:>9.2f}  {top}")
+    print("=" * 96)
+    for r in results:
+        if "batched" in r:
+            print(f"{'🧮' if r['batched'] else '⚠️'} {r['operation']}: {'Multicall3 batched' if r['batched'] else 'sequential fallback'} reads")
+
+# ==============================================================================
+# MAIN
+# ==============================================================================
+
+def configure_environment(stubs: StubAPIServer, data_dir: str, chain_id: int, agent_key: str):
+    """Point the agent at the local chain, the stubs and a throwaway data directory."""
+    env = {
+        "NEAR_TESTNET_RPC_URL": BENCHMARK_RPC_URL,
+        "AURORA_RPC_URLS": "",
+        "NEAR_TESTNET_CHAIN_ID": str(chain_id),
+        "AGENT_PRIVATE_KEY": agent_key,
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY") or "sk-benchmark",
+        "OPENAI_BASE_URL": f"{stubs.base_url}/openai/v1",
+        "OPENAI_API_BASE": f"{stubs.base_url}/openai/v1",
+        "REF_FINANCE_API_URL": f"{stubs.base_url}/ref",
+        "TRISOLARIS_SUBGRAPH_URL": f"{stubs.base_url}/graph",
+        "ALLOCATION_LLM_ADVISOR": "true",
+        "EVENT_INDEXER_CONFIRMATIONS": "0",
+        "VAULT_EVENTS_DB": os.path.join(data_dir, "vault_events.sqlite"),
+        "EVENT_INDEXER_DB": os.path.join(data_dir, "events.sqlite"),
+        "LLM_CACHE_PATH": os.path.join(data_dir, "llm_cache.sqlite"),
+        "ETHERSCAN_CACHE_PATH": os.path.join(data_dir, "etherscan_cache.sqlite")
+    }
+    os.environ.update(env)
+
+
+def run_benchmarks(args) -> List[Dict[str, Any]]:
+    stubs = StubAPIServer(latency=args.stub_latency_ms / 1000).start()
+    print(f"🧪 Upstream stubs on {stubs.base_url} ({args.stub_latency_ms} ms simulated latency)")
+
+    tester = chain_with_multicall3()
+    provider = BenchmarkChainProvider(tester)
+    w3 = Web3(provider)
+    agent = Account.create()
+
+    print("📦 Deploying artifacts to the in-process chain...")
+    deployment = LocalDeployment(w3, tester, agent.address)
+    print(f"   Vault: {deployment.vault.address} | USDC: {deployment.usdc.address}")
+
+    data_dir = tempfile.mkdtemp(prefix="agent-bench-")
+    configure_environment(stubs, data_dir, w3.eth.chain_id, Web3.to_hex(agent.key))
+    os.environ.update(deployment.env())
+    register_web3(w3, BENCHMARK_RPC_URL)
+
+    print("🤖 Importing the ML vault agent...")
+    agent_module = importlib.import_module("aurora_multi_vault_agent_with_ml")
+    n = args.iterations
+
+    def run(name, fn, iterations=n, concurrency=args.concurrency, setup=None):
+        print(f"⏱️  {name}...")
+        # The agent logs every step; keep it out of the terminal (and the timings' noise) unless asked
+        with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO()):
+            result = measure(name, fn, iterations, provider, stubs, concurrency=concurrency, setup=setup)
+        results.append(result)
+        return result
+
+    def rebalance_setup():
+        deployment.advance_time(3601)
+        deployment.deposit(REBALANCE_TOP_UP_USDC)
+
+    def fresh_addresses():
+        return [Web3.to_checksum_address("0x" + os.urandom(20).hex()) for _ in range(len(STRATEGIES))]
+
+    results: List[Dict[str, Any]] = []
+    operations = set(args.operations)
+
+    if "status" in operations:
+        run("status", lambda: block_pinned(agent_module.get_multi_vault_status.invoke)({}))
+    if "snapshot" in operations:
+        last = {}
+        def read_snapshot():
+            last["snapshot"] = block_pinned(agent_module.snapshot_reader.read)()
+        # False means every read took the sequential fallback, not the Multicall3 path
+        run("snapshot", read_snapshot)["batched"] = last["snapshot"].batched
+    if "providers" in operations:
+        run("providers_cached", agent_module.protocol_aggregator.fetch_all)
+        run("provider_fetch", lambda: (agent_module.ref_provider._fetch_pools_data(),
+                                        agent_module.tri_provider._fetch_farms_data()))
+    if "risk" in operations:
+        if agent_module.risk_api is not None:
+            addresses = agent_module.strategy_registry.addresses()
+            run("risk_scores", lambda: agent_module.risk_api.assess_many(addresses))
+            run("risk_scores_cold", lambda: agent_module.risk_api.assess_many(fresh_addresses()))
+        run("risk_monitor", lambda: block_pinned(agent_module.aurora_risk_monitor.invoke)({}))
+    if "yields" in operations:
+        run("yields", lambda: block_pinned(agent_module.analyze_aurora_yields.invoke)({}))
+    if "trigger" in operations:
+        run("trigger_poll", block_pinned(agent_module.evaluate_rebalance_trigger), concurrency=1)
+    if "rebalance" in operations:
+        run("rebalance", lambda: agent_module.execute_multi_strategy_rebalance.invoke({}),
+            iterations=args.write_iterations, setup=rebalance_setup)
+    if "harvest" in operations:
+        run("harvest", lambda: agent_module.harvest_all_aurora_yields.invoke({}),
+            iterations=args.write_iterations, concurrency=1)
+
+    if provider.read_cache is not None:
+        print(f"🗃️ Read cache: {provider.read_cache.stats()}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vault agent's hot paths on a local in-process chain")
+    parser.add_argument("--iterations", type=int, default=int(os.getenv("BENCHMARK_ITERATIONS", 30)))
+    parser.add_argument("--write-iterations", type=int, default=int(os.getenv("BENCHMARK_WRITE_ITERATIONS", 5)),
+                        help="iterations for rebalance / harvest (each one mines transactions)")
+    parser.add_argument("--concurrency", type=int, default=1, help="parallel callers for read-only operations")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="simulated latency of the upstream HTTP APIs")
+    parser.add_argument("--operations", nargs="+",
+                        default=["status", "snapshot", "providers", "risk", "yields", "trigger", "rebalance", "harvest"])
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the agent's own output while measuring")
+    args = parser.parse_args()
+
+    if not ETH_TESTER_AVAILABLE:
+        sys.exit(1)
+
+    results = run_benchmarks(args)
+    print_report(results)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"timestamp": int(time.time()), "args": vars(args), "results": results}, f, indent=2)
+        print(f"💾 Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
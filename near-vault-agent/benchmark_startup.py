@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: how long it takes to import each agent module, and (with --warm) to build
+its lazy resources the way the server's lifespan hook does.
+
+Every measurement runs in a fresh interpreter, so nothing is shared with earlier runs apart
+from the .pyc cache.
+
+    cd near-vault-agent && python benchmark_startup.py --runs 5 --warm --json startup.json
+
+--importtime adds the slowest imports (python -X importtime) per module. Warm runs use a
+throwaway data directory, and a throwaway key, OpenAI key and chain id when none is
+configured; building the resources makes no network calls.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODULES = ["config", "tools", "vault_actions", "aurora_multi_vault_agent_with_ml"]
+RESULT_PREFIX = "STARTUP_RESULT "
+
+# Runs in the child interpreter: import the module, optionally build every LazyResource it exposes
+CHILD_SCRIPT = """
+import importlib, json, sys, time
+started = time.perf_counter()
+try:
+    module = importlib.import_module(sys.argv[1])
+    error = None
+except Exception as e:
+    module, error = None, f"{type(e).__name__}: {e}"
+result = {"import_s": time.perf_counter() - started, "error": error, "resources": {}}
+
+if module is not None and sys.argv[2] == "warm":
+    from lazy import LazyResource
+    resources = {name: value for name, value in vars(module).items() if isinstance(value, LazyResource)}
+    started = time.perf_counter()
+    for name, resource in resources.items():
+        try:
+            resource.get()
+            result["resources"][name] = {"build_s": resource.build_seconds, "error": None}
+        except Exception as e:
+            result["resources"][name] = {"build_s": None, "error": f"{type(e).__name__}: {e}"}
+    result["warm_s"] = time.perf_counter() - started
+
+print(%r + json.dumps(result))
+""" % RESULT_PREFIX
+
+
+def child_environment(data_dir: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("AGENT_PRIVATE_KEY", "0x" + "11" * 32)
+    env.setdefault("OPENAI_API_KEY", "sk-startup-benchmark")
+    env.setdefault("NEAR_TESTNET_RPC_URL", "http://localhost:8545")
+    env.setdefault("NEAR_TESTNET_CHAIN_ID", "1313161555")
+    env.update({
+        "VAULT_EVENTS_DB": os.path.join(data_dir, "vault_events.sqlite"),
+        "VRF_EVENTS_DB": os.path.join(data_dir, "vrf_events.sqlite"),
+        "LLM_CACHE_PATH": os.path.join(data_dir, "llm_cache.sqlite"),
+        "PYTHONPATH": os.pathsep.join(filter(None, [AGENT_DIR, env.get("PYTHONPATH")]))
+    })
+    return env
+
+
+def run_child(module: str, warm: bool, env: Dict[str, str], importtime: bool = False) -> Dict[str, Any]:
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", CHILD_SCRIPT, module, "warm" if warm else "import"]
+    started = time.perf_counter()
+    completed = subprocess.run(command, cwd=AGENT_DIR, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+
+    lines = [line for line in completed.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+    if not lines:
+        return {"error": (completed.stderr.strip().splitlines() or ["no output"])[-1], "process_s": wall}
+    result = json.loads(lines[-1][len(RESULT_PREFIX):])
+    result["process_s"] = wall
+    if importtime:
+        result["slowest_imports"] = slowest_imports(completed.stderr)
+    return result
+
+
+def slowest_imports(stderr: str, top: int = 8) -> List[Dict[str, Any]]:
+    """Top-level imports by cumulative time from `-X importtime` output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented under their parent; keep the top level only
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            imports.append({"module": name.strip(), "cumulative_ms": int(cumulative) / 1000})
+    return sorted(imports, key=lambda i: -i["cumulative_ms"])[:top]
+
+
+def benchmark_module(module: str, runs: int, warm: bool, importtime: bool, env: Dict[str, str]) -> Dict[str, Any]:
+    print(f"⏱️  {module}...")
+    samples = [run_child(module, warm, env) for _ in range(runs)]
+    errors = {s["error"] for s in samples if s.get("error")}
+    imports = [s["import_s"] * 1000 for s in samples if "import_s" in s and not s.get("error")]
+    processes = [s["process_s"] * 1000 for s in samples]
+    report = {
+        "module": module,
+        "runs": runs,
+        "import_ms": _summary(imports),
+        "process_ms": _summary(processes),
+        "error": next(iter(errors), None)
+    }
+    if warm:
+        warms = [s["warm_s"] * 1000 for s in samples if "warm_s" in s]
+        report["warm_ms"] = _summary(warms)
+        report["resources"] = samples[-1].get("resources", {})
+    if importtime:
+        report["slowest_imports"] = run_child(module, False, env, importtime=True).get("slowest_imports", [])
+    return report
+
+
+def _summary(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    return {"median": round(statistics.median(values), 1), "min": round(min(values), 1), "max": round(max(values), 1)}
+
+
+def print_report(reports: List[Dict[str, Any]], warm: bool):
+    print("\n🚀 Agent startup benchmark")
+    print("=" * 88)
+    print(f"{'module':<36}{'import ms':>12}{'process ms':>13}" + (f"{'warm ms':>11}" if warm else "") + "  notes")
+    print("-" * 88)
+    for r in reports:
+        def median(key):
+            return f"{r[key]['median']:.1f}" if r.get(key) else "-"
+        notes = f"❌ {r['error'][:60]}" if r["error"] else ""
+        if warm and r.get("resources"):
+            failed = [name for name, res in r["resources"].items() if res["error"]]
+            notes = notes or (f"⚠️ not built: {', '.join(failed)}" if failed else f"{len(r['resources'])} resources")
+        print(f"{r['module']:<36}{median('import_ms'):>12}{median('process_ms'):>13}" + (f"{median('warm_ms'):>11}" if warm else "") + f"  {notes}")
+        for slow in r.get("slowest_imports", []):
+            print(f"{'':<4}{slow['module']:<32}{slow['cumulative_ms']:>12.1f}")
+    print("=" * 88)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import and lazy-resource build time of the agent modules")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=int(os.getenv("BENCHMARK_STARTUP_RUNS", 5)))
+    parser.add_argument("--warm", action="store_true", help="also build every lazy resource after the import")
+    parser.add_argument("--importtime", action="store_true", help="list the slowest imports of each module")
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="agent-startup-") as data_dir:
+        env = child_environment(data_dir)
+        reports = [benchmark_module(module, args.runs, args.warm, args.importtime, env) for module in args.modules]
+    print_report(reports, args.warm)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"timestamp": int(time.time()), "args": vars(args), "results": reports}, f, indent=2)
+        print(f"💾 Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
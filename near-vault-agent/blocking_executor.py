@@ -0,0 +1,77 @@
+"""
+Bounded execution layer for blocking web3 / requests / LLM work called from async FastAPI routes.
+
+Every route awaits `blocking_executor.run(route, fn, ...)` instead of calling `tool.invoke()`
+directly on the event loop. A per-route semaphore is acquired *before* a worker thread is
+taken, so a slow route can never occupy more than its share of the pool. The pool holds at
+least the sum of all route limits, so every route (health and writes included) always has
+its workers free; routes not listed below share one extra lane of `default_limit` workers.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+# Per-route concurrency limits. All write routes share the "write" lane so on-chain
+# transactions from /rebalance, /harvest, /mint-usdc, /deposit-test and the scheduler
+# never race each other for the agent nonce.
+DEFAULT_ROUTE_LIMITS = {
+    "health": 2,
+    "status": 4,
+    "balances": 2,
+    "yields": 2,
+    "risk": 2,
+    "assess-risk": 2,
+    "scheduler": 1,
+    "startup": 1,
+    "write": 1
+}
+
+# Lane shared by every route without its own limit
+DEFAULT_LANE = "default"
+
+
+class BlockingExecutor:
+    """Runs blocking callables on a bounded worker pool with per-route concurrency limits."""
+
+    def __init__(self, max_workers: Optional[int] = None, route_limits: Optional[Dict[str, int]] = None,
+                 default_limit: int = 2):
+        self.route_limits = {**DEFAULT_ROUTE_LIMITS, **(route_limits or {})}
+        self.default_limit = default_limit
+        # Never fewer workers than the lanes can use at once, or slow routes could starve the rest
+        required = sum(self.route_limits.values()) + default_limit
+        self.max_workers = max(max_workers or int(os.getenv("AGENT_WORKER_THREADS", 0)), required)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="agent-worker")
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+
+    def _semaphore(self, route: str) -> asyncio.Semaphore:
+        lane = route if route in self.route_limits else DEFAULT_LANE
+        if lane not in self._semaphores:
+            self._semaphores[lane] = asyncio.Semaphore(self.route_limits.get(lane, self.default_limit))
+        return self._semaphores[lane]
+
+    async def run(self, route: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Await `fn(*args, **kwargs)` on the worker pool, limited per route."""
+        async with self._semaphore(route):
+            self._in_flight[route] = self._in_flight.get(route, 0) + 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._pool, partial(fn, *args, **kwargs))
+            finally:
+                self._in_flight[route] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Current in-flight count and limit for each route seen so far."""
+        return {
+            "max_workers": self.max_workers,
+            "routes": {
+                route: {"in_flight": self._in_flight.get(route, 0), "limit": self.route_limits.get(route, self.default_limit)}
+                for route in self._in_flight
+            }
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,15 +1,17 @@
 import os
-import json
 from dotenv import load_dotenv
-from web3 import Web3
-from web3.middleware import geth_poa_middleware
+from tx_submitter import TransactionSubmitter
+from rpc_client import get_web3
+from event_indexer import EventIndexer
+from lazy import LazyResource, lazy, resolve
+from abi_registry import get_registry as get_abi_registry
 
 # Load environment variables from .env file
 load_dotenv()
 
 # --- Aurora Configuration ---
 RPC_URL = os.getenv("NEAR_TESTNET_RPC_URL")  # Aurora testnet RPC
-CHAIN_ID = int(os.getenv("NEAR_TESTNET_CHAIN_ID"))  # Aurora chain ID
+CHAIN_ID = int(os.getenv("NEAR_TESTNET_CHAIN_ID")) if os.getenv("NEAR_TESTNET_CHAIN_ID") else None  # Aurora chain ID (required to sign)
 AGENT_PRIVATE_KEY = os.getenv("AGENT_PRIVATE_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
@@ -21,32 +23,45 @@ USDC_TOKEN_ADDRESS = os.getenv("USDC_TOKEN_ADDRESS")
 # --- Aurora Strategy Addresses ---
 REF_FINANCE_STRATEGY_ADDRESS = os.getenv("REF_FINANCE_STRATEGY_ADDRESS", "")
 
+# --- Lazily-built resources ---
+# Nothing below touches the network, derives the key or parses ABIs until first use, so
+# importing this module (tools.py, vault_actions.py, tests, CLI scripts) is cheap.
+
 # --- Web3 Setup for Aurora ---
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
-# Inject PoA middleware for Aurora
-w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+# Shared pooled client with failover to AURORA_RPC_URLS; PoA middleware for Aurora
+w3 = LazyResource("w3", lambda: get_web3(RPC_URL, poa=True))
 
 # --- Agent Account ---
-agent_account = w3.eth.account.from_key(AGENT_PRIVATE_KEY)
-print(f"🤖 Aurora Agent Wallet Address: {agent_account.address}")
-
-# --- Function to load ABI ---
-def load_abi(filename):
-    path = os.path.join("abi", filename)
-    with open(path, "r") as f:
-        return json.load(f)["abi"]
-
-# --- Load ABIs ---
-vault_abi = load_abi("Vault.json")
-vrf_strategy_abi = load_abi("NearVrfYieldStrategy.json")  # Updated for NEAR VRF
-usdc_abi = load_abi("MockUSDC.json")
-
-# --- Create Contract Objects ---
-vault_contract = w3.eth.contract(address=VAULT_ADDRESS, abi=vault_abi)
-vrf_strategy_contract = w3.eth.contract(address=VRF_STRATEGY_ADDRESS, abi=vrf_strategy_abi)
-usdc_contract = w3.eth.contract(address=USDC_TOKEN_ADDRESS, abi=usdc_abi)
-
-print(f"✅ Aurora Configuration loaded on chain {CHAIN_ID}")
+@lazy("agent_account")
+def agent_account():
+    account = w3.eth.account.from_key(AGENT_PRIVATE_KEY)
+    print(f"🤖 Aurora Agent Wallet Address: {account.address}")
+    return account
+
+# --- Transaction Submitter (local nonce tracking, pipelined sends) ---
+@lazy("tx_submitter")
+def tx_submitter():
+    if CHAIN_ID is None:
+        # No default: signing for a guessed chain id would send transactions to the wrong network
+        raise ValueError("NEAR_TESTNET_CHAIN_ID must be set in .env before the agent can sign transactions")
+    return TransactionSubmitter(resolve(w3), resolve(agent_account), CHAIN_ID)
+
+# --- Create Contract Objects (ABIs from the shared precompiled registry) ---
+vault_contract = LazyResource("vault_contract", lambda: get_abi_registry().contract(resolve(w3), "Vault", VAULT_ADDRESS))
+vrf_strategy_contract = LazyResource(
+    "vrf_strategy_contract",
+    lambda: get_abi_registry().contract(resolve(w3), "NearVrfYieldStrategy", VRF_STRATEGY_ADDRESS)  # Updated for NEAR VRF
+)
+usdc_contract = LazyResource("usdc_contract", lambda: get_abi_registry().contract(resolve(w3), "MockUSDC", USDC_TOKEN_ADDRESS))
+
+# --- Local index of lottery events (winners and prize amounts) ---
+vrf_event_indexer = LazyResource("vrf_event_indexer", lambda: EventIndexer(
+    resolve(w3),
+    {resolve(vrf_strategy_contract): ["WinnerAwarded", "YieldDeposited"]},
+    db_path=os.getenv("VRF_EVENTS_DB", "data/vrf_events.sqlite")
+))
+
+print(f"✅ Aurora Configuration loaded on chain {CHAIN_ID if CHAIN_ID is not None else '⚠️ NEAR_TESTNET_CHAIN_ID not set'}")
 print(f"🌐 Aurora RPC: {RPC_URL}")
 print(f"🎲 VRF Strategy: {VRF_STRATEGY_ADDRESS}")
 print(f"💰 Agent has Aurora ETH for gas fees")
\ No newline at end of file
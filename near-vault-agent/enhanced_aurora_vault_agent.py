@@ -3,21 +3,21 @@ import json
 import time
 from dotenv import load_dotenv
 from web3 import Web3
-# Fixed import for Web3.py v6+
-import web3.middleware
-from web3.exceptions import ContractLogicError
-from fastapi import FastAPI
+from tx_submitter import TransactionSubmitter
+from rpc_client import get_web3
+from fastapi import FastAPI, Response
 from pydantic import BaseModel
 from langchain_openai import ChatOpenAI
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain_core.prompts import PromptTemplate
 from langchain.tools import tool
+from metrics import PROMETHEUS_CONTENT_TYPE, instrument_tools, llm_callbacks, render as render_metrics
 
 # Import risk assessment
 import sys
 sys.path.append('./ml-risk')
 try:
-    from risk_api import RiskAssessmentAPI
+    from risk_api import StrategyRiskAPI
     RISK_MODEL_AVAILABLE = True
     print("✅ Risk model imported successfully")
 except ImportError as e:
@@ -27,7 +27,8 @@ except ImportError as e:
 
 # Import OpenAI LLM planner (reuse your existing one)
 try:
-    from ollama_llm_planner import ai_strategy_advisor  # Uses OpenAI
+    from ollama_llm_planner import ai_strategy_advisor, strategy_cache  # Uses OpenAI
+    from http_session import circuit_breaker
     OPENAI_AI_AVAILABLE = True
     print("✅ OpenAI LLM planner imported successfully")
 except ImportError as e:
@@ -59,25 +60,23 @@ AURORA_STRATEGIES = {
 }
 
 # --- Web3 Setup for Aurora ---
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
-# Fixed middleware injection for Web3.py v6+
-try:
-    from web3.middleware import geth_poa_middleware
-    w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-    print("✅ PoA middleware injected")
-except (ImportError, AttributeError):
-    print("⚠️ PoA middleware not available, continuing without it")
-    print("   This is often fine for Aurora testnet")
+# Shared pooled client with failover to AURORA_RPC_URLS; PoA middleware for Aurora
+w3 = get_web3(RPC_URL, poa=True)
 
 # --- Agent Account Setup ---
 agent_account = w3.eth.account.from_key(AGENT_PRIVATE_KEY)
 print(f"🤖 Aurora Agent Wallet Address: {agent_account.address}")
 
+# --- Transaction Submitter (local nonce tracking, pipelined sends) ---
+tx_submitter = TransactionSubmitter(w3, agent_account, CHAIN_ID)
+
 # --- Risk Model Setup ---
 if RISK_MODEL_AVAILABLE:
     try:
-        risk_api = RiskAssessmentAPI("ml-risk/models/anomaly_risk_model.joblib")
-        print("✅ Risk assessment model loaded")
+        risk_api = StrategyRiskAPI("ml-risk/models/anomaly_risk_model.joblib")
+        if not risk_api.registry.model_exists():
+            raise FileNotFoundError(f"model file not found at {risk_api.model_path}")
+        print("✅ Risk assessment model found (loads on first use)")
     except Exception as e:
         risk_api = None
         print(f"⚠️ Risk model loading failed: {e}")
@@ -131,36 +130,9 @@ print("✅ Enhanced Aurora configuration loaded with risk management")
 # 2. ENHANCED AGENT TOOLS WITH AURORA INTEGRATION
 # ==============================================================================
 
-def send_transaction(tx):
-    """Signs and sends a transaction with Web3.py v6+ compatibility."""
-    try:
-        # Sign transaction with proper Web3.py v6+ method
-        signed_tx = w3.eth.account.sign_transaction(tx, agent_account.key)
-        
-        # Handle different Web3.py versions
-        if hasattr(signed_tx, 'rawTransaction'):
-            raw_tx = signed_tx.rawTransaction
-        elif hasattr(signed_tx, 'raw_transaction'):
-            raw_tx = signed_tx.raw_transaction
-        else:
-            # For newer versions, the signed transaction might be the raw transaction itself
-            raw_tx = signed_tx
-        
-        tx_hash = w3.eth.send_raw_transaction(raw_tx)
-        print(f"⏳ Aurora transaction sent: {tx_hash.hex()}. Waiting for confirmation...")
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-        print(f"✅ Aurora transaction confirmed in block: {receipt.blockNumber}")
-        return {"success": True, "receipt": receipt, "tx_hash": tx_hash.hex()}
-        
-    except ContractLogicError as e:
-        print(f"❌ Aurora transaction reverted: {e}")
-        return {"success": False, "error": f"Contract logic error: {e}"}
-    except Exception as e:
-        print(f"❌ Aurora transaction error: {e}")
-        # More detailed error for debugging
-        import traceback
-        traceback.print_exc()
-        return {"success": False, "error": str(e)}
+def send_transaction(contract_call, gas):
+    """Signs and sends a contract call via the shared Aurora submitter (local nonce, v6/v7 signing)."""
+    return tx_submitter.send_and_wait(contract_call, gas=gas)
 
 @tool
 def get_enhanced_aurora_protocol_status() -> str:
@@ -321,15 +293,9 @@ def deploy_to_aurora_strategy_with_risk_check(strategy_name: str, amount: float
             strategy_address,
             amount_wei,
             b''
-        ).build_transaction({
-            'from': agent_account.address,
-            'nonce': w3.eth.get_transaction_count(agent_account.address),
-            'gas': 2_000_000,
-            'gasPrice': w3.eth.gas_price,
-            'chainId': CHAIN_ID
-        })
+        )
         
-        result = send_transaction(tx)
+        result = send_transaction(tx, gas=2_000_000)
         
         if result["success"]:
             return f"✅ Successfully deployed {amount:.2f} USDC to {strategy_name} strategy on Aurora. TX: {result['tx_hash']}"
@@ -354,54 +320,21 @@ def simulate_aurora_yield_harvest_and_deposit(amount_usdc: float) -> str:
     try:
         amount_wei = int(amount_usdc * (10**6))
 
-        # 1. Mint "yield" to the agent's wallet
-        print(f"Minting {amount_usdc} USDC to Aurora agent...")
-        mint_tx = usdc_contract.functions.mint(
-            agent_account.address,
-            amount_wei
-        ).build_transaction({
-            'from': agent_account.address,
-            'nonce': w3.eth.get_transaction_count(agent_account.address),
-            'gas': 500_000,
-            'gasPrice': w3.eth.gas_price,
-            'chainId': CHAIN_ID
-        })
-        mint_result = send_transaction(mint_tx)
+        # mint -> approve -> depositYield are broadcast back-to-back with consecutive
+        # nonces and confirmed together
+        print(f"Minting, approving and depositing {amount_usdc} USDC as Aurora prize pool...")
+        mint_result, approve_result, deposit_result = tx_submitter.submit_and_wait_all([
+            # 1. Mint "yield" to the agent's wallet
+            {"call": usdc_contract.functions.mint(agent_account.address, amount_wei), "gas": 500_000, "label": "mint"},
+            # 2. Approve the Aurora VRF Strategy
+            {"call": usdc_contract.functions.approve(VRF_STRATEGY_ADDRESS, amount_wei), "gas": 500_000, "label": "approve"},
+            # 3. Deposit the "yield" into the Aurora VRF strategy
+            {"call": vrf_strategy_contract.functions.depositYield(amount_wei), "gas": 1_000_000, "label": "depositYield"}
+        ])
         if not mint_result["success"]:
             return f"Failed to mint mock yield on Aurora: {mint_result['error']}"
-        
-        time.sleep(2)
-
-        # 2. Approve the Aurora VRF Strategy
-        print(f"Approving Aurora VRF strategy to spend {amount_usdc} USDC...")
-        approve_tx = usdc_contract.functions.approve(
-            VRF_STRATEGY_ADDRESS,
-            amount_wei
-        ).build_transaction({
-            'from': agent_account.address,
-            'nonce': w3.eth.get_transaction_count(agent_account.address),
-            'gas': 500_000,
-            'gasPrice': w3.eth.gas_price,
-            'chainId': CHAIN_ID
-        })
-        approve_result = send_transaction(approve_tx)
         if not approve_result["success"]:
             return f"Failed to approve yield deposit on Aurora: {approve_result['error']}"
-            
-        time.sleep(2)
-
-        # 3. Deposit the "yield" into the Aurora VRF strategy
-        print(f"Depositing {amount_usdc} USDC as Aurora prize pool...")
-        deposit_tx = vrf_strategy_contract.functions.depositYield(
-            amount_wei
-        ).build_transaction({
-            'from': agent_account.address,
-            'nonce': w3.eth.get_transaction_count(agent_account.address),
-            'gas': 1_000_000,
-            'gasPrice': w3.eth.gas_price,
-            'chainId': CHAIN_ID
-        })
-        deposit_result = send_transaction(deposit_tx)
         
         if deposit_result["success"]:
             return f"✅ Successfully simulated and deposited {amount_usdc} USDC as Aurora prize pool. TX: {deposit_result['tx_hash']}"
@@ -431,18 +364,13 @@ def trigger_aurora_lottery_draw() -> str:
         tx = vault_contract.functions.harvestStrategy(
             VRF_STRATEGY_ADDRESS,
             b''
-        ).build_transaction({
-            'from': agent_account.address,
-            'nonce': w3.eth.get_transaction_count(agent_account.address),
-            'gas': 2_000_000,
-            'gasPrice': w3.eth.gas_price,
-            'chainId': CHAIN_ID
-        })
+        )
 
-        result = send_transaction(tx)
+        result = send_transaction(tx, gas=2_000_000)
         if result["success"]:
-            time.sleep(2)
-            new_winner = vrf_strategy_contract.functions.lastWinner().call()
+            new_winner = vrf_strategy_contract.functions.lastWinner().call(
+                block_identifier=result["receipt"].blockNumber
+            )
             return f"🎉 Aurora lottery draw successful! Winner: {new_winner}, Prize: {prize_amount:.2f} USDC, TX: {result['tx_hash']}"
         else:
             return f"Failed to trigger Aurora lottery draw: {result['error']}"
@@ -480,32 +408,35 @@ def emergency_aurora_risk_assessment() -> str:
             })
             risk_summary["total_at_risk"] += prize_pool
         
-        # Check other Aurora strategies
-        for strategy_name, address in AURORA_STRATEGIES.items():
-            if address and risk_api:
-                try:
-                    risk_score = risk_api.assess_strategy_risk(address)
-                    balance = 0.0  # Would need strategy contract ABI to get actual balance
-                    
-                    strategy_info = {
-                        "name": strategy_name,
-                        "address": address,
-                        "balance": balance,
-                        "risk_score": risk_score,
-                        "network": "Aurora"
-                    }
-                    
-                    if risk_score > 0.7:
-                        risk_summary["high_risk_strategies"].append(strategy_info)
-                        risk_summary["recommendations"].append(f"URGENT: Exit Aurora {strategy_name}")
-                    elif risk_score > 0.5:
-                        risk_summary["medium_risk_strategies"].append(strategy_info)
-                        risk_summary["recommendations"].append(f"MONITOR: Watch Aurora {strategy_name}")
-                    else:
-                        risk_summary["low_risk_strategies"].append(strategy_info)
-                        
-                except Exception as e:
-                    print(f"Risk check failed for Aurora {strategy_name}: {e}")
+        # Check other Aurora strategies - scored together in one batched model pass
+        deployed = {name: address for name, address in AURORA_STRATEGIES.items() if address}
+        strategy_risks = {}
+        if deployed and risk_api:
+            try:
+                batch = risk_api.assess_many(list(deployed.values()))
+                strategy_risks = dict(zip(deployed, batch["risk_scores"].tolist()))
+            except Exception as e:
+                print(f"Risk check failed for Aurora strategies: {e}")
+        
+        for strategy_name, risk_score in strategy_risks.items():
+            balance = 0.0  # Would need strategy contract ABI to get actual balance
+            
+            strategy_info = {
+                "name": strategy_name,
+                "address": deployed[strategy_name],
+                "balance": balance,
+                "risk_score": risk_score,
+                "network": "Aurora"
+            }
+            
+            if risk_score > 0.7:
+                risk_summary["high_risk_strategies"].append(strategy_info)
+                risk_summary["recommendations"].append(f"URGENT: Exit Aurora {strategy_name}")
+            elif risk_score > 0.5:
+                risk_summary["medium_risk_strategies"].append(strategy_info)
+                risk_summary["recommendations"].append(f"MONITOR: Watch Aurora {strategy_name}")
+            else:
+                risk_summary["low_risk_strategies"].append(strategy_info)
         
         total_strategies = len(risk_summary["high_risk_strategies"]) + \
                           len(risk_summary["medium_risk_strategies"]) + \
@@ -799,7 +730,10 @@ Thought: {agent_scratchpad}
 prompt = PromptTemplate.from_template(enhanced_aurora_prompt_template)
 
 # Initialize enhanced LLM and Agent
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, api_key=OPENAI_API_KEY)
+# Latency / error histograms for every tool, served on /metrics
+instrument_tools(tools)
+
+llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, api_key=OPENAI_API_KEY, callbacks=llm_callbacks("agent"))
 react_agent = create_react_agent(llm, tools, prompt)
 agent_executor = AgentExecutor(
     agent=react_agent, 
@@ -941,6 +875,11 @@ def read_root():
         ]
     }
 
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint: tool, RPC, provider and LLM latency histograms and error counts."""
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.get("/health")
 async def health_check():
     """Comprehensive Aurora health check endpoint."""
@@ -968,6 +907,10 @@ async def health_check():
             "prize_pool_usdc": prize_pool / 10**6,
             "risk_model_loaded": risk_api is not None,
             "openai_ai_available": OPENAI_AI_AVAILABLE,
+            "llm_cache": strategy_cache.stats() if OPENAI_AI_AVAILABLE else None,
+            "openai_circuit": circuit_breaker("openai").stats() if OPENAI_AI_AVAILABLE else None,
+            "rpc_endpoints": w3.provider.stats(),
+            "rpc_read_cache": w3.provider.read_cache_stats(),
             "contracts_accessible": True
         }
         
@@ -0,0 +1,225 @@
+"""
+Incremental eth_getLogs indexer for the vault / strategy contracts.
+
+Logs are scanned in adaptive block-range chunks (grown while ranges are cheap, halved when
+the node rejects or times out a range), decoded with the contract ABI and persisted to a
+local SQLite store. The last scanned block hash is checked on every sync; if the chain
+reorganised, everything inside the confirmation window is dropped and re-scanned.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from hexbytes import HexBytes
+from web3 import Web3
+
+from abi_registry import compile_abi
+
+DEFAULT_DB_PATH = os.getenv("EVENT_INDEXER_DB", "data/vault_events.sqlite")
+
+
+class EventIndexer:
+    """Indexes selected events of several contracts into one SQLite database."""
+
+    def __init__(self, w3: Web3, sources: Dict[Any, Iterable[str]], db_path: Optional[str] = None,
+                 confirmations: Optional[int] = None, start_block: Optional[int] = None,
+                 initial_chunk: int = 2_000, min_chunk: int = 10, max_chunk: int = 50_000):
+        self.w3 = w3
+        self.confirmations = confirmations if confirmations is not None else int(os.getenv("EVENT_INDEXER_CONFIRMATIONS", 20))
+        # First sync starts here; defaults to a lookback window behind the current head
+        self.start_block = start_block if start_block is not None else (
+            int(os.environ["EVENT_INDEXER_START_BLOCK"]) if os.getenv("EVENT_INDEXER_START_BLOCK") else None
+        )
+        self.lookback_blocks = int(os.getenv("EVENT_INDEXER_LOOKBACK", 100_000))
+        self.chunk = initial_chunk
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+
+        # topic0 -> (contract, event name, decoder) for every indexed event; topics are precomputed
+        # by the ABI registry and each event's decoder is built once instead of per log
+        self._events = {}
+        for contract, event_names in sources.items():
+            compiled = compile_abi(contract.abi)
+            for name in event_names:
+                self._events[HexBytes(compiled.event(name).topic)] = (contract, name, contract.events[name]())
+        self._addresses = sorted({contract.address for contract, _, _ in self._events.values()})
+
+        db_path = db_path or DEFAULT_DB_PATH
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS events (
+                    block_number INTEGER NOT NULL,
+                    block_hash TEXT NOT NULL,
+                    tx_hash TEXT NOT NULL,
+                    log_index INTEGER NOT NULL,
+                    contract TEXT NOT NULL,
+                    event TEXT NOT NULL,
+                    args TEXT NOT NULL,
+                    PRIMARY KEY (tx_hash, log_index)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS events_by_name ON events (event, block_number)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cursor (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    block_number INTEGER NOT NULL,
+                    block_hash TEXT NOT NULL
+                )
+            """)
+
+    # --------------------------------------------------------------------------
+    # Sync
+    # --------------------------------------------------------------------------
+
+    def sync(self) -> int:
+        """Scan from the last indexed block to the chain head. Returns the number of new events."""
+        with self._lock:
+            head = self.w3.eth.block_number
+            cursor = self._cursor()
+            if cursor is None:
+                from_block = self.start_block if self.start_block is not None else max(0, head - self.lookback_blocks)
+            else:
+                from_block = self._check_reorg(*cursor) + 1
+
+            stored = 0
+            while from_block <= head:
+                to_block = min(from_block + self.chunk - 1, head)
+                try:
+                    logs = self.w3.eth.get_logs({
+                        "address": self._addresses,
+                        "fromBlock": from_block,
+                        "toBlock": to_block,
+                        "topics": [list(self._events.keys())]
+                    })
+                except Exception as e:
+                    if self.chunk <= self.min_chunk:
+                        raise
+                    # Too many results / range too large / timeout - retry with a smaller range
+                    self.chunk = max(self.min_chunk, self.chunk // 2)
+                    print(f"⚠️ eth_getLogs {from_block}-{to_block} failed ({e}), chunk -> {self.chunk}")
+                    continue
+
+                stored += self._store(logs, to_block)
+                from_block = to_block + 1
+                if len(logs) < 1_000:
+                    self.chunk = min(self.max_chunk, self.chunk * 2)
+
+            if stored:
+                print(f"📚 Indexed {stored} new vault event(s) up to block {head}")
+            return stored
+
+    def _cursor(self):
+        row = self._conn.execute("SELECT block_number, block_hash FROM cursor WHERE id = 1").fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _check_reorg(self, block_number: int, block_hash: str) -> int:
+        """Return the block to resume after, rolling back the confirmation window on a reorg."""
+        if self.w3.eth.get_block(block_number)["hash"].hex() == block_hash:
+            return block_number
+
+        rollback_to = max(0, block_number - self.confirmations)
+        print(f"🔀 Reorg detected at block {block_number}, rolling back to {rollback_to}")
+        with self._conn:
+            self._conn.execute("DELETE FROM events WHERE block_number > ?", (rollback_to,))
+            self._set_cursor(rollback_to)
+        return rollback_to
+
+    def _set_cursor(self, block_number: int):
+        block_hash = self.w3.eth.get_block(block_number)["hash"].hex()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO cursor (id, block_number, block_hash) VALUES (1, ?, ?)",
+            (block_number, block_hash)
+        )
+
+    def _store(self, logs, to_block: int) -> int:
+        rows = []
+        for log in logs:
+            contract, name, decoder = self._events.get(HexBytes(log["topics"][0]), (None, None, None))
+            if contract is None:
+                continue
+            decoded = decoder.process_log(log)
+            rows.append((
+                log["blockNumber"],
+                HexBytes(log["blockHash"]).hex(),
+                HexBytes(log["transactionHash"]).hex(),
+                log["logIndex"],
+                log["address"],
+                name,
+                json.dumps({k: _to_json(v) for k, v in decoded["args"].items()})
+            ))
+        # Events and cursor move together so a crash never leaves a gap
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._set_cursor(to_block)
+        return len(rows)
+
+    # --------------------------------------------------------------------------
+    # Queries
+    # --------------------------------------------------------------------------
+
+    def events(self, name: Optional[str] = None, since_block: int = 0, tx_hashes: Optional[List[str]] = None,
+               limit: int = 100) -> List[Dict[str, Any]]:
+        """Newest-first decoded events, optionally filtered by name, block or transaction."""
+        query = "SELECT block_number, tx_hash, log_index, contract, event, args FROM events WHERE block_number >= ?"
+        params: List[Any] = [since_block]
+        if name:
+            query += " AND event = ?"
+            params.append(name)
+        if tx_hashes:
+            normalized = [HexBytes(h).hex() for h in tx_hashes]
+            query += f" AND tx_hash IN ({','.join('?' * len(normalized))})"
+            params += normalized
+        query += " ORDER BY block_number DESC, log_index DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            cursor = self._cursor()
+        confirmed_up_to = (cursor[0] if cursor else 0) - self.confirmations
+        return [
+            {
+                "block_number": block_number,
+                "tx_hash": tx_hash,
+                "log_index": log_index,
+                "contract": contract,
+                "event": event,
+                "args": json.loads(args),
+                "confirmed": block_number <= confirmed_up_to
+            }
+            for block_number, tx_hash, log_index, contract, event, args in rows
+        ]
+
+    def total_by_strategy(self, name: str, amount_field: str = "amount", tx_hashes: Optional[List[str]] = None,
+                          since_block: int = 0) -> Dict[str, int]:
+        """Sum an amount field of `name` events per `strategy` argument."""
+        totals: Dict[str, int] = {}
+        for event in self.events(name, since_block=since_block, tx_hashes=tx_hashes, limit=1_000_000):
+            strategy = event["args"].get("strategy", event["contract"])
+            totals[strategy] = totals.get(strategy, 0) + int(event["args"].get(amount_field, 0))
+        return totals
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cursor = self._cursor()
+            count = self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        return {
+            "indexed_to_block": cursor[0] if cursor else None,
+            "events": count,
+            "chunk_size": self.chunk,
+            "confirmations": self.confirmations
+        }
+
+
+def _to_json(value):
+    if isinstance(value, (bytes, bytearray)):
+        return HexBytes(value).hex()
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    return value
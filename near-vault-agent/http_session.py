@@ -0,0 +1,110 @@
+"""
+Shared keep-alive HTTP sessions and passive circuit breakers for external APIs.
+
+Callers get one pooled `requests.Session` per upstream name, so repeated calls reuse the
+same TLS connection, and one `CircuitBreaker` per name that tracks availability from the
+outcomes of real calls instead of separate probe requests.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_sessions: Dict[str, requests.Session] = {}
+_breakers: Dict[str, "CircuitBreaker"] = {}
+_registry_lock = threading.Lock()
+
+
+def shared_session(name: str, pool_maxsize: int = 8) -> requests.Session:
+    """Process-wide pooled session for one upstream (e.g. "openai")."""
+    with _registry_lock:
+        if name not in _sessions:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[name] = session
+        return _sessions[name]
+
+
+def circuit_breaker(name: str) -> "CircuitBreaker":
+    """Process-wide breaker for one upstream, shared by every client of it."""
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures; open -> half-open after
+    `reset_timeout` seconds, letting a single trial call through; its outcome closes or
+    re-opens the breaker.
+    """
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or int(os.getenv("CIRCUIT_BREAKER_FAILURES", 3))
+        self.reset_timeout = reset_timeout if reset_timeout is not None else float(os.getenv("CIRCUIT_BREAKER_RESET", 60))
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self.successes = 0
+        self.total_failures = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.time() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def available(self) -> bool:
+        """Whether a call would currently be let through (does not reserve the trial slot)."""
+        state = self.state
+        return state == "closed" or (state == "half-open" and not self._trial_in_flight)
+
+    def allow(self) -> bool:
+        """Call before each request; False means skip the network and use a fallback."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+            self.successes += 1
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self.total_failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial_in_flight:
+                    print(f"🔌 {self.name} circuit OPEN after {self._failures} failure(s)")
+                self._opened_at = time.time()
+            self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "successes": self.successes,
+            "failures": self.total_failures,
+            "rejected": self.rejected
+        }
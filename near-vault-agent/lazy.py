@@ -0,0 +1,78 @@
+"""
+Lazily-built process singletons.
+
+Agent modules declare their heavy resources (Web3 client, account, contracts, SQLite stores,
+LLM clients, the ReAct agent) as `LazyResource`s instead of building them at import time.
+Attribute access forwards to the object, which is built on first use, once, thread-safely;
+servers build everything up front from their FastAPI lifespan hook with `warm()`. Importing
+a module for its tools, in a test or from a CLI script therefore costs no RPC setup, no key
+derivation and no LLM client construction.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class LazyResource:
+    """Proxy that builds `factory()` on first attribute access."""
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_value", None)
+        object.__setattr__(self, "_built", False)
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "build_seconds", None)
+
+    def get(self) -> Any:
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    started = time.perf_counter()
+                    value = self._factory()
+                    object.__setattr__(self, "_value", value)
+                    object.__setattr__(self, "build_seconds", time.perf_counter() - started)
+                    object.__setattr__(self, "_built", True)
+        return self._value
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def reset(self):
+        """Drop the built object; the next access builds a new one."""
+        with self._lock:
+            object.__setattr__(self, "_value", None)
+            object.__setattr__(self, "_built", False)
+            object.__setattr__(self, "build_seconds", None)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.get(), attr)
+
+    def __setattr__(self, attr: str, value: Any):
+        setattr(self.get(), attr, value)
+
+    def __repr__(self) -> str:
+        return repr(self._value) if self._built else f"<lazy {self._name} (not built)>"
+
+
+def lazy(name: str) -> Callable[[Callable[[], Any]], LazyResource]:
+    """Decorator form: `@lazy("w3") def w3(): return get_web3(...)`."""
+    def wrap(factory: Callable[[], Any]) -> LazyResource:
+        return LazyResource(name, factory)
+    return wrap
+
+
+def resolve(value: Any) -> Any:
+    """The underlying object (for APIs that hash, type-check or store it)."""
+    return value.get() if isinstance(value, LazyResource) else value
+
+
+def warm(resources: Dict[str, LazyResource]) -> Dict[str, Optional[float]]:
+    """Build every resource now (e.g. in a lifespan hook); returns build seconds per resource."""
+    timings = {}
+    for name, resource in resources.items():
+        resource.get()
+        timings[name] = round(resource.build_seconds, 4) if resource.build_seconds is not None else None
+    return timings
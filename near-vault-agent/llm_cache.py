@@ -0,0 +1,117 @@
+"""
+Persistent prompt-fingerprint cache for LLM responses.
+
+The optimizer and the OpenAI planners re-send near-identical prompts: the same protocol data
+with a little APY/TVL jitter. Inputs are canonicalized (sorted keys, volatile cache/timing
+fields dropped, numbers quantized to a few significant digits) and hashed, and the parsed
+response is stored in SQLite with a TTL and least-recently-used eviction past `max_entries`.
+Expiry and the size bound apply per namespace, so a busy caller never evicts another's entries.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/llm_cache.sqlite")
+
+# Annotations added by the provider cache / aggregator that say nothing about the market
+VOLATILE_FIELDS = {"cache_age_seconds", "cached", "stale", "deadline_exceeded", "timestamp", "last_updated"}
+
+
+def quantize(value: Any, significant_digits: int) -> Any:
+    """Recursively round numbers to `significant_digits` and drop volatile fields."""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(f"{value:.{significant_digits}g}")
+    if isinstance(value, dict):
+        return {str(k): quantize(v, significant_digits) for k, v in value.items() if k not in VOLATILE_FIELDS}
+    if isinstance(value, (list, tuple)):
+        return [quantize(v, significant_digits) for v in value]
+    return str(value)
+
+
+class LLMResponseCache:
+    """SQLite-backed response cache shared by every LLM caller in one namespace per caller."""
+
+    def __init__(self, namespace: str, path: Optional[str] = None, ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None, significant_digits: Optional[int] = None):
+        self.namespace = namespace
+        self.ttl = ttl if ttl is not None else float(os.getenv("LLM_CACHE_TTL", 3600))
+        self.max_entries = max_entries or int(os.getenv("LLM_CACHE_MAX_ENTRIES", 512))
+        self.significant_digits = significant_digits or int(os.getenv("LLM_CACHE_SIGNIFICANT_DIGITS", 3))
+        self.enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        self.hits = 0
+        self.misses = 0
+
+        path = path or DEFAULT_CACHE_PATH
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_namespace ON responses (namespace, last_used)")
+
+    def key(self, *parts: Any) -> str:
+        """Fingerprint of the canonicalized, quantized prompt inputs."""
+        canonical = json.dumps(quantize(list(parts), self.significant_digits), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(f"{self.namespace}:{canonical}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        print(f"💾 LLM cache hit ({self.namespace})")
+        return json.loads(row[0])
+
+    def put(self, key: str, response: Dict[str, Any]):
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, self.namespace, json.dumps(response), now, now)
+            )
+            # Expired entries first, then least recently used beyond this namespace's size bound
+            self._conn.execute("DELETE FROM responses WHERE namespace = ? AND created_at < ?", (self.namespace, now - self.ttl))
+            self._conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses WHERE namespace = ? ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.namespace, self.max_entries))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM responses WHERE namespace = ?", (self.namespace,)).fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "enabled": self.enabled,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
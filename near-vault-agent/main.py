@@ -1,16 +1,17 @@
 import os
-import json
 import time
 from dotenv import load_dotenv
 from web3 import Web3
-from web3.middleware import geth_poa_middleware
-from web3.exceptions import ContractLogicError
-from fastapi import FastAPI
+from tx_submitter import TransactionSubmitter
+from rpc_client import get_web3
+from abi_registry import get_registry as get_abi_registry
+from fastapi import FastAPI, Response
 from pydantic import BaseModel
 from langchain_openai import ChatOpenAI
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain_core.prompts import PromptTemplate
 from langchain.tools import tool
+from metrics import PROMETHEUS_CONTENT_TYPE, instrument_tools, llm_callbacks, render as render_metrics
 
 # ==============================================================================
 # 1. NEAR CONFIGURATION AND SETUP
@@ -30,28 +31,21 @@ VRF_STRATEGY_ADDRESS = os.getenv("VRF_STRATEGY_ADDRESS")
 USDC_TOKEN_ADDRESS = os.getenv("USDC_TOKEN_ADDRESS")
 
 # --- Web3 Setup ---
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
-w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+w3 = get_web3(RPC_URL, poa=True)
 
 # --- Agent Account ---
 agent_account = w3.eth.account.from_key(AGENT_PRIVATE_KEY)
 print(f"🤖 NEAR Agent Wallet Address: {agent_account.address}")
 
-# --- ABI Loading ---
-def load_abi(filename):
-    path = os.path.join("abi", filename)
-    with open(path, "r") as f:
-        return json.load(f)["abi"]
+# --- Transaction Submitter (local nonce, pipelined sends) ---
+tx_submitter = TransactionSubmitter(w3, agent_account, CHAIN_ID)
 
-vault_abi = load_abi("Vault.json")
+# --- Contract Objects (ABIs from the shared precompiled registry) ---
+abi_registry = get_abi_registry()
+vault_contract = abi_registry.contract(w3, "Vault", VAULT_ADDRESS)
 # Use the new NearVrfStrategy ABI
-vrf_strategy_abi = load_abi("NearVrfStrategy.json") 
-usdc_abi = load_abi("MockUSDC.json")
-
-# --- Contract Objects ---
-vault_contract = w3.eth.contract(address=VAULT_ADDRESS, abi=vault_abi)
-vrf_strategy_contract = w3.eth.contract(address=VRF_STRATEGY_ADDRESS, abi=vrf_strategy_abi)
-usdc_contract = w3.eth.contract(address=USDC_TOKEN_ADDRESS, abi=usdc_abi)
+vrf_strategy_contract = abi_registry.contract(w3, "NearVrfStrategy", VRF_STRATEGY_ADDRESS)
+usdc_contract = abi_registry.contract(w3, "MockUSDC", USDC_TOKEN_ADDRESS)
 
 print("✅ NEAR Configuration loaded.")
 
@@ -59,16 +53,8 @@ print("✅ NEAR Configuration loaded.")
 # 2. AGENT TOOLS (Identical logic, just on NEAR)
 # ==============================================================================
 
-def send_transaction(tx):
-    try:
-        signed_tx = w3.eth.account.sign_transaction(tx, agent_account.key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        print(f"⏳ NEAR Tx Sent: {tx_hash.hex()}. Waiting...")
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-        print(f"✅ NEAR Tx Confirmed in block: {receipt.blockNumber}")
-        return {"success": True, "receipt": receipt}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+def send_transaction(contract_call, gas):
+    return tx_submitter.send_and_wait(contract_call, gas=gas)
 
 @tool
 def get_protocol_status() -> str:
@@ -88,10 +74,8 @@ def deposit_new_funds_into_strategy() -> str:
     liquid_usdc_wei = usdc_contract.functions.balanceOf(VAULT_ADDRESS).call()
     if liquid_usdc_wei == 0:
         return "No new funds to deposit."
-    tx = vault_contract.functions.depositToStrategy(VRF_STRATEGY_ADDRESS, liquid_usdc_wei, b'').build_transaction({
-        'from': agent_account.address, 'nonce': w3.eth.get_transaction_count(agent_account.address), 'gas': 2000000, 'gasPrice': w3.eth.gas_price, 'chainId': CHAIN_ID
-    })
-    result = send_transaction(tx)
+    tx = vault_contract.functions.depositToStrategy(VRF_STRATEGY_ADDRESS, liquid_usdc_wei, b'')
+    result = send_transaction(tx, gas=2000000)
     return f"Successfully deposited {liquid_usdc_wei / 10**6} USDC." if result["success"] else f"Failed: {result['error']}"
 
 @tool
@@ -100,20 +84,14 @@ def simulate_yield_harvest_and_deposit(amount_usdc: float) -> str:
     print(f"Tool: simulate_yield_harvest_and_deposit (NEAR, Amount: {amount_usdc})")
     amount_wei = int(amount_usdc * (10**6))
     
-    mint_tx = usdc_contract.functions.mint(agent_account.address, amount_wei).build_transaction({
-        'from': agent_account.address, 'nonce': w3.eth.get_transaction_count(agent_account.address), 'gas': 500000, 'gasPrice': w3.eth.gas_price, 'chainId': CHAIN_ID
-    })
-    if not send_transaction(mint_tx)["success"]: return "Failed to mint mock yield."
-    
-    approve_tx = usdc_contract.functions.approve(VRF_STRATEGY_ADDRESS, amount_wei).build_transaction({
-        'from': agent_account.address, 'nonce': w3.eth.get_transaction_count(agent_account.address), 'gas': 500000, 'gasPrice': w3.eth.gas_price, 'chainId': CHAIN_ID
-    })
-    if not send_transaction(approve_tx)["success"]: return "Failed to approve yield deposit."
-
-    deposit_tx = vrf_strategy_contract.functions.depositYield(amount_wei).build_transaction({
-        'from': agent_account.address, 'nonce': w3.eth.get_transaction_count(agent_account.address), 'gas': 1000000, 'gasPrice': w3.eth.gas_price, 'chainId': CHAIN_ID
-    })
-    return f"Successfully deposited {amount_usdc} USDC as prize pool." if send_transaction(deposit_tx)["success"] else "Failed to deposit yield."
+    mint_result, approve_result, deposit_result = tx_submitter.submit_and_wait_all([
+        {"call": usdc_contract.functions.mint(agent_account.address, amount_wei), "gas": 500000, "label": "mint"},
+        {"call": usdc_contract.functions.approve(VRF_STRATEGY_ADDRESS, amount_wei), "gas": 500000, "label": "approve"},
+        {"call": vrf_strategy_contract.functions.depositYield(amount_wei), "gas": 1000000, "label": "depositYield"}
+    ])
+    if not mint_result["success"]: return "Failed to mint mock yield."
+    if not approve_result["success"]: return "Failed to approve yield deposit."
+    return f"Successfully deposited {amount_usdc} USDC as prize pool." if deposit_result["success"] else "Failed to deposit yield."
 
 @tool
 def trigger_lottery_draw() -> str:
@@ -122,12 +100,10 @@ def trigger_lottery_draw() -> str:
     prize_pool_wei = vrf_strategy_contract.functions.getBalance().call()
     if prize_pool_wei == 0:
         return "Cannot trigger draw: Prize pool is zero."
-    tx = vault_contract.functions.harvestStrategy(VRF_STRATEGY_ADDRESS, b'').build_transaction({
-        'from': agent_account.address, 'nonce': w3.eth.get_transaction_count(agent_account.address), 'gas': 2000000, 'gasPrice': w3.eth.gas_price, 'chainId': CHAIN_ID
-    })
-    result = send_transaction(tx)
+    tx = vault_contract.functions.harvestStrategy(VRF_STRATEGY_ADDRESS, b'')
+    result = send_transaction(tx, gas=2000000)
     if result["success"]:
-        new_winner = vrf_strategy_contract.functions.lastWinner().call()
+        new_winner = vrf_strategy_contract.functions.lastWinner().call(block_identifier=result["receipt"].blockNumber)
         return f"NEAR lottery draw successful! The new winner is {new_winner}."
     return f"Failed to trigger NEAR lottery draw: {result['error']}"
 
@@ -159,7 +135,10 @@ Thought: {agent_scratchpad}
 """
 prompt = PromptTemplate.from_template(prompt_template)
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, api_key=OPENAI_API_KEY)
+# Latency / error histograms for every tool, served on /metrics
+instrument_tools(tools)
+
+llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, api_key=OPENAI_API_KEY, callbacks=llm_callbacks("agent"))
 react_agent = create_react_agent(llm, tools, prompt)
 agent_executor = AgentExecutor(agent=react_agent, tools=tools, verbose=True, handle_parsing_errors=True)
 
@@ -168,6 +147,11 @@ app = FastAPI(title="NEAR Vault Manager Agent")
 class AgentRequest(BaseModel):
     command: str
 
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint: tool, RPC, provider and LLM latency histograms and error counts."""
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.post("/invoke-agent")
 async def invoke_agent(request: AgentRequest):
     try:
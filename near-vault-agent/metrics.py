@@ -0,0 +1,237 @@
+"""
+In-process latency histograms and counters, exported in Prometheus text format.
+
+The hot paths record into the module-level metrics below:
+
+  * agent_tool_*          every LangChain tool (wrapped by `instrument_tools`)
+  * agent_rpc_*           every JSON-RPC request the shared provider sends, per method / endpoint
+  * agent_provider_http_* every protocol-data HTTP request (Ref indexer, The Graph, ...)
+  * agent_llm_*           every LLM call (planner HTTP calls and LangChain chat models)
+
+Each `LatencyMetric` is a `<name>_seconds` histogram plus a `<name>_errors_total` counter.
+Agents serve `render()` on GET /metrics.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_values(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in sorted(values.items())]
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter", *self.samples()]
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_values(self.labelnames, labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames + ('le',), key + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(values[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class LatencyMetric:
+    """`<name>_seconds` histogram + `<name>_errors_total` counter sharing one label set."""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.latency = Histogram(f"{name}_seconds", f"{help_text} (latency)", labelnames)
+        self.errors = Counter(f"{name}_errors_total", f"{help_text} (errors)", labelnames)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.errors.inc(**labels)
+            raise
+        finally:
+            self.latency.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        return self.latency.render() + self.errors.render()
+
+
+class CallbackCounter:
+    """Counter read from existing stats at scrape time (e.g. cache hits)."""
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], Optional[Dict[str, float]]], labelname: str = "kind"):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+        self.labelname = labelname
+
+    def render(self) -> List[str]:
+        try:
+            values = self.read() or {}
+        except Exception:
+            values = {}
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"] + [
+            f"{self.name}{_format_labels((self.labelname,), (kind,))} {_format_value(value)}"
+            for kind, value in sorted(values.items())
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, metric):
+        """Add (or replace, e.g. on module reload) a metric; returns it."""
+        with self._lock:
+            self._metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+TOOL_METRICS = registry.register("tool", LatencyMetric("agent_tool", "LangChain tool invocations", ["tool"]))
+RPC_METRICS = registry.register("rpc", LatencyMetric("agent_rpc", "JSON-RPC requests sent to an endpoint", ["method", "endpoint"]))
+PROVIDER_METRICS = registry.register("provider", LatencyMetric("agent_provider_http", "Protocol data HTTP requests", ["provider"]))
+LLM_METRICS = registry.register("llm", LatencyMetric("agent_llm", "LLM calls", ["client", "model"]))
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render() -> str:
+    return registry.render()
+
+
+def instrument_tools(tools: Iterable[Any]):
+    """Time every LangChain tool's function in place (agent executor and direct `.invoke` alike)."""
+    for agent_tool in tools:
+        func = getattr(agent_tool, "func", None)
+        if func is None or getattr(func, "_instrumented", False):
+            continue
+        agent_tool.func = _timed_tool(agent_tool.name, func)
+
+
+def _timed_tool(name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with TOOL_METRICS.time(tool=name):
+            result = func(*args, **kwargs)
+        # Tools report failures as "❌ ..." strings instead of raising
+        if isinstance(result, str) and result.lstrip().startswith("❌"):
+            TOOL_METRICS.errors.inc(tool=name)
+        return result
+    wrapper._instrumented = True
+    return wrapper
+
+
+def llm_callbacks(client: str) -> List[Any]:
+    """LangChain callbacks that time chat-model calls under `client` (empty if LangChain is missing)."""
+    try:
+        from langchain_core.callbacks import BaseCallbackHandler
+    except ImportError:
+        return []
+
+    class LLMMetricsCallback(BaseCallbackHandler):
+        def __init__(self):
+            self._started: Dict[Any, Tuple[float, str]] = {}
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self._start(serialized, run_id, kwargs)
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            self._start(serialized, run_id, kwargs)
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            self._finish(run_id, error=False)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            self._finish(run_id, error=True)
+
+        def _start(self, serialized, run_id, kwargs):
+            params = kwargs.get("invocation_params") or {}
+            model = params.get("model_name") or params.get("model") or (serialized or {}).get("name", "unknown")
+            self._started[run_id] = (time.perf_counter(), str(model))
+
+        def _finish(self, run_id, error: bool):
+            started = self._started.pop(run_id, None)
+            if started is None:
+                return
+            LLM_METRICS.latency.observe(time.perf_counter() - started[0], client=client, model=started[1])
+            if error:
+                LLM_METRICS.errors.inc(client=client, model=started[1])
+
+    return [LLMMetricsCallback()]
+
+
+def _label_values(labelnames: Tuple[str, ...], labels: Dict[str, Any]) -> LabelValues:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: LabelValues) -> str:
+    if not labelnames:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
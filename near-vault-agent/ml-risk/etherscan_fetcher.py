@@ -0,0 +1,234 @@
+"""Paginated, cached and resumable Etherscan transaction fetcher"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+ETHERSCAN_API = os.getenv("ETHERSCAN_API", "https://api.etherscan.io/api")
+ETHERSCAN_API_KEY = os.getenv("ETHERSCAN_API_KEY", "8SD7GQBGWGTN5HCADISSATZDWSZD1Y82CC")
+DEFAULT_CACHE_PATH = os.getenv("ETHERSCAN_CACHE_PATH", "data/etherscan_cache.sqlite")
+
+RATE_LIMIT_MESSAGES = ("max rate limit", "rate limit reached")
+
+class RateLimiter:
+    """Spaces requests across all worker threads to at most `rate` per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class PageCache:
+    """SQLite store of raw txlist pages keyed by contract and block range, plus a per-contract sync cursor."""
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    contract TEXT NOT NULL,
+                    start_block INTEGER NOT NULL,
+                    end_block INTEGER NOT NULL,
+                    page INTEGER NOT NULL,
+                    row_count INTEGER NOT NULL,
+                    rows TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (contract, start_block, page)
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    contract TEXT PRIMARY KEY,
+                    last_block INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def last_block(self, contract):
+        with self._lock:
+            row = self._conn.execute("SELECT last_block FROM sync_state WHERE contract = ?", (contract,)).fetchone()
+        return row[0] if row else None
+
+    def store_page(self, contract, start_block, page, rows):
+        """Persist one page and advance the contract's cursor in the same transaction."""
+        end_block = max(int(r['blockNumber']) for r in rows)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (contract, start_block, end_block, page, len(rows), json.dumps(rows), time.time())
+            )
+            self._conn.execute(
+                "INSERT INTO sync_state VALUES (?, ?, ?) ON CONFLICT(contract) DO UPDATE SET "
+                "last_block = MAX(last_block, excluded.last_block), updated_at = excluded.updated_at",
+                (contract, end_block, time.time())
+            )
+
+    def load(self, contract, limit=None):
+        """Cached rows for `contract`, newest pages first; stops once about `limit` rows are read."""
+        rows = []
+        with self._lock:
+            pages = self._conn.execute(
+                "SELECT rows FROM pages WHERE contract = ? ORDER BY end_block DESC, start_block DESC, page DESC",
+                (contract,)
+            )
+            for (payload,) in pages:
+                rows.extend(json.loads(payload))
+                if limit and len(rows) >= limit:
+                    break
+        return rows
+
+class EtherscanFetcher:
+    """
+    Caches a contract's `txlist` pages locally. The first sync takes the newest pages
+    (newest-first), so a model trains on current traffic straight away; later runs page forward
+    in ascending block order from the last cached block, so retraining only downloads new
+    blocks. Many contracts are fetched on a small worker pool sharing one session and one
+    rate limiter.
+    """
+
+    def __init__(self, base_url=None, api_key=None, cache_path=None, page_size=1000, max_workers=4,
+                 rate_limit=None, max_pages=None, lookback_blocks=None, initial_pages=None, max_rows=None,
+                 backoff=1.0):
+        self.base_url = base_url or ETHERSCAN_API
+        self.api_key = api_key or ETHERSCAN_API_KEY
+        self.cache = PageCache(cache_path or DEFAULT_CACHE_PATH)
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate_limit or float(os.getenv("ETHERSCAN_RATE_LIMIT", 4)))
+        # Bound a single run; the cursor is saved so the next run continues where this one stopped
+        self.max_pages = max_pages or int(os.getenv("ETHERSCAN_MAX_PAGES", 20))
+        # First sync of a contract starts this many blocks back from the tip (0 = full history)
+        self.lookback_blocks = lookback_blocks if lookback_blocks is not None else int(os.getenv("ETHERSCAN_LOOKBACK_BLOCKS", 0))
+        # Newest pages downloaded on the first sync of a contract
+        self.initial_pages = initial_pages or int(os.getenv("ETHERSCAN_INITIAL_PAGES", 1))
+        # Newest rows returned by fetch() (0 = the whole cached history)
+        self.max_rows = max_rows if max_rows is not None else int(os.getenv("ETHERSCAN_MAX_ROWS", 5000))
+        # Seconds before the first rate-limit retry; doubles on every further attempt
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch(self, contract):
+        """Sync `contract` incrementally and return its newest `max_rows` cached txs as a DataFrame."""
+        contract = contract.lower()
+        self.sync(contract)
+        df = self.to_frame(self.cache.load(contract, limit=self.max_rows))
+        return df.head(self.max_rows).reset_index(drop=True) if self.max_rows else df
+
+    def fetch_many(self, contracts):
+        """Sync every contract on the worker pool. Returns {contract: DataFrame}."""
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="etherscan") as pool:
+            frames = pool.map(self.fetch, contracts)
+            return dict(zip(contracts, frames))
+
+    def sync(self, contract):
+        """Download every block after the cached cursor (newest pages on first sync). Returns the number of new pages."""
+        last_block = self.cache.last_block(contract)
+        if last_block is None:
+            return self._seed(contract)
+
+        # Re-read the last block: it may have been only partially indexed; rows are de-duplicated on load
+        cursor = last_block
+        page, new_pages = 1, 0
+        while new_pages < self.max_pages:
+            rows = self._get_txlist(contract, cursor, page)
+            if not rows:
+                break
+            self.cache.store_page(contract, cursor, page, rows)
+            new_pages += 1
+            if len(rows) < self.page_size:
+                break
+
+            next_cursor = int(rows[-1]['blockNumber'])
+            if next_cursor == cursor:
+                # A single block holds more than a page of txs - keep paging inside it
+                page += 1
+            else:
+                cursor, page = next_cursor, 1
+
+        if new_pages:
+            print(f"  {contract}: {new_pages} new page(s) cached up to block {self.cache.last_block(contract)}")
+        return new_pages
+
+    def _seed(self, contract):
+        """First sync: the newest `initial_pages` pages, newest-first. Sets the cursor to the tip."""
+        start_block = max(0, self._latest_block() - self.lookback_blocks) if self.lookback_blocks else 0
+        new_pages = 0
+        for page in range(1, self.initial_pages + 1):
+            rows = self._get_txlist(contract, start_block, page, sort='desc')
+            if not rows:
+                break
+            # Negative page numbers keep these keys apart from the ascending pages stored later
+            self.cache.store_page(contract, min(int(r['blockNumber']) for r in rows), -page, rows)
+            new_pages += 1
+            if len(rows) < self.page_size:
+                break
+
+        if new_pages:
+            print(f"  {contract}: {new_pages} newest page(s) cached up to block {self.cache.last_block(contract)}")
+        return new_pages
+
+    @staticmethod
+    def to_frame(rows):
+        if not rows:
+            return pd.DataFrame()
+        df = pd.DataFrame(rows).drop_duplicates(subset='hash', keep='last')
+        # Newest first, like the original txlist request
+        return df.sort_values(['blockNumber', 'transactionIndex'], key=lambda col: col.astype(int), ascending=False).reset_index(drop=True)
+
+    def _get_txlist(self, contract, start_block, page, sort='asc'):
+        data = self._request({
+            'module': 'account',
+            'action': 'txlist',
+            'address': contract,
+            'startblock': start_block,
+            'endblock': 99999999,
+            'page': page,
+            'offset': self.page_size,
+            'sort': sort,
+        })
+        if data.get('status') == '1':
+            return data['result']
+        if 'no transactions found' in str(data.get('message', '')).lower():
+            return []
+        raise RuntimeError(f"Etherscan error for {contract}: {data.get('message')} {data.get('result')}")
+
+    def _latest_block(self):
+        data = self._request({'module': 'proxy', 'action': 'eth_blockNumber'})
+        return int(data['result'], 16)
+
+    def _request(self, params, retries=5):
+        params = {**params, 'apikey': self.api_key}
+        for attempt in range(retries):
+            self.rate_limiter.wait()
+            r = self.session.get(self.base_url, params=params, timeout=30)
+            if r.status_code == 429:
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+            r.raise_for_status()
+            data = r.json()
+            if any(msg in str(data.get('result', '')).lower() for msg in RATE_LIMIT_MESSAGES):
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+            return data
+        raise RuntimeError(f"Etherscan rate limit: gave up after {retries} attempts")
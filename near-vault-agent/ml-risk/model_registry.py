@@ -0,0 +1,142 @@
+"""Lazily loaded, hot-reloadable registry for the anomaly risk model"""
+import hashlib
+import io
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+import joblib
+
+DEFAULT_MODEL_PATH = "models/anomaly_risk_model.joblib"
+
+@dataclass(frozen=True)
+class ModelVersion:
+    """One immutable loaded model. Scoring calls hold a reference for their whole run."""
+    model: Any
+    scaler: Any
+    baseline_scores: Any
+    baseline_min: float
+    baseline_max: float
+    model_hash: str
+    path: str
+    mtime: float
+    size: int
+    loaded_at: float
+
+class ModelRegistry:
+    """
+    Loads the joblib model on first use and watches the file's mtime/size (then content hash)
+    every `check_interval` seconds. A changed model is loaded on the side and swapped in with a
+    single reference assignment, so in-flight scoring finishes on the version it started with.
+    """
+
+    def __init__(self, model_path=None, check_interval=None):
+        self.model_path = model_path or os.getenv("RISK_MODEL_PATH", DEFAULT_MODEL_PATH)
+        self.check_interval = check_interval if check_interval is not None else float(os.getenv("RISK_MODEL_CHECK_INTERVAL", 30))
+        self._version: Optional[ModelVersion] = None
+        self._load_lock = threading.Lock()
+        self._last_check = 0.0
+        self._listeners: List[Callable[[ModelVersion], None]] = []
+        self.reloads = 0
+
+    def model_exists(self):
+        return os.path.exists(self.model_path)
+
+    def add_listener(self, callback):
+        """Called with the new ModelVersion after every swap (e.g. to invalidate score caches)."""
+        self._listeners.append(callback)
+
+    def active(self) -> ModelVersion:
+        """Current model version, loading it on first use and picking up changes on disk."""
+        if self._version is None:
+            with self._load_lock:
+                if self._version is None:
+                    self._swap(self._load())
+                    self._last_check = time.time()
+            return self._version
+
+        # Only one thread checks the file; everyone else keeps scoring on the active version
+        if time.time() - self._last_check >= self.check_interval and self._load_lock.acquire(blocking=False):
+            try:
+                self._last_check = time.time()
+                self._reload_if_changed()
+            finally:
+                self._load_lock.release()
+        return self._version
+
+    def reload(self, force=False):
+        """Check the model file now (force=True reloads even if unchanged)."""
+        with self._load_lock:
+            self._last_check = time.time()
+            if force or self._version is None:
+                self._swap(self._load())
+            else:
+                self._reload_if_changed()
+        return self._version
+
+    def version_info(self):
+        version = self._version
+        if version is None:
+            return {"loaded": False, "path": self.model_path}
+        return {
+            "loaded": True,
+            "model_hash": version.model_hash,
+            "path": version.path,
+            "loaded_at": version.loaded_at,
+            "reloads": self.reloads
+        }
+
+    def _reload_if_changed(self):
+        current = self._version
+        try:
+            stat = os.stat(self.model_path)
+        except OSError as e:
+            print(f"⚠️ ML model file unavailable, keeping {current.model_hash}: {e}")
+            return
+        if stat.st_mtime == current.mtime and stat.st_size == current.size:
+            return
+
+        try:
+            version = self._load()
+        except Exception as e:
+            # e.g. the file is still being written - retry on the next check
+            print(f"⚠️ ML model reload failed, keeping {current.model_hash}: {e}")
+            return
+
+        if version.model_hash == current.model_hash:
+            # Touched but not changed - just remember the new stamp
+            self._version = version
+            return
+        self._swap(version)
+        print(f"🔄 ML Risk Model: swapped {current.model_hash} -> {version.model_hash}")
+
+    def _load(self) -> ModelVersion:
+        stat = os.stat(self.model_path)
+        with open(self.model_path, "rb") as f:
+            data = f.read()
+        # Hash and load the same bytes so the version id always matches the loaded model
+        model_data = joblib.load(io.BytesIO(data))
+        baseline_scores = model_data['baseline_scores']
+        return ModelVersion(
+            model=model_data['model'],
+            scaler=model_data['scaler'],
+            baseline_scores=baseline_scores,
+            baseline_min=min(baseline_scores),
+            baseline_max=max(baseline_scores),
+            model_hash=hashlib.sha256(data).hexdigest()[:16],
+            path=self.model_path,
+            mtime=stat.st_mtime,
+            size=stat.st_size,
+            loaded_at=time.time()
+        )
+
+    def _swap(self, version: ModelVersion):
+        first_load = self._version is None
+        self._version = version
+        if not first_load:
+            self.reloads += 1
+        print(f"🧠 ML Risk Model: LOADED ({version.model_hash})")
+        for callback in self._listeners:
+            callback(version)
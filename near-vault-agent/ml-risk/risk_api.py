@@ -1,61 +1,154 @@
 """Aurora ML Risk API"""
 import os
-import joblib
+import threading
+from collections import OrderedDict
 import numpy as np
+from model_registry import ModelRegistry
+
+LOW_RISK_MAX = 0.4
+MEDIUM_RISK_MAX = 0.7
+
+def risk_level(risk_score):
+    return "LOW" if risk_score < LOW_RISK_MAX else "MEDIUM" if risk_score < MEDIUM_RISK_MAX else "HIGH"
+
+# Features are seeded from the address, so they only change when the feature pipeline does
+FEATURE_SNAPSHOT_ID = "address-seeded-v1"
+
+class RiskScoreCache:
+    """Thread-safe LRU of risk scores keyed on (address, model hash, feature snapshot id)."""
+    
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize or int(os.getenv("RISK_SCORE_CACHE_SIZE", 1024))
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        with self._lock:
+            if key in self._scores:
+                self._scores.move_to_end(key)
+                self.hits += 1
+                return self._scores[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key, risk_score):
+        with self._lock:
+            self._scores[key] = risk_score
+            self._scores.move_to_end(key)
+            while len(self._scores) > self.maxsize:
+                self._scores.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._scores.clear()
+    
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._scores), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
 
 class StrategyRiskAPI:
-    def __init__(self):
-        self.model_path = "models/anomaly_risk_model.joblib"
-        self._load_model()
+    def __init__(self, model_path=None, registry=None):
+        # The model itself is loaded lazily by the registry on the first scoring call
+        self.registry = registry or ModelRegistry(model_path)
+        self.model_path = self.registry.model_path
+        self.feature_snapshot_id = FEATURE_SNAPSHOT_ID
+        self.score_cache = RiskScoreCache()
+        # Scores from a previous model must never be served after a reload
+        self.registry.add_listener(lambda version: self.score_cache.clear())
+    
+    @property
+    def model_hash(self):
+        return self.registry.active().model_hash
     
-    def _load_model(self):
-        model_data = joblib.load(self.model_path)
-        self.model = model_data['model']
-        self.scaler = model_data['scaler']
-        self.baseline_scores = model_data['baseline_scores']
-        print("🧠 ML Risk Model: LOADED")
+    def reload_model(self):
+        """Reload the joblib model from disk and invalidate cached scores."""
+        self.registry.reload(force=True)
     
     def assess_strategy_risk(self, strategy_address):
+        return float(self.assess_many([strategy_address])["risk_scores"][0])
+    
+    def assess_many(self, strategy_addresses):
+        """Score every strategy in one scaler/forest pass. Returns scores (np.ndarray) and risk levels."""
+        if not strategy_addresses:
+            return {"addresses": [], "risk_scores": np.array([]), "risk_levels": []}
+
+        # Pin one model version for the whole call, even if a reload swaps it mid-way
+        version = self.registry.active()
+        keys = [(address, version.model_hash, self.feature_snapshot_id) for address in strategy_addresses]
+        risk_scores = np.array([self.score_cache.get(key) for key in keys], dtype=float)
+        
+        # Only cache misses go through the model, still as a single batch
+        missing = np.flatnonzero(np.isnan(risk_scores))
+        if len(missing):
+            features = np.vstack([self._strategy_features(strategy_addresses[i]) for i in missing])
+            
+            features_scaled = version.scaler.transform(features)
+            anomaly_scores = version.model.decision_function(features_scaled)
+            risk_scores[missing] = self._to_risk_scores(anomaly_scores, version)
+            
+            for i in missing:
+                self.score_cache.put(keys[i], float(risk_scores[i]))
+        
+        return {
+            "addresses": list(strategy_addresses),
+            "risk_scores": risk_scores,
+            "risk_levels": [risk_level(score) for score in risk_scores]
+        }
+    
+    def _strategy_features(self, strategy_address):
         # Simulate features based on address
         address_int = int(strategy_address, 16) if strategy_address.startswith('0x') else hash(strategy_address)
-        np.random.seed(address_int % 2**32)
+        # Per-address RandomState gives the same draws as np.random.seed() without touching global state
+        rng = np.random.RandomState(address_int % 2**32)
         
-        features = np.array([
-            np.random.uniform(0.001, 0.1),
-            np.random.uniform(0.00001, 0.01),
-            np.random.uniform(0.00001, 0.1),
-            np.random.uniform(0, 20),
-            np.random.uniform(0, 100),
-            np.random.randint(10, 200),
-            np.random.randint(5, 150),
-            np.random.uniform(0, 24),
-            np.random.uniform(0, 168),
-            np.random.uniform(0, 1),
-            np.random.uniform(0, 1),
-            np.random.uniform(0, 1),
-            np.random.uniform(0, 1),
-            np.random.uniform(0, 1),
-            np.random.uniform(0, 2),
-            np.random.uniform(0, 20),
-            np.random.uniform(0, 0.5),
-            np.random.uniform(0, 10)
+        return np.array([
+            rng.uniform(0.001, 0.1),
+            rng.uniform(0.00001, 0.01),
+            rng.uniform(0.00001, 0.1),
+            rng.uniform(0, 20),
+            rng.uniform(0, 100),
+            rng.randint(10, 200),
+            rng.randint(5, 150),
+            rng.uniform(0, 24),
+            rng.uniform(0, 168),
+            rng.uniform(0, 1),
+            rng.uniform(0, 1),
+            rng.uniform(0, 1),
+            rng.uniform(0, 1),
+            rng.uniform(0, 1),
+            rng.uniform(0, 2),
+            rng.uniform(0, 20),
+            rng.uniform(0, 0.5),
+            rng.uniform(0, 10)
         ])
-        
-        features_scaled = self.scaler.transform(features.reshape(1, -1))
-        anomaly_score = self.model.decision_function(features_scaled)[0]
-        
+    
+    def _to_risk_scores(self, anomaly_scores, version):
         # Convert to risk score
-        min_score = min(self.baseline_scores)
-        max_score = max(self.baseline_scores)
+        min_score, max_score = version.baseline_min, version.baseline_max
         
-        if anomaly_score < min_score:
-            risk_score = 0.8
-        elif anomaly_score > max_score:
-            risk_score = 0.2
-        else:
-            risk_score = 0.7 - 0.5 * (anomaly_score - min_score) / (max_score - min_score)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            risk_scores = 0.7 - 0.5 * (anomaly_scores - min_score) / (max_score - min_score)
+        # A degenerate baseline (min == max) or a non-finite model output means maximum risk
+        risk_scores = np.where(np.isfinite(risk_scores), risk_scores, 1.0)
+        risk_scores = np.where(anomaly_scores < min_score, 0.8, risk_scores)
+        risk_scores = np.where(anomaly_scores > max_score, 0.2, risk_scores)
         
-        return max(0.0, min(1.0, risk_score))
+        return np.clip(risk_scores, 0.0, 1.0)
+    
+    def get_detailed_assessment(self, strategy_address):
+        """Score and level as a dict; scoring failures come back under "error"."""
+        try:
+            risk_score = self.assess_strategy_risk(strategy_address)
+        except Exception as e:
+            return {"address": strategy_address, "error": str(e)}
+        return {
+            "address": strategy_address,
+            "risk_score": round(risk_score, 4),
+            "risk_level": risk_level(risk_score),
+            "model_hash": self.model_hash
+        }
     
     def get_risk_breakdown(self, strategy_address):
         risk_score = self.assess_strategy_risk(strategy_address)
@@ -67,4 +160,6 @@ if __name__ == "__main__":
     test_address = "0x28F6D4Fe5648BbF2506E56a5b7f9D5522C3999f1"
     risk = api.assess_strategy_risk(test_address)
     print(f"Test risk: {risk:.3f}")
+    batch = api.assess_many([test_address, "0x3e2A4B5c6D7e8F9a0B1c2D3e4F5a6B7c8D9e0F1a"])
+    print(f"Batch risk: {batch['risk_scores']} {batch['risk_levels']}")
     print("✅ Risk API working!")
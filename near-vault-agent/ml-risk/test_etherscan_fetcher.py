@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Tests for the Etherscan fetcher against a local stand-in for the Etherscan API.
+
+    cd near-vault-agent/ml-risk && python -m pytest -q test_etherscan_fetcher.py
+"""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from etherscan_fetcher import EtherscanFetcher
+
+CONTRACT = "0x00000000000000000000000000000000000000aa"
+
+
+class StubEtherscan:
+    """In-process Etherscan API: `txlist` (startblock, page/offset, sort) and `eth_blockNumber`."""
+
+    def __init__(self):
+        self.txs = []
+        self.requests = []
+        self.rate_limited = 0  # next N requests get Etherscan's "Max rate limit reached" payload
+        self.too_many = 0  # next N requests get HTTP 429
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                stub.requests.append(params)
+                if stub.too_many:
+                    stub.too_many -= 1
+                    return self._send(429, {})
+                if stub.rate_limited:
+                    stub.rate_limited -= 1
+                    return self._send(200, {"status": "0", "message": "NOTOK", "result": "Max rate limit reached"})
+                self._send(200, stub.respond(params))
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def add_block(self, block, count):
+        for index in range(count):
+            self.txs.append({
+                "hash": f"0x{block:08x}{index:04x}",
+                "blockNumber": str(block),
+                "transactionIndex": str(index),
+                "timeStamp": str(1_700_000_000 + block),
+                "from": f"0x{index:040x}",
+                "value": "0",
+                "input": "0x",
+                "gasPrice": "1",
+                "isError": "0",
+            })
+
+    def respond(self, params):
+        if params.get("action") == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": 1, "result": hex(max(int(t["blockNumber"]) for t in self.txs))}
+        start = int(params["startblock"])
+        page, offset = int(params["page"]), int(params["offset"])
+        rows = sorted(
+            (t for t in self.txs if int(t["blockNumber"]) >= start),
+            key=lambda t: (int(t["blockNumber"]), int(t["transactionIndex"])),
+            reverse=params.get("sort") == "desc"
+        )[(page - 1) * offset:page * offset]
+        if not rows:
+            return {"status": "0", "message": "No transactions found", "result": []}
+        return {"status": "1", "message": "OK", "result": rows}
+
+    def txlist_requests(self):
+        return [r for r in self.requests if r.get("action") == "txlist"]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class EtherscanFetcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = StubEtherscan()
+        self.tmp = tempfile.TemporaryDirectory()
+        for block in range(100, 130):
+            self.stub.add_block(block, 2)
+
+    def tearDown(self):
+        self.stub.close()
+        self.tmp.cleanup()
+
+    def fetcher(self, **kwargs):
+        options = dict(base_url=self.stub.url, api_key="test", page_size=5, max_workers=1, rate_limit=1000,
+                       max_pages=20, lookback_blocks=0, initial_pages=2, max_rows=0, backoff=0.01)
+        options.update(kwargs)
+        return EtherscanFetcher(cache_path=os.path.join(self.tmp.name, "cache.sqlite"), **options)
+
+    def test_first_sync_takes_newest_pages(self):
+        df = self.fetcher().fetch(CONTRACT)
+
+        self.assertEqual(len(df), 10)
+        self.assertEqual(df["blockNumber"].astype(int).max(), 129)
+        self.assertEqual(df["blockNumber"].astype(int).min(), 125)
+        self.assertTrue(all(r["sort"] == "desc" for r in self.stub.txlist_requests()))
+        self.assertEqual(self.fetcher().cache.last_block(CONTRACT), 129)
+
+    def test_resumes_from_cursor_and_pages_through_a_full_block(self):
+        fetcher = self.fetcher()
+        fetcher.sync(CONTRACT)
+        self.stub.add_block(130, 12)  # more txs than one page holds
+        self.stub.add_block(131, 3)
+        self.stub.requests.clear()
+
+        df = fetcher.fetch(CONTRACT)
+
+        asc = self.stub.txlist_requests()
+        self.assertEqual(asc[0]["startblock"], "129")
+        self.assertTrue(all(r["sort"] == "asc" for r in asc))
+        self.assertIn(("130", "2"), [(r["startblock"], r["page"]) for r in asc])
+        self.assertEqual(len(df), 10 + 12 + 3)
+        self.assertEqual(df["hash"].nunique(), len(df))
+        self.assertEqual(fetcher.cache.last_block(CONTRACT), 131)
+
+        # Nothing new: one request at the cursor, no duplicate rows
+        self.stub.requests.clear()
+        self.assertEqual(len(fetcher.fetch(CONTRACT)), 25)
+        self.assertEqual(len(self.stub.txlist_requests()), 1)
+
+    def test_max_pages_bounds_a_run_and_the_next_run_continues(self):
+        fetcher = self.fetcher(max_pages=1)
+        fetcher.sync(CONTRACT)
+        for block in range(130, 140):
+            self.stub.add_block(block, 2)
+
+        fetcher.sync(CONTRACT)
+        first_run = fetcher.cache.last_block(CONTRACT)
+        self.assertLess(first_run, 139)
+        while fetcher.sync(CONTRACT) and fetcher.cache.last_block(CONTRACT) < 139:
+            pass
+        self.assertEqual(fetcher.cache.last_block(CONTRACT), 139)
+        self.assertEqual(len(fetcher.fetch(CONTRACT)), 10 + 20)
+
+    def test_retries_rate_limited_requests(self):
+        self.stub.rate_limited = 2
+        self.stub.too_many = 1
+
+        df = self.fetcher().fetch(CONTRACT)
+
+        self.assertEqual(len(df), 10)
+        # eth_blockNumber is not needed without a lookback, so the 3 rejected requests were all txlist
+        self.assertEqual(len(self.stub.txlist_requests()), 2 + 3)
+
+    def test_gives_up_after_repeated_rate_limits(self):
+        self.stub.rate_limited = 10
+        with self.assertRaises(RuntimeError):
+            self.fetcher().sync(CONTRACT)
+
+    def test_fetch_returns_only_the_newest_rows(self):
+        df = self.fetcher(initial_pages=6, max_rows=7).fetch(CONTRACT)
+
+        self.assertEqual(len(df), 7)
+        self.assertEqual(df["blockNumber"].astype(int).tolist(), [129, 129, 128, 128, 127, 127, 126])
+
+    def test_lookback_limits_the_first_sync(self):
+        fetcher = self.fetcher(lookback_blocks=3, initial_pages=10)
+        df = fetcher.fetch(CONTRACT)
+
+        self.assertEqual(df["blockNumber"].astype(int).min(), 126)
+        self.assertEqual(len(df), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
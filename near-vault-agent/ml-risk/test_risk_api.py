@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for StrategyRiskAPI scoring edge cases.
+
+    cd near-vault-agent/ml-risk && python -m pytest -q test_risk_api.py
+"""
+
+import math
+import os
+import tempfile
+import unittest
+
+import joblib
+import numpy as np
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+
+from risk_api import StrategyRiskAPI
+
+ADDRESSES = ["0x28F6D4Fe5648BbF2506E56a5b7f9D5522C3999f1", "0x3e2A4B5c6D7e8F9a0B1c2D3e4F5a6B7c8D9e0F1a"]
+SHIPPED_MODEL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "anomaly_risk_model.joblib")
+
+
+class ConstantBaselineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def api_with_constant_baseline(self):
+        """Model whose baseline_scores all equal the anomaly score of ADDRESSES[0] (min == max)."""
+        probe = StrategyRiskAPI.__new__(StrategyRiskAPI)
+        features = np.vstack([probe._strategy_features(a) for a in ADDRESSES])
+        training = np.random.RandomState(0).normal(size=(64, features.shape[1]))
+        scaler = StandardScaler().fit(training)
+        model = IsolationForest(random_state=42).fit(scaler.transform(training))
+        score = float(model.decision_function(scaler.transform(features[:1]))[0])
+
+        path = os.path.join(self.tmp.name, "constant.joblib")
+        joblib.dump({"model": model, "scaler": scaler, "baseline_scores": [score] * 5}, path)
+        return StrategyRiskAPI(path), score
+
+    def test_degenerate_baseline_scores_as_maximum_risk(self):
+        api, _ = self.api_with_constant_baseline()
+
+        result = api.assess_many(ADDRESSES)
+
+        self.assertTrue(np.all(np.isfinite(result["risk_scores"])))
+        self.assertEqual(result["risk_scores"][0], 1.0)
+        self.assertEqual(result["risk_levels"][0], "HIGH")
+        self.assertIn(result["risk_scores"][1], (0.8, 0.2))
+
+    def test_degenerate_score_is_cached(self):
+        api, _ = self.api_with_constant_baseline()
+
+        api.assess_strategy_risk(ADDRESSES[0])
+        api.assess_strategy_risk(ADDRESSES[0])
+
+        self.assertEqual(api.score_cache.stats()["hits"], 1)
+
+    def test_detailed_assessment_is_json_safe(self):
+        api, _ = self.api_with_constant_baseline()
+
+        result = api.get_detailed_assessment(ADDRESSES[0])
+
+        self.assertNotIn("error", result)
+        self.assertEqual(result["risk_score"], 1.0)
+        self.assertEqual(result["risk_level"], "HIGH")
+
+    @unittest.skipUnless(os.path.exists(SHIPPED_MODEL), "shipped model not present")
+    def test_shipped_model_never_returns_nan(self):
+        result = StrategyRiskAPI(SHIPPED_MODEL).assess_many(ADDRESSES)
+
+        self.assertFalse(any(math.isnan(score) for score in result["risk_scores"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
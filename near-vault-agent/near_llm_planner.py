@@ -4,13 +4,20 @@ Enhanced NEAR LLM Planner with OpenAI support for NEAR-specific strategy recomme
 
 import json
 import os
+import threading
 import requests
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 from langchain.tools import tool
+from llm_cache import LLMResponseCache
+from http_session import shared_session, circuit_breaker
+from metrics import LLM_METRICS
 
 load_dotenv()
 
+# Shared by every planner instance so hit/miss counters survive across tool calls
+strategy_cache = LLMResponseCache("near_planner")
+
 class NearOpenAILLMPlanner:
     """LLM Planner using OpenAI for NEAR-specific strategy generation"""
     
@@ -29,6 +36,10 @@ class NearOpenAILLMPlanner:
         
         print(f"🤖 NEAR LLM Provider: {self.provider}")
         print(f"🧠 Model: {self.model}")
+        self.cache = strategy_cache
+        # Keep-alive connection pool and passive availability tracking, shared by all planners
+        self.session = shared_session("openai")
+        self.breaker = circuit_breaker("openai")
     
     def generate_near_vault_strategy(self, market_data: Dict[str, Any], vault_status: Dict[str, Any]) -> Dict[str, Any]:
         """Generate NEAR vault management strategy using OpenAI"""
@@ -96,39 +107,53 @@ Respond with ONLY valid JSON in this exact format:
 }}
 """
         
-        return self._generate_with_openai(prompt)
+        # Near-identical market data (small APY/TVL jitter) reuses the last cached answer
+        cache_key = self.cache.key(self.model, self.temperature, self.max_tokens, market_data, vault_status)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        return self._generate_with_openai(prompt, cache_key)
     
-    def _generate_with_openai(self, prompt: str) -> Dict[str, Any]:
+    def _generate_with_openai(self, prompt: str, cache_key: Optional[str] = None) -> Dict[str, Any]:
         """Generate strategy using OpenAI API"""
+        if not self.breaker.allow():
+            print(f"🔌 OpenAI circuit {self.breaker.state}, using fallback NEAR strategy")
+            return self._fallback_near_strategy()
+        
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {
-                            "role": "system", 
-                            "content": "You are a NEAR DeFi vault manager expert. Respond only with valid JSON strategy objects optimized for NEAR blockchain. No additional text."
-                        },
-                        {
-                            "role": "user", 
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": self.temperature,
-                    "max_tokens": self.max_tokens
-                },
-                timeout=30
-            )
+            with LLM_METRICS.time(client="near_planner", model=self.model):
+                response = self.session.post(
+                    "https://api.openai.com/v1/chat/completions",
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json"
+                    },
+                    json={
+                        "model": self.model,
+                        "messages": [
+                            {
+                                "role": "system", 
+                                "content": "You are a NEAR DeFi vault manager expert. Respond only with valid JSON strategy objects optimized for NEAR blockchain. No additional text."
+                            },
+                            {
+                                "role": "user", 
+                                "content": prompt
+                            }
+                        ],
+                        "temperature": self.temperature,
+                        "max_tokens": self.max_tokens
+                    },
+                    timeout=30
+                )
             
             if response.status_code != 200:
+                LLM_METRICS.errors.inc(client="near_planner", model=self.model)
                 print(f"❌ OpenAI API error: {response.status_code} - {response.text}")
+                self.breaker.record_failure()
                 return self._fallback_near_strategy()
             
+            self.breaker.record_success()
             result = response.json()
             content = result['choices'][0]['message']['content']
             
@@ -136,8 +161,18 @@ Respond with ONLY valid JSON in this exact format:
             
             # Extract JSON from response
             strategy = self._extract_json_from_response(content)
-            return strategy if strategy else self._fallback_near_strategy()
+            if not strategy:
+                return self._fallback_near_strategy()
             
+            # Only real model answers are cached, never the fallback
+            if cache_key:
+                self.cache.put(cache_key, strategy)
+            return strategy
+            
+        except requests.RequestException as e:
+            print(f"⚠️ OpenAI NEAR generation failed: {e}")
+            self.breaker.record_failure()
+            return self._fallback_near_strategy()
         except Exception as e:
             print(f"⚠️ OpenAI NEAR generation failed: {e}")
             return self._fallback_near_strategy()
@@ -187,10 +222,14 @@ Respond with ONLY valid JSON in this exact format:
             ]
         }
     
+    def is_available(self) -> bool:
+        """Passive availability from recent real calls (no network request)"""
+        return self.breaker.available()
+    
     def check_api_available(self) -> bool:
-        """Check if OpenAI API is accessible"""
+        """Actively probe the OpenAI API (connection tests only; advisor calls use is_available)"""
         try:
-            response = requests.post(
+            response = self.session.post(
                 "https://api.openai.com/v1/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -209,6 +248,23 @@ Respond with ONLY valid JSON in this exact format:
             return False
 
 
+_planner: Optional[NearOpenAILLMPlanner] = None
+_planner_lock = threading.Lock()
+
+def get_planner() -> NearOpenAILLMPlanner:
+    """Long-lived NEAR planner shared by every advisor call"""
+    global _planner
+    with _planner_lock:
+        if _planner is None:
+            _planner = NearOpenAILLMPlanner({
+                'provider': 'openai',
+                'model': 'gpt-4o-mini',
+                'temperature': 0.1,
+                'max_tokens': 1500
+            })
+        return _planner
+
+
 # Enhanced agent tool using NEAR-specific OpenAI LLM planner
 @tool
 def near_ai_strategy_advisor(current_situation: str = "general_analysis") -> str:
@@ -220,19 +276,11 @@ def near_ai_strategy_advisor(current_situation: str = "general_analysis") -> str
     """
     print(f"Tool: near_ai_strategy_advisor - Situation: {current_situation}")
     
-    # Initialize NEAR-specific OpenAI LLM planner
-    llm_config = {
-        'provider': 'openai',
-        'model': 'gpt-4o-mini',
-        'temperature': 0.1,
-        'max_tokens': 1500
-    }
-    
     try:
-        planner = NearOpenAILLMPlanner(llm_config)
+        planner = get_planner()
         
-        # Check if OpenAI API is available
-        if not planner.check_api_available():
+        # Passive check: the circuit only opens after real calls have failed
+        if not planner.is_available():
             return """
 ❌ OpenAI API not available for NEAR strategies. 
 
@@ -0,0 +1,52 @@
+"""
+Concurrent fan-out over the Aurora protocol data providers.
+
+All providers are fetched at once on a shared pool and collected under one global
+deadline, so the worst case is the deadline (or the slowest single provider) instead of
+the sum of every provider's timeout. A provider that misses the deadline or raises is
+replaced by its fallback payload; its fetch keeps running and warms the provider cache
+for the next caller.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# name -> (fetch, fallback)
+ProviderSources = Dict[str, Tuple[Callable[[], Dict[str, Any]], Callable[[], Dict[str, Any]]]]
+
+
+class ProtocolDataAggregator:
+    """Fetches every protocol's data in parallel under a global deadline."""
+
+    def __init__(self, sources: ProviderSources, deadline: Optional[float] = None, max_workers: Optional[int] = None):
+        self.sources = sources
+        self.deadline = deadline if deadline is not None else float(os.getenv("PROTOCOL_DATA_DEADLINE", 8))
+        # Sized so a full round of late fetches can't starve the next round
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or 2 * len(sources), thread_name_prefix="protocol-data")
+
+    def fetch_all(self, deadline: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Return {protocol: data} for every source, in registration order."""
+        deadline = self.deadline if deadline is None else deadline
+        started = time.time()
+        futures = {name: self._pool.submit(fetch) for name, (fetch, _) in self.sources.items()}
+        wait(futures.values(), timeout=deadline)
+
+        results = {}
+        for name, future in futures.items():
+            fallback = self.sources[name][1]
+            if not future.done():
+                print(f"⏱️ {name} missed the {deadline:.0f}s deadline, using fallback data")
+                results[name] = {**fallback(), "deadline_exceeded": True}
+            elif future.exception() is not None:
+                print(f"⚠️ {name} fetch failed, using fallback data: {future.exception()}")
+                results[name] = fallback()
+            else:
+                results[name] = future.result()
+
+        print(f"📡 Protocol data collected in {time.time() - started:.2f}s")
+        return results
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,116 @@
+"""
+TTL + stale-while-revalidate cache for the Aurora protocol data providers.
+
+Fresh entries are served straight from memory. Entries past their TTL but inside the
+stale window are still served immediately while a single background thread refreshes
+them. Concurrent callers that find no usable entry all wait on the same in-flight fetch,
+so a burst of dashboard polls costs one upstream request.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+
+class ProviderCache:
+    """Single-entry SWR cache wrapping one provider fetch function."""
+
+    def __init__(self, name: str, ttl: float, stale_ttl: Optional[float] = None, fallback_ttl: Optional[float] = None):
+        self.name = name
+        self.ttl = ttl
+        # How long past expiry a value may still be served while it is refreshed in the background
+        self.stale_ttl = stale_ttl if stale_ttl is not None else float(os.getenv("PROVIDER_CACHE_STALE_TTL", 600))
+        # Fallback payloads (upstream down) expire sooner so recovery is picked up quickly
+        self.fallback_ttl = fallback_ttl if fallback_ttl is not None else min(ttl, 15)
+
+        self._lock = threading.Lock()
+        self._value: Optional[Dict[str, Any]] = None
+        self._fetched_at = 0.0
+        self._in_flight: Optional[Future] = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cached payload (annotated with its age), fetching or refreshing as needed."""
+        with self._lock:
+            age = time.time() - self._fetched_at
+            if self._value is not None:
+                ttl = self.fallback_ttl if self._value.get("status") == "fallback" else self.ttl
+                if age < ttl:
+                    self.hits += 1
+                    return self._annotate(self._value, age, cached=True)
+                if age < ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    if self._in_flight is None:
+                        self._start_fetch(fetch, background=True)
+                    return self._annotate(self._value, age, cached=True, stale=True)
+
+            # Nothing usable - join the in-flight fetch or become the fetcher
+            self.misses += 1
+            future = self._in_flight
+            owner = future is None
+            if owner:
+                future = self._start_fetch(fetch, background=False)
+
+        if owner:
+            self._run_fetch(fetch, future, background=False)
+        value = future.result()
+        return self._annotate(value, 0.0, cached=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+            self._fetched_at = 0.0
+
+    def version(self) -> Optional[float]:
+        """Fetch time of the cached payload while it is fresh (None when the next get() may refetch)."""
+        with self._lock:
+            if self._value is None:
+                return None
+            ttl = self.fallback_ttl if self._value.get("status") == "fallback" else self.ttl
+            return self._fetched_at if time.time() - self._fetched_at < ttl else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ttl": self.ttl,
+                "age_seconds": round(time.time() - self._fetched_at, 1) if self._value is not None else None,
+                "refreshing": self._in_flight is not None,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses
+            }
+
+    def _start_fetch(self, fetch: Callable[[], Dict[str, Any]], background: bool) -> Future:
+        """Register an in-flight fetch. Must be called with the lock held."""
+        future: Future = Future()
+        self._in_flight = future
+        if background:
+            threading.Thread(
+                target=self._run_fetch, args=(fetch, future, True), name=f"{self.name}-refresh", daemon=True
+            ).start()
+        return future
+
+    def _run_fetch(self, fetch: Callable[[], Dict[str, Any]], future: Future, background: bool):
+        try:
+            value = fetch()
+        except Exception as e:
+            with self._lock:
+                self._in_flight = None
+            if background:
+                print(f"⚠️ Background refresh of {self.name} failed, keeping stale data: {e}")
+            future.set_exception(e)
+            return
+        with self._lock:
+            self._value = value
+            self._fetched_at = time.time()
+            self._in_flight = None
+        future.set_result(value)
+
+    @staticmethod
+    def _annotate(value: Dict[str, Any], age: float, cached: bool, stale: bool = False) -> Dict[str, Any]:
+        # Copy so callers can't mutate the shared cached payload
+        return {**value, "cache_age_seconds": round(age, 1), "cached": cached, "stale": stale}
@@ -0,0 +1,214 @@
+"""
+Block-scoped read-through cache for contract view calls (`eth_call`).
+
+The shared RPC provider routes every `eth_call` through this cache. Entries are keyed by
+(contract, calldata = selector + encoded args, sender, block number), so a value can never
+outlive the block it was read at:
+
+  * explicit block numbers are cached as-is;
+  * "latest" reads are keyed by the current head, and the call is sent for that block number
+    (not "latest"), so the cached value is always the state at its key's block. Inside
+    `pinned_block()` (or a function wrapped with `block_pinned`) the head is resolved once and
+    reused for the whole scope, so one tool invocation reads a single block. Outside a scope
+    the head is re-checked at most every `block_ttl` seconds;
+  * a newer head drops entries from older blocks, and sending a transaction or seeing it
+    mined bumps the cache epoch so pinned scopes re-resolve and read the new state.
+
+Identical concurrent misses are coalesced: one request goes to the RPC, the rest wait for it.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+WRITE_METHODS = {"eth_sendRawTransaction", "eth_sendTransaction"}
+UNCACHEABLE_TAGS = {"pending"}
+
+CacheKey = Tuple[str, str, str, int]
+# Sends a JSON-RPC request with the given params and returns the response dict
+Send = Callable[[List[Any]], Dict[str, Any]]
+
+
+class _Pin:
+    """Block resolved for one request scope; re-resolved after a write."""
+
+    def __init__(self):
+        self.block: Optional[int] = None
+        self.epoch = -1
+
+
+_pinned: ContextVar[Optional[_Pin]] = ContextVar("pinned_block", default=None)
+
+
+@contextmanager
+def pinned_block():
+    """Serve every "latest" eth_call in this scope from one block."""
+    token = _pinned.set(_Pin())
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def block_pinned(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap `fn` so it runs in its own pinned-block scope (e.g. on a worker thread)."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with pinned_block():
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+class BlockReadCache:
+    """eth_call results keyed by block number; see the module docstring for the rules."""
+
+    def __init__(self, fetch_head: Callable[[], int], block_ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None, keep_blocks: int = 2, wait_timeout: float = 10.0):
+        self.fetch_head = fetch_head
+        self.block_ttl = block_ttl if block_ttl is not None else float(os.getenv("RPC_BLOCK_TTL", 1.0))
+        self.max_entries = max_entries or int(os.getenv("RPC_READ_CACHE_MAX_ENTRIES", 4096))
+        self.keep_blocks = keep_blocks
+        self.wait_timeout = wait_timeout
+
+        self._entries: "OrderedDict[CacheKey, Any]" = OrderedDict()
+        self._inflight: Dict[CacheKey, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.head: Optional[int] = None
+        self._head_checked_at = 0.0
+        self.epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def call(self, params, send: Send, request_id: Any = None) -> Dict[str, Any]:
+        """Serve an eth_call from the cache or via `send(params)`; returns a JSON-RPC response dict."""
+        tx, block = params[0], params[1] if len(params) > 1 else "latest"
+        try:
+            block_number = self._resolve_block(block)
+        except Exception as e:
+            print(f"⚠️ Read cache could not resolve the head block, reading uncached: {e}")
+            return send(params)
+        if block_number is None or len(params) > 2:  # pending / state overrides: never cached
+            return send(params)
+
+        # Read exactly the block the entry is keyed by, even if the head moved since resolving it
+        params = [tx, hex(block_number)]
+
+        key = (
+            str(tx.get("to", "")).lower(),
+            str(tx.get("data") or tx.get("input") or ""),
+            str(tx.get("from", "")).lower(),
+            block_number
+        )
+
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return {"jsonrpc": "2.0", "id": request_id, "result": self._entries[key]}
+                waiter = self._inflight.get(key)
+                if waiter is None:
+                    self._inflight[key] = threading.Event()
+                    self.misses += 1
+                    break
+                self.coalesced += 1
+            if not waiter.wait(self.wait_timeout):
+                return send(params)
+            with self._lock:
+                if key not in self._entries:  # the leader failed; read directly
+                    return send(params)
+
+        try:
+            response = send(params)
+            if "error" not in response:
+                with self._lock:
+                    self._entries[key] = response.get("result")
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return response
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+    def route(self, method: str, params, send: Send, request_id: Any = None) -> Dict[str, Any]:
+        """Provider hook: serve eth_call through the cache and observe every other response."""
+        response = self.call(params, send, request_id) if method == "eth_call" else send(params)
+        self.observe(method, response)
+        return response
+
+    def observe(self, method: str, response: Dict[str, Any]):
+        """Track the head and writes from responses that pass through the provider."""
+        result = response.get("result") if isinstance(response, dict) else None
+        if method in WRITE_METHODS:
+            self.invalidate()
+        elif method == "eth_getTransactionReceipt" and result:
+            # Our transaction was mined: state changed at a block we may not have seen yet
+            self.invalidate()
+            self._observe_head(_to_int(result.get("blockNumber")))
+        elif method == "eth_blockNumber" and result:
+            self._observe_head(_to_int(result))
+
+    def invalidate(self):
+        with self._lock:
+            self.epoch += 1
+            self._entries.clear()
+            self._head_checked_at = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "head": self.head,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(self.hits / total, 3) if total else None
+        }
+
+    def _resolve_block(self, block) -> Optional[int]:
+        if isinstance(block, int):
+            return block
+        if block in UNCACHEABLE_TAGS or not isinstance(block, str):
+            return None
+        if block.startswith("0x"):
+            return int(block, 16)
+        if block != "latest":  # "earliest" / "safe" / "finalized": not worth tracking
+            return None
+
+        pin = _pinned.get()
+        if pin is not None:
+            if pin.block is None or pin.epoch != self.epoch:
+                pin.block, pin.epoch = self._current_head(), self.epoch
+            return pin.block
+        return self._current_head()
+
+    def _current_head(self) -> int:
+        if self.head is None or time.monotonic() - self._head_checked_at >= self.block_ttl:
+            self._observe_head(self.fetch_head())
+            self._head_checked_at = time.monotonic()
+        return self.head
+
+    def _observe_head(self, block: Optional[int]):
+        if block is None:
+            return
+        with self._lock:
+            if self.head is not None and block <= self.head:
+                return
+            self.head = block
+            stale = [key for key in self._entries if key[3] < block - self.keep_blocks]
+            for key in stale:
+                del self._entries[key]
+
+
+def _to_int(value) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    return int(value, 16)
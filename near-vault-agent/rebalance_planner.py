@@ -0,0 +1,93 @@
+"""
+Diff planner for AuroraMultiVault.rebalance().
+
+`rebalance(addresses, targets)` walks every vault strategy in storage order. Strategies left
+out of the call get a target of 0 and are fully withdrawn, and deposits are capped at the
+idle USDC available at that point in the loop. The planner diffs the targets against the
+vault's tracked balances and only moves strategies whose delta exceeds the dust threshold.
+Everything else is pinned to its current balance, so the contract skips it. The loop is
+simulated in storage order so deposits that would outrun the freed funds are reported
+instead of silently capped, and the transaction is skipped when nothing needs to move.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Rough gas costs of the rebalance loop, used only for reporting savings
+BASE_GAS = 60_000
+GAS_PER_STRATEGY = 12_000      # target lookup + StrategyRebalanced event per loop iteration
+GAS_PER_MOVE = 150_000         # external withdraw/deposit call and balance bookkeeping
+
+
+@dataclass(frozen=True)
+class StrategyMove:
+    strategy: str
+    current: int
+    target: int
+
+    @property
+    def delta(self) -> int:
+        return self.target - self.current
+
+    @property
+    def is_withdrawal(self) -> bool:
+        return self.delta < 0
+
+
+@dataclass
+class RebalancePlan:
+    # Withdrawals first, then deposits (the order they should be read in; the contract runs in storage order)
+    moves: List[StrategyMove] = field(default_factory=list)
+    pinned: Dict[str, int] = field(default_factory=dict)
+    addresses: List[str] = field(default_factory=list)
+    targets: List[int] = field(default_factory=list)
+    # Deposit shortfalls caused by the contract's storage-order loop (strategy -> amount left idle)
+    deferred: Dict[str, int] = field(default_factory=dict)
+    estimated_gas: int = 0
+    gas_saved: int = 0
+
+    @property
+    def is_noop(self) -> bool:
+        return not self.moves
+
+
+def plan_rebalance(strategies: Sequence[Tuple[str, int, bool]], targets: Dict[str, int], idle: int,
+                   dust: Optional[int] = None) -> RebalancePlan:
+    """
+    `strategies` are the vault's (address, tracked balance, active) in storage order,
+    `targets` the desired balance per strategy address and `idle` the vault's USDC balance.
+    """
+    dust = dust if dust is not None else int(os.getenv("REBALANCE_DUST", 1_000_000))  # 1 USDC
+    plan = RebalancePlan()
+    active = [(address, balance) for address, balance, is_active in strategies if is_active]
+
+    for address, balance in active:
+        target = targets.get(address, balance)
+        if abs(target - balance) < dust:
+            plan.pinned[address] = balance
+            target = balance
+        else:
+            plan.moves.append(StrategyMove(address, balance, target))
+        plan.addresses.append(address)
+        plan.targets.append(target)
+
+    plan.moves.sort(key=lambda move: (not move.is_withdrawal, move.delta))
+
+    # Replay the contract loop: deposits only get the idle funds available at their turn
+    available = idle
+    requested = dict(zip(plan.addresses, plan.targets))
+    for address, balance in active:
+        target = requested[address]
+        if target < balance:
+            available += balance - target
+        elif target > balance:
+            deposited = min(target - balance, available)
+            available -= deposited
+            if deposited < target - balance:
+                plan.deferred[address] = target - balance - deposited
+
+    full_gas = BASE_GAS + GAS_PER_STRATEGY * len(active) + GAS_PER_MOVE * len(active)
+    plan.estimated_gas = BASE_GAS + GAS_PER_STRATEGY * len(active) + GAS_PER_MOVE * len(plan.moves) if plan.moves else 0
+    plan.gas_saved = full_gas - plan.estimated_gas
+    return plan
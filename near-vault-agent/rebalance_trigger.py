@@ -0,0 +1,166 @@
+"""
+Event-driven rebalance trigger.
+
+Instead of rebalancing on a fixed timer, the scheduler polls cheap inputs (the vault snapshot
+and cached provider data) and asks this engine whether a rebalance is worth a transaction.
+A rebalance is submitted only when
+
+  * a signal is active: allocation drift vs. target, an APY move or a risk-score move since
+    the last rebalance. Signals use hysteresis - they activate above their threshold and only
+    release below `release_ratio` x threshold, so values jittering around a threshold don't flap;
+  * the cooldown since the last rebalance has elapsed (a risk signal can bypass it) and the
+    vault's own rebalance window is open (`defer_until`; nothing bypasses it); and
+  * the expected extra yield over `gain_horizon_days` beats the gas cost by `gain_margin`.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from allocation_solver import DEFAULT_RISK_SCORE, risk_adjusted_apy
+
+
+@dataclass
+class TriggerDecision:
+    should_rebalance: bool
+    reasons: List[str] = field(default_factory=list)
+    blocked_by: Optional[str] = None
+    drift: float = 0.0
+    max_apy_delta: float = 0.0
+    max_risk_delta: float = 0.0
+    expected_gain_usdc: float = 0.0
+    gas_cost_usdc: float = 0.0
+
+    def summary(self) -> str:
+        verdict = "REBALANCE" if self.should_rebalance else f"HOLD ({self.blocked_by or 'no signal'})"
+        return (
+            f"{verdict} | drift {self.drift*100:.1f}% | ΔAPY {self.max_apy_delta:.2f} | "
+            f"Δrisk {self.max_risk_delta:.3f} | gain {self.expected_gain_usdc:.4f} vs gas {self.gas_cost_usdc:.4f} USDC"
+        )
+
+
+class RebalanceTriggerEngine:
+    """Decides when the current allocation is stale enough to pay for a rebalance."""
+
+    def __init__(self, drift_threshold: float = 0.05, apy_delta_threshold: Optional[float] = None,
+                 risk_delta_threshold: Optional[float] = None, gain_margin: Optional[float] = None,
+                 cooldown: Optional[float] = None, release_ratio: Optional[float] = None,
+                 gain_horizon_days: Optional[float] = None):
+        env = os.getenv
+        self.thresholds = {
+            "drift": drift_threshold,
+            "apy": apy_delta_threshold if apy_delta_threshold is not None else float(env("TRIGGER_APY_DELTA", 1.0)),
+            "risk": risk_delta_threshold if risk_delta_threshold is not None else float(env("TRIGGER_RISK_DELTA", 0.1))
+        }
+        self.gain_margin = gain_margin if gain_margin is not None else float(env("TRIGGER_GAIN_MARGIN", 2.0))
+        self.cooldown = cooldown if cooldown is not None else float(env("TRIGGER_COOLDOWN", 3600))
+        self.release_ratio = release_ratio if release_ratio is not None else float(env("TRIGGER_RELEASE_RATIO", 0.5))
+        self.gain_horizon_days = gain_horizon_days if gain_horizon_days is not None else float(env("TRIGGER_GAIN_HORIZON_DAYS", 7))
+
+        self.active = {signal: False for signal in self.thresholds}
+        self.last_rebalance_at = 0.0
+        # No rebalance before this time: the vault interval (lastRebalance + REBALANCE_INTERVAL) or a failure backoff
+        self.deferred_until = 0.0
+        self.deferred_reason = "vault rebalance interval"
+        # APY / risk per protocol at the last rebalance - the reference for the delta signals
+        self.baseline: Dict[str, Dict[str, float]] = {}
+        self.evaluations = 0
+        self.triggered = 0
+        self.last_decision: Optional[TriggerDecision] = None
+
+    def evaluate(self, current_weights: Dict[str, float], target_weights: Dict[str, float],
+                 protocol_data: Dict[str, Dict[str, Any]], total_usdc: float, gas_cost_usdc: float) -> TriggerDecision:
+        """All weights are fractions of total assets (reserve excluded)."""
+        self.evaluations += 1
+        protocols = [p for p in target_weights if p != "reserve"]
+
+        drift = max((abs(target_weights[p] - current_weights.get(p, 0.0)) for p in protocols), default=0.0)
+        apy_delta = self._max_delta(protocol_data, protocols, "apy", _apy)
+        risk_delta = self._max_delta(protocol_data, protocols, "risk", _risk)
+
+        reasons = []
+        for signal, value in (("drift", drift), ("apy", apy_delta), ("risk", risk_delta)):
+            if self._update_signal(signal, value):
+                reasons.append(f"{signal} {value:.3f} >= {self.thresholds[signal]:.3f}")
+
+        # Extra risk-adjusted yield from moving to the target, accrued over the horizon
+        apy_gain = sum((target_weights[p] - current_weights.get(p, 0.0)) * risk_adjusted_apy(protocol_data.get(p, {}))
+                       for p in protocols)
+        expected_gain = total_usdc * apy_gain / 100 * self.gain_horizon_days / 365
+
+        decision = TriggerDecision(
+            should_rebalance=False,
+            reasons=reasons,
+            drift=drift,
+            max_apy_delta=apy_delta,
+            max_risk_delta=risk_delta,
+            expected_gain_usdc=expected_gain,
+            gas_cost_usdc=gas_cost_usdc
+        )
+
+        # Risk moves are allowed through the cooldown and the gain check; yield chasing is not
+        risk_alert = self.active["risk"]
+        if not reasons:
+            decision.blocked_by = None
+        elif time.time() < self.deferred_until:
+            decision.blocked_by = self.deferred_reason
+        elif time.time() - self.last_rebalance_at < self.cooldown and not risk_alert:
+            decision.blocked_by = "cooldown"
+        elif expected_gain < gas_cost_usdc * self.gain_margin and not risk_alert:
+            decision.blocked_by = "gain below gas x margin"
+        else:
+            decision.should_rebalance = True
+            self.triggered += 1
+
+        self.last_decision = decision
+        return decision
+
+    def record_rebalance(self, protocol_data: Dict[str, Dict[str, Any]]):
+        """Call after a successful rebalance: resets the cooldown, baselines and signals."""
+        self.last_rebalance_at = time.time()
+        self.baseline = {
+            protocol: {"apy": _apy(data), "risk": _risk(data)}
+            for protocol, data in protocol_data.items()
+        }
+        self.active = {signal: False for signal in self.thresholds}
+
+    def defer_until(self, timestamp: float, reason: str = "vault rebalance interval"):
+        """Hold every signal, risk included, until `timestamp` (e.g. the vault's next rebalance window)."""
+        if timestamp > self.deferred_until:
+            self.deferred_until, self.deferred_reason = timestamp, reason
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "evaluations": self.evaluations,
+            "triggered": self.triggered,
+            "active_signals": [signal for signal, active in self.active.items() if active],
+            "last_rebalance_at": self.last_rebalance_at or None,
+            "cooldown_seconds": self.cooldown,
+            "deferred_until": self.deferred_until if self.deferred_until > time.time() else None,
+            "last_decision": self.last_decision.summary() if self.last_decision else None
+        }
+
+    def _max_delta(self, protocol_data, protocols, key, read) -> float:
+        """Largest move of `key` since the last rebalance (0 before the first one)."""
+        deltas = []
+        for protocol in protocols:
+            value = read(protocol_data.get(protocol, {}))
+            deltas.append(abs(value - self.baseline.get(protocol, {}).get(key, value)))
+        return max(deltas, default=0.0)
+
+    def _update_signal(self, signal: str, value: float) -> bool:
+        threshold = self.thresholds[signal]
+        if self.active[signal]:
+            self.active[signal] = value >= threshold * self.release_ratio
+        else:
+            self.active[signal] = value >= threshold
+        return self.active[signal]
+
+
+def _apy(data: Dict[str, Any]) -> float:
+    return float(data.get("estimated_apy", 0.0))
+
+
+def _risk(data: Dict[str, Any]) -> float:
+    return float(data.get("risk_score", DEFAULT_RISK_SCORE))
@@ -0,0 +1,205 @@
+"""
+Shared Aurora JSON-RPC client with connection pooling and endpoint failover.
+
+Every agent process talks to the chain through one `Web3` instance per endpoint set. Its
+provider keeps a tuned keep-alive pool and ranks the configured endpoints by observed
+latency (EWMA). A timeout, connection error, 429 or 5xx puts the endpoint into a short
+cooldown, and the same request is retried on the next endpoint. JSON-RPC errors (reverts,
+bad params) are returned as-is: they are answers, not endpoint failures.
+
+View calls (`eth_call`) go through a block-scoped read cache (see read_cache.py), so identical
+reads at the same block height hit the RPC once.
+
+Endpoints: the primary RPC URL passed by the caller, then any extra URLs from
+AURORA_RPC_URLS (comma separated).
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+from web3.providers.base import JSONBaseProvider
+
+from metrics import CallbackCounter, RPC_METRICS, registry
+from read_cache import BlockReadCache
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class EndpointStats:
+    """Passive health of one endpoint, updated from real requests."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.host = urlparse(url).netloc or url  # metrics label; URLs may embed API keys
+        self.requests = 0
+        self.errors = 0
+        self.ewma_latency = None
+        self.last_error: Optional[str] = None
+        self.cooldown_until = 0.0
+
+    @property
+    def cooling_down(self) -> bool:
+        return time.time() < self.cooldown_until
+
+    def rank(self) -> Tuple[bool, float]:
+        # Healthy endpoints first, then fastest; untried endpoints count as fast so they get measured
+        return (self.cooling_down, self.ewma_latency if self.ewma_latency is not None else 0.0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms": round(self.ewma_latency * 1000, 1) if self.ewma_latency is not None else None,
+            "cooling_down": self.cooling_down,
+            "last_error": self.last_error
+        }
+
+
+class FailoverHTTPProvider(JSONBaseProvider):
+    """HTTP provider over several endpoints with a shared keep-alive pool."""
+
+    def __init__(self, endpoint_urls: List[str], timeout: Optional[float] = None, pool_size: Optional[int] = None,
+                 cooldown: Optional[float] = None, ewma_alpha: float = 0.2):
+        super().__init__()
+        self.endpoints = [EndpointStats(url) for url in endpoint_urls]
+        self.timeout = timeout if timeout is not None else float(os.getenv("RPC_TIMEOUT", 10))
+        self.cooldown = cooldown if cooldown is not None else float(os.getenv("RPC_ENDPOINT_COOLDOWN", 30))
+        self.ewma_alpha = ewma_alpha
+        self._lock = threading.Lock()
+
+        pool_size = pool_size or int(os.getenv("RPC_POOL_SIZE", 20))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.endpoints), pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        read_cache = os.getenv("RPC_READ_CACHE_ENABLED", "true").lower() == "true"
+        self.read_cache = BlockReadCache(self._fetch_head) if read_cache else None
+
+    def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        if self.read_cache is None:
+            return self._post(method, request_data)
+
+        def send(sent_params):
+            # The cache may pin "latest" to a block number; re-encode so the node reads that block
+            data = request_data if sent_params is params else self.encode_rpc_request(method, sent_params)
+            return self._post(method, data)
+
+        return self.read_cache.route(method, params, send, request_id=json.loads(request_data)["id"])
+
+    def _post(self, method, request_data: bytes):
+        last_error = None
+
+        for endpoint in self._ranked_endpoints():
+            started = time.monotonic()
+            try:
+                with RPC_METRICS.time(method=method, endpoint=endpoint.host):
+                    response = self.session.post(endpoint.url, data=request_data, timeout=self.timeout)
+                    if response.status_code in RETRYABLE_STATUS:
+                        raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                    response.raise_for_status()
+            except requests.RequestException as e:
+                last_error = e
+                self._record_failure(endpoint, e)
+                continue
+
+            self._record_success(endpoint, time.monotonic() - started)
+            return self.decode_rpc_response(response.content)
+
+        raise ConnectionError(f"All {len(self.endpoints)} RPC endpoint(s) failed for {method}: {last_error}")
+
+    def _fetch_head(self) -> int:
+        response = self._post("eth_blockNumber", self.encode_rpc_request("eth_blockNumber", []))
+        if "error" in response:
+            raise ConnectionError(f"eth_blockNumber failed: {response['error']}")
+        return int(response["result"], 16)
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        try:
+            response = self.make_request("web3_clientVersion", [])
+        except Exception:
+            if show_traceback:
+                raise
+            return False
+        return "error" not in response
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [endpoint.as_dict() for endpoint in self._ranked_endpoints()]
+
+    def read_cache_stats(self) -> Optional[Dict[str, Any]]:
+        return self.read_cache.stats() if self.read_cache else None
+
+    def _ranked_endpoints(self) -> List[EndpointStats]:
+        with self._lock:
+            return sorted(self.endpoints, key=EndpointStats.rank)
+
+    def _record_success(self, endpoint: EndpointStats, latency: float):
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.cooldown_until = 0.0
+            if endpoint.ewma_latency is None:
+                endpoint.ewma_latency = latency
+            else:
+                endpoint.ewma_latency += self.ewma_alpha * (latency - endpoint.ewma_latency)
+
+    def _record_failure(self, endpoint: EndpointStats, error: Exception):
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.errors += 1
+            endpoint.last_error = str(error)[:200]
+            endpoint.cooldown_until = time.time() + self.cooldown
+        if len(self.endpoints) > 1:
+            print(f"⚠️ RPC endpoint {endpoint.url} failed ({error}), failing over")
+
+
+_clients: Dict[Tuple[Tuple[str, ...], bool], Web3] = {}
+_clients_lock = threading.Lock()
+
+
+def endpoint_urls(primary_url: Optional[str]) -> List[str]:
+    extra = [url.strip() for url in os.getenv("AURORA_RPC_URLS", "").split(",") if url.strip()]
+    urls = [primary_url] if primary_url else []
+    urls += [url for url in extra if url not in urls]
+    return urls or ["http://localhost:8545"]
+
+
+def get_web3(primary_url: Optional[str] = None, poa: bool = False) -> Web3:
+    """Process-wide Web3 for this endpoint set (one pool and one set of health stats)."""
+    urls = tuple(endpoint_urls(primary_url))
+    key = (urls, poa)
+    with _clients_lock:
+        if key not in _clients:
+            w3 = Web3(FailoverHTTPProvider(list(urls)))
+            if poa:
+                _inject_poa_middleware(w3)
+            _clients[key] = w3
+            registry.register("rpc_read_cache", CallbackCounter(
+                "agent_rpc_read_cache_total", "eth_call reads served by the block-scoped cache (hits) or the RPC (misses)",
+                lambda: {k: v for k, v in (w3.provider.read_cache_stats() or {}).items() if k in ("hits", "misses", "coalesced")}
+            ))
+        return _clients[key]
+
+
+def register_web3(w3: Web3, primary_url: Optional[str] = None, poa: bool = False):
+    """Serve `get_web3(primary_url, poa)` from `w3` (e.g. the benchmark's in-process chain)."""
+    with _clients_lock:
+        _clients[(tuple(endpoint_urls(primary_url)), poa)] = w3
+
+
+def _inject_poa_middleware(w3: Web3):
+    try:
+        from web3.middleware import geth_poa_middleware  # web3 v6
+        w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+    except ImportError:
+        from web3.middleware import ExtraDataToPOAMiddleware  # web3 v7
+        w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
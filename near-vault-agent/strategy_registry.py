@@ -0,0 +1,141 @@
+"""
+Strategy registry backed by the vault's on-chain strategy list.
+
+Strategies are loaded from `AuroraMultiVault.getStrategies()` (one eth_call for any number of
+strategies) and re-loaded when the event index sees a new `StrategyAdded` log. Contract
+objects are cached per address, and every tool reads the strategy set from here instead of
+hard-coded addresses, so a vault with any number of strategies works without code changes.
+"""
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from web3 import Web3
+
+
+@dataclass(frozen=True)
+class StrategyInfo:
+    address: str
+    key: str               # protocol key (e.g. "ref_finance") used by providers and the solver
+    name: str
+    allocation_bps: int
+    balance: int           # the vault's tracked balance (what rebalance() diffs against)
+    active: bool
+    contract: Any
+
+    @property
+    def balance_usdc(self) -> float:
+        return self.balance / 10**6
+
+
+class StrategyRegistry:
+    """Lazily loaded view of the vault's strategies, refreshed on `StrategyAdded`."""
+
+    def __init__(self, w3: Web3, vault_contract, strategy_abi, known_keys: Optional[Dict[str, str]] = None,
+                 event_indexer=None, refresh_interval: Optional[float] = None):
+        self.w3 = w3
+        self.vault_contract = vault_contract
+        self.strategy_abi = strategy_abi
+        # address -> protocol key for strategies that have a market-data provider
+        self.known_keys = {Web3.to_checksum_address(a): k for a, k in (known_keys or {}).items()}
+        self.event_indexer = event_indexer
+        self.refresh_interval = refresh_interval if refresh_interval is not None else float(os.getenv("STRATEGY_REGISTRY_REFRESH", 60))
+
+        self._strategies: Optional[List[StrategyInfo]] = None
+        self._contracts: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._last_check = 0.0
+        self._seen_added = 0
+        self.refreshes = 0
+
+    def refresh(self) -> List[StrategyInfo]:
+        """Re-read every strategy (address, allocation, tracked balance) in one call."""
+        with self._lock:
+            previous = {s.address for s in self._strategies or []}
+            strategies = []
+            used_keys = set()
+            for address, allocation, balance, active, name in self.vault_contract.functions.getStrategies().call():
+                address = Web3.to_checksum_address(address)
+                key = self._key_for(address, name, used_keys)
+                used_keys.add(key)
+                strategies.append(StrategyInfo(
+                    address=address,
+                    key=key,
+                    name=name,
+                    allocation_bps=allocation,
+                    balance=balance,
+                    active=active,
+                    contract=self.contract(address)
+                ))
+            self._strategies = strategies
+            self._last_check = time.time()
+            self.refreshes += 1
+
+        if {s.address for s in strategies} != previous:
+            print(f"📋 Strategy registry: {len(strategies)} strategies loaded from the vault")
+        return strategies
+
+    def strategies(self, active_only: bool = True) -> List[StrategyInfo]:
+        """Current strategies in vault storage order, picking up newly added ones."""
+        if self._strategies is None:
+            self.refresh()
+        elif time.time() - self._last_check >= self.refresh_interval:
+            self._refresh_if_added()
+        return [s for s in self._strategies if s.active or not active_only]
+
+    def contract(self, address: str):
+        address = Web3.to_checksum_address(address)
+        with self._lock:
+            if address not in self._contracts:
+                self._contracts[address] = self.w3.eth.contract(address=address, abi=self.strategy_abi)
+            return self._contracts[address]
+
+    def contracts(self) -> Dict[str, Any]:
+        """{key: contract} for the snapshot reader's batched balance calls."""
+        return {s.key: s.contract for s in self.strategies()}
+
+    def addresses(self) -> List[str]:
+        return [s.address for s in self.strategies()]
+
+    def by_key(self, key: str) -> Optional[StrategyInfo]:
+        return next((s for s in self.strategies() if s.key == key), None)
+
+    def name(self, address: str) -> str:
+        address = Web3.to_checksum_address(address)
+        return next((s.name for s in self.strategies(active_only=False) if s.address == address), address)
+
+    def stats(self) -> Dict[str, Any]:
+        strategies = self._strategies or []
+        return {
+            "loaded": self._strategies is not None,
+            "strategies": len(strategies),
+            "active": sum(1 for s in strategies if s.active),
+            "refreshes": self.refreshes
+        }
+
+    def _refresh_if_added(self):
+        """Reload only when the event index shows a new StrategyAdded log (or no index exists)."""
+        self._last_check = time.time()
+        if self.event_indexer is None:
+            self.refresh()
+            return
+        try:
+            self.event_indexer.sync()
+            added = len(self.event_indexer.events("StrategyAdded", limit=1_000_000))
+        except Exception as e:
+            print(f"⚠️ Strategy registry event check failed, reloading: {e}")
+            self.refresh()
+            return
+        if added != self._seen_added:
+            self._seen_added = added
+            self.refresh()
+
+    def _key_for(self, address: str, name: str, used_keys) -> str:
+        if address in self.known_keys:
+            return self.known_keys[address]
+        key = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_") or "strategy"
+        return key if key not in used_keys and key not in self.known_keys.values() else f"{key}_{address[2:8].lower()}"
@@ -46,9 +46,9 @@ def run_integration_tests():
     status = test_endpoint("/status")
     if status.get("success"):
         print("✅ Vault status retrieved")
-        # Extract key info from status
-        status_text = status["status"]
-        if "Total Assets:" in status_text:
+        # Extract key info from status (JSON from the ML agent, text from the base agent)
+        vault = status["status"]
+        if "total_usdc" in vault if isinstance(vault, dict) else "Total Assets:" in vault:
             print("   Multi-strategy vault is operational")
     else:
         print("❌ Status check failed:", status.get("error"))
@@ -87,7 +87,8 @@ def run_integration_tests():
     if yields.get("success"):
         print("✅ Yield analysis completed")
         analysis = yields["analysis"]
-        if "Ref Finance" in analysis and "TriSolaris" in analysis:
+        protocols = analysis["protocols"] if isinstance(analysis, dict) else analysis
+        if "ref_finance" in protocols and "trisolaris" in protocols or "Ref Finance" in protocols and "TriSolaris" in protocols:
             print("   All Aurora protocols analyzed")
     else:
         print("❌ Yield analysis failed:", yields.get("error"))
@@ -112,7 +113,7 @@ def run_integration_tests():
     if risk.get("success"):
         print("✅ Risk assessment completed")
         risk_report = risk["risk_report"]
-        if "Risk Monitor" in risk_report:
+        if isinstance(risk_report, dict) and "weighted_risk" in risk_report or "Risk Monitor" in str(risk_report):
             print("   Risk monitoring system operational")
     else:
         print("❌ Risk assessment failed:", risk.get("error"))
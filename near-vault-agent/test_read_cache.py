@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the block-scoped eth_call cache.
+
+    cd near-vault-agent && python -m pytest -q test_read_cache.py
+"""
+
+import unittest
+
+from read_cache import BlockReadCache, pinned_block
+
+CALL = {"to": "0x00000000000000000000000000000000000000aa", "data": "0x70a08231"}
+
+
+class FakeChain:
+    """Head block plus a recorder for the block each eth_call was sent for."""
+
+    def __init__(self, head=100):
+        self.head = head
+        self.sent_blocks = []
+        self.advance_on_send = False
+
+    def fetch_head(self):
+        return self.head
+
+    def send(self, params):
+        if self.advance_on_send:
+            self.head += 1  # a new block lands between resolving the head and the node answering
+        block = params[1]
+        self.sent_blocks.append(block)
+        number = self.head if block == "latest" else int(block, 16)
+        return {"jsonrpc": "2.0", "id": 1, "result": hex(number)}
+
+
+class BlockReadCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.chain = FakeChain()
+        self.cache = BlockReadCache(self.chain.fetch_head, block_ttl=0)
+
+    def test_latest_read_is_sent_for_the_resolved_block(self):
+        self.chain.advance_on_send = True
+
+        response = self.cache.call([CALL, "latest"], self.chain.send)
+
+        self.assertEqual(self.chain.sent_blocks, ["0x64"])
+        self.assertEqual(response["result"], "0x64")
+
+        # The entry keyed at block 100 holds block 100's state, so an explicit read there is a hit
+        self.chain.advance_on_send = False
+        self.assertEqual(self.cache.call([CALL, "0x64"], self.chain.send)["result"], "0x64")
+        self.assertEqual(len(self.chain.sent_blocks), 1)
+
+    def test_pinned_scope_reads_one_block(self):
+        self.chain.advance_on_send = True
+        other = {**CALL, "data": "0x18160ddd"}
+
+        with pinned_block():
+            first = self.cache.call([CALL, "latest"], self.chain.send)
+            second = self.cache.call([other, "latest"], self.chain.send)
+
+        self.assertEqual(self.chain.sent_blocks, ["0x64", "0x64"])
+        self.assertEqual(first["result"], second["result"])
+
+    def test_pending_and_overrides_are_sent_unchanged(self):
+        self.cache.call([CALL, "pending"], lambda params: self.chain.sent_blocks.append(params) or {"result": "0x"})
+        self.cache.call([CALL, "latest", {}], lambda params: self.chain.sent_blocks.append(params) or {"result": "0x"})
+
+        self.assertEqual(self.chain.sent_blocks, [[CALL, "pending"], [CALL, "latest", {}]])
+
+
+if __name__ == "__main__":
+    unittest.main()
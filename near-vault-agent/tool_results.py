@@ -0,0 +1,256 @@
+"""
+Typed results for the ML vault agent's reporting tools.
+
+Tools return these objects instead of pre-formatted strings. The LLM agent sees `str(result)`
+(the emoji report, via `to_text()`); the HTTP endpoints serve `to_dict()` as compact JSON, so
+API clients read fields instead of scraping text.
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+PROTOCOL_LABELS = {
+    "ref_finance": "Ref Finance",
+    "trisolaris": "TriSolaris",
+    "bastion": "Bastion"
+}
+
+
+def _ml_indicator(ml_enabled: bool) -> str:
+    return "🧠 ML-Enhanced" if ml_enabled else "🔄 Fallback Mode"
+
+
+def _ml_status(ml_enabled: bool) -> str:
+    return "ACTIVE - Using trained anomaly detection" if ml_enabled else "FALLBACK - Using static risk scores"
+
+
+def _pct(part: float, total: float) -> float:
+    return part / total * 100 if total > 0 else 0.0
+
+
+class ToolResult:
+    """Base for tool results: text for the agent, a dict for the API."""
+
+    def to_text(self) -> str:
+        raise NotImplementedError
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def __str__(self) -> str:
+        return self.to_text()
+
+
+@dataclass
+class StrategyPosition:
+    name: str
+    key: str
+    address: str
+    balance_usdc: float
+    risk_score: Optional[float] = None
+    target_weight: Optional[float] = None
+
+
+@dataclass
+class VaultStatus(ToolResult):
+    block_number: int
+    total_usdc: float
+    deployed_usdc: float
+    idle_usdc: float
+    total_shares: float
+    share_price: float
+    expected_apy: float
+    strategies: List[StrategyPosition]
+    target_allocation: Dict[str, float]
+    vault_address: str
+    agent_address: str
+    ml_enabled: bool
+    failed_reads: List[str] = field(default_factory=list)
+
+    def to_text(self) -> str:
+        strategy_text = "\n".join(
+            f"├─ {s.name}: {s.balance_usdc:.2f} USDC" + (f" (Risk: {s.risk_score:.3f})" if s.risk_score is not None else "")
+            for s in self.strategies
+        )
+        contracts_text = "\n".join(f"├─ {s.name}: {s.address}" for s in self.strategies)
+        allocation = self.target_allocation
+
+        return f"""
+🏦 Aurora Multi-Strategy Vault Status ({_ml_indicator(self.ml_enabled)}):
+
+💰 Assets Under Management:
+├─ Total Assets: {self.total_usdc:.2f} USDC
+├─ Deployed: {self.deployed_usdc:.2f} USDC ({_pct(self.deployed_usdc, self.total_usdc):.1f}%)
+└─ Idle/Reserve: {self.idle_usdc:.2f} USDC ({_pct(self.idle_usdc, self.total_usdc):.1f}%)
+
+📊 Strategy Balances ({len(self.strategies)} strategies):
+{strategy_text}
+
+📈 Portfolio Performance:
+├─ Expected APY: {self.expected_apy:.1f}%
+├─ Vault Shares: {self.total_shares:.2f}
+├─ Share Price: {self.share_price:.6f} USDC
+└─ Snapshot Block: {self.block_number}
+
+🎯 Strategy Allocation:
+├─ Ref Finance: {allocation.get('ref_finance', 0)*100:.1f}% (DEX LP)
+├─ TriSolaris: {allocation.get('trisolaris', 0)*100:.1f}% (AMM)
+├─ Bastion: {allocation.get('bastion', 0)*100:.1f}% (Lending)
+└─ Reserve: {allocation.get('reserve', 0)*100:.1f}% (Liquid)
+
+🌐 Deployed Contracts:
+├─ Vault: {self.vault_address}
+{contracts_text}
+
+🧠 AI/ML Features:
+├─ ML Risk Assessment: {"✅ ACTIVE" if self.ml_enabled else "❌ DISABLED"}
+├─ AI Portfolio Optimization: ✅ ACTIVE
+├─ Real-time Risk Monitoring: ✅ ACTIVE
+└─ Automated Rebalancing: ✅ ACTIVE
+
+🌟 Aurora Advantages:
+├─ Gas costs: ~$0.01 vs $50+ on Ethereum
+├─ Transaction speed: 2-3 seconds
+├─ NEAR ecosystem integration
+└─ First-mover advantage in Aurora DeFi AI
+
+🤖 Agent Status: {self.agent_address}
+⚡ Multi-strategy optimization: ACTIVE
+        """
+
+
+@dataclass
+class StrategyBalances(ToolResult):
+    block_number: int
+    strategies: List[StrategyPosition]
+    total_deployed_usdc: float
+    idle_usdc: float
+    total_usdc: float
+    ml_enabled: bool
+    failed_reads: List[str] = field(default_factory=list)
+
+    @property
+    def deployment_rate(self) -> float:
+        return _pct(self.total_deployed_usdc, self.total_usdc)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "deployment_rate": self.deployment_rate}
+
+    def to_text(self) -> str:
+        balances_text = "\n".join(f"├─ {s.name}: {s.balance_usdc:.2f} USDC" for s in self.strategies)
+        allocation_text = "\n".join(
+            f"├─ {s.name}: {_pct(s.balance_usdc, self.total_usdc):.1f}% (Target: {(s.target_weight or 0)*100:.0f}%)"
+            for s in self.strategies
+        )
+
+        return f"""
+📊 Aurora Strategy Balance Report:
+
+💰 Individual Strategy Balances:
+{balances_text}
+
+📈 Portfolio Summary:
+├─ Total Deployed: {self.total_deployed_usdc:.2f} USDC
+├─ Vault Idle: {self.idle_usdc:.2f} USDC
+├─ Total Assets: {self.total_usdc:.2f} USDC
+└─ Deployment Rate: {self.deployment_rate:.1f}%
+
+🎯 Current Allocation:
+{allocation_text}
+
+🧠 ML Risk Assessment: {"ACTIVE" if self.ml_enabled else "FALLBACK"}
+        """
+
+
+@dataclass
+class ProtocolYield:
+    estimated_apy: float
+    risk_score: float
+    risk_adjusted_apy: float
+    status: str
+
+
+@dataclass
+class YieldAnalysis(ToolResult):
+    protocols: Dict[str, ProtocolYield]
+    optimal_allocation: Dict[str, float]
+    expected_apy: float
+    ml_enabled: bool
+    advisory_allocation: Optional[Dict[str, float]] = None
+
+    def to_text(self) -> str:
+        performance_text = "\n".join(
+            f"{'└─' if i == len(self.protocols) - 1 else '├─'} {PROTOCOL_LABELS.get(p, p)}: "
+            f"{data.estimated_apy:.1f}% APY (Risk: {data.risk_score:.3f})"
+            for i, (p, data) in enumerate(self.protocols.items())
+        )
+        allocation = self.optimal_allocation
+        advisory_text = ""
+        if self.advisory_allocation:
+            advisory_text = "\n🤖 LLM Advisory Allocation: " + ", ".join(
+                f"{p} {w*100:.1f}%" for p, w in self.advisory_allocation.items()
+            ) + "\n"
+
+        return f"""
+🌐 Aurora DeFi Yield Analysis ({_ml_indicator(self.ml_enabled)}):
+
+📊 Protocol Performance:
+{performance_text}
+
+🎯 Optimal Allocation (risk-adjusted solver):
+├─ Ref Finance: {allocation.get('ref_finance', 0)*100:.1f}%
+├─ TriSolaris: {allocation.get('trisolaris', 0)*100:.1f}%
+├─ Bastion: {allocation.get('bastion', 0)*100:.1f}%
+└─ Reserve: {allocation.get('reserve', 0)*100:.1f}%
+{advisory_text}
+💡 Expected Portfolio APY: {self.expected_apy:.1f}%
+
+🧠 ML Risk Status: {_ml_status(self.ml_enabled)}
+        """
+
+
+@dataclass
+class ProtocolRisk:
+    risk_score: float
+    status: str
+    apy: float
+    ml_enhanced: bool
+
+
+@dataclass
+class RiskReport(ToolResult):
+    weighted_risk: float
+    protocol_risks: Dict[str, ProtocolRisk]
+    alerts: List[str]
+    ml_enabled: bool
+
+    @property
+    def level(self) -> str:
+        return "LOW" if self.weighted_risk < 0.4 else "MEDIUM" if self.weighted_risk < 0.7 else "HIGH"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "level": self.level}
+
+    def to_text(self) -> str:
+        badge = {"LOW": "🟢 LOW", "MEDIUM": "🟡 MEDIUM", "HIGH": "🔴 HIGH"}[self.level]
+        breakdown = "\n".join(
+            f"{'└─' if i == len(PROTOCOL_LABELS) - 1 else '├─'} {label}: "
+            f"{self.protocol_risks[p].risk_score if p in self.protocol_risks else 0:.3f}"
+            for i, (p, label) in enumerate(PROTOCOL_LABELS.items())
+        )
+        alerts = "\n".join(f"   • {alert}" for alert in self.alerts) if self.alerts else "   • No active alerts"
+
+        return f"""
+🛡️ Aurora Risk Monitor Report ({_ml_indicator(self.ml_enabled)}):
+
+📊 Overall Portfolio Risk: {self.weighted_risk:.3f} {badge}
+
+🔍 Protocol Risk Breakdown:
+{breakdown}
+
+🚨 Alerts: {len(self.alerts)}
+{alerts}
+
+🧠 ML Risk Status: {_ml_status(self.ml_enabled)}
+✅ Aurora Advantages: Lower systemic risk due to newer ecosystem and NEAR security
+        """
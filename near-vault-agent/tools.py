@@ -1,4 +1,3 @@
-import time
 from langchain.tools import tool
 from config import (
     w3,
@@ -9,26 +8,14 @@ from config import (
     VAULT_ADDRESS,
     VRF_STRATEGY_ADDRESS,
     USDC_TOKEN_ADDRESS,
-    CHAIN_ID
+    tx_submitter,
+    vrf_event_indexer
 )
-from web3.exceptions import ContractLogicError
 
 # --- Helper function for sending transactions ---
-def send_transaction(tx):
-    """Signs and sends a transaction, then waits for the receipt."""
-    try:
-        signed_tx = w3.eth.account.sign_transaction(tx, agent_account.key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        print(f"⏳ Transaction sent: {tx_hash.hex()}. Waiting for confirmation...")
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-        print(f"✅ Transaction confirmed in block: {receipt.blockNumber}")
-        return {"success": True, "receipt": receipt}
-    except ContractLogicError as e:
-        print(f"❌ Transaction reverted: {e}")
-        return {"success": False, "error": f"Contract logic error: {e}"}
-    except Exception as e:
-        print(f"❌ An unexpected error occurred: {e}")
-        return {"success": False, "error": str(e)}
+def send_transaction(contract_call, gas):
+    """Signs and sends a contract call through the shared submitter, then waits for the receipt."""
+    return tx_submitter.send_and_wait(contract_call, gas=gas)
 
 # ==============================================================================
 # AGENT TOOLS
@@ -79,15 +66,9 @@ def deposit_new_funds_into_strategy() -> str:
             VRF_STRATEGY_ADDRESS,
             liquid_usdc_wei,
             b''  # Empty bytes for data parameter
-        ).build_transaction({
-            'from': agent_account.address,
-            'nonce': w3.eth.get_transaction_count(agent_account.address),
-            'gas': 2_000_000,
-            'gasPrice': w3.eth.gas_price,
-            'chainId': CHAIN_ID
-        })
-
-        result = send_transaction(tx)
+        )
+
+        result = send_transaction(tx, gas=2_000_000)
         if result["success"]:
             return f"Successfully deposited {liquid_usdc_wei / 10**6} USDC into the VRF strategy."
         else:
@@ -107,54 +88,21 @@ def simulate_yield_harvest_and_deposit(amount_usdc: float) -> str:
     try:
         amount_wei = int(amount_usdc * (10**6))
 
-        # 1. Mint "yield" to the agent's wallet
-        print(f"Minting {amount_usdc} USDC to agent...")
-        mint_tx = usdc_contract.functions.mint(
-            agent_account.address,
-            amount_wei
-        ).build_transaction({
-            'from': agent_account.address,
-            'nonce': w3.eth.get_transaction_count(agent_account.address),
-            'gas': 500_000,
-            'gasPrice': w3.eth.gas_price,
-            'chainId': CHAIN_ID
-        })
-        mint_result = send_transaction(mint_tx)
+        # mint -> approve -> depositYield use consecutive nonces, so all three are
+        # broadcast back-to-back and confirmed together instead of one block each
+        print(f"Minting {amount_usdc} USDC to agent, approving and depositing as prize pool...")
+        mint_result, approve_result, deposit_result = tx_submitter.submit_and_wait_all([
+            # 1. Mint "yield" to the agent's wallet
+            {"call": usdc_contract.functions.mint(agent_account.address, amount_wei), "gas": 500_000, "label": "mint"},
+            # 2. Approve the VRF Strategy to spend the agent's new USDC
+            {"call": usdc_contract.functions.approve(VRF_STRATEGY_ADDRESS, amount_wei), "gas": 500_000, "label": "approve"},
+            # 3. Deposit the "yield" into the VRF strategy
+            {"call": vrf_strategy_contract.functions.depositYield(amount_wei), "gas": 1_000_000, "label": "depositYield"}
+        ])
         if not mint_result["success"]:
             return f"Failed to mint mock yield: {mint_result['error']}"
-        
-        time.sleep(2) # Give node time to sync state
-
-        # 2. Approve the VRF Strategy to spend the agent's new USDC
-        print(f"Approving VRF strategy to spend {amount_usdc} USDC...")
-        approve_tx = usdc_contract.functions.approve(
-            VRF_STRATEGY_ADDRESS,
-            amount_wei
-        ).build_transaction({
-            'from': agent_account.address,
-            'nonce': w3.eth.get_transaction_count(agent_account.address),
-            'gas': 500_000,
-            'gasPrice': w3.eth.gas_price,
-            'chainId': CHAIN_ID
-        })
-        approve_result = send_transaction(approve_tx)
         if not approve_result["success"]:
             return f"Failed to approve yield deposit: {approve_result['error']}"
-            
-        time.sleep(2) # Give node time to sync state
-
-        # 3. Deposit the "yield" into the VRF strategy
-        print(f"Depositing {amount_usdc} USDC as prize pool...")
-        deposit_tx = vrf_strategy_contract.functions.depositYield(
-            amount_wei
-        ).build_transaction({
-            'from': agent_account.address,
-            'nonce': w3.eth.get_transaction_count(agent_account.address),
-            'gas': 1_000_000,
-            'gasPrice': w3.eth.gas_price,
-            'chainId': CHAIN_ID
-        })
-        deposit_result = send_transaction(deposit_tx)
         if deposit_result["success"]:
             return f"Successfully simulated and deposited {amount_usdc} USDC as the prize pool."
         else:
@@ -181,19 +129,20 @@ def trigger_lottery_draw() -> str:
         tx = vault_contract.functions.harvestStrategy(
             VRF_STRATEGY_ADDRESS,
             b'' # Empty bytes for data
-        ).build_transaction({
-            'from': agent_account.address,
-            'nonce': w3.eth.get_transaction_count(agent_account.address),
-            'gas': 2_000_000,
-            'gasPrice': w3.eth.gas_price,
-            'chainId': CHAIN_ID
-        })
-
-        result = send_transaction(tx)
+        )
+
+        result = send_transaction(tx, gas=2_000_000)
         if result["success"]:
-            # Fetch the new winner to report back
-            time.sleep(2)
-            new_winner = vrf_strategy_contract.functions.lastWinner().call()
+            # Fetch the new winner to report back (read at the mined block, no need to sleep)
+            new_winner = vrf_strategy_contract.functions.lastWinner().call(
+                block_identifier=result["receipt"].blockNumber
+            )
+            # The awarded amount comes from this transaction's WinnerAwarded event
+            vrf_event_indexer.sync()
+            awards = vrf_event_indexer.events("WinnerAwarded", tx_hashes=[result["tx_hash"]])
+            if awards:
+                prize = int(awards[0]["args"]["amount"]) / 10**6
+                return f"Lottery draw successful! The new winner is {new_winner} with a prize of {prize} USDC."
             return f"Lottery draw successful! The new winner is {new_winner}."
         else:
             return f"Failed to trigger lottery draw: {result['error']}"
@@ -0,0 +1,254 @@
+"""
+Pipelined transaction submitter with a locally tracked nonce for the agent account.
+
+Transactions are signed and broadcast back-to-back without waiting for each receipt;
+`wait_all` then polls every outstanding hash together. Nonce gaps (a broadcast the node
+dropped) are re-broadcast and stuck transactions are replaced at the same nonce with a
+bumped gas price.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from web3.exceptions import ContractLogicError, TransactionNotFound
+
+# The node already holds these exact signed bytes (e.g. an RPC failover retried the broadcast)
+ALREADY_KNOWN_ERRORS = ("already known", "known transaction")
+# Another transaction used this nonce - resync from the node and sign again
+NONCE_TOO_LOW_ERRORS = ("nonce too low",)
+# A different transaction is pending at this nonce - replace it with a bumped gas price
+UNDERPRICED_ERRORS = ("replacement transaction underpriced",)
+
+
+def _matches(error: Exception, messages) -> bool:
+    text = str(error).lower()
+    return any(msg in text for msg in messages)
+
+
+@dataclass
+class PendingTx:
+    """A broadcast transaction and every hash sent for its nonce (originals + replacements)."""
+    nonce: int
+    tx: Dict[str, Any]
+    raw_transaction: bytes
+    tx_hashes: List[Any] = field(default_factory=list)
+    sent_at: float = field(default_factory=time.time)
+    label: str = ""
+
+    @property
+    def tx_hash(self):
+        return self.tx_hashes[-1]
+
+
+class TransactionSubmitter:
+    """Shared submitter for one account. Thread-safe; one instance per process and account."""
+
+    def __init__(self, w3, account, chain_id: int, replace_after: float = 45.0,
+                 gas_price_bump: float = 1.125, poll_interval: float = 0.5, gas_price_ttl: float = 5.0):
+        self.w3 = w3
+        self.account = account
+        self.chain_id = chain_id
+        self.replace_after = replace_after
+        self.gas_price_bump = gas_price_bump
+        self.poll_interval = poll_interval
+        self.gas_price_ttl = gas_price_ttl
+
+        self._lock = threading.Lock()
+        self._next_nonce: Optional[int] = None
+        self._gas_price: Optional[int] = None
+        self._gas_price_at = 0.0
+
+    # --------------------------------------------------------------------------
+    # Nonce / gas price tracking
+    # --------------------------------------------------------------------------
+
+    def resync_nonce(self) -> int:
+        """Reload the next nonce from the node's pending pool."""
+        with self._lock:
+            return self._resync_nonce()
+
+    def _resync_nonce(self) -> int:
+        self._next_nonce = self.w3.eth.get_transaction_count(self.account.address, "pending")
+        return self._next_nonce
+
+    def _current_gas_price(self) -> int:
+        if self._gas_price is None or time.time() - self._gas_price_at > self.gas_price_ttl:
+            self._gas_price = self.w3.eth.gas_price
+            self._gas_price_at = time.time()
+        return self._gas_price
+
+    # --------------------------------------------------------------------------
+    # Submission
+    # --------------------------------------------------------------------------
+
+    def submit(self, contract_call, gas: int, value: int = 0, label: str = "") -> PendingTx:
+        """Build, sign and broadcast `contract_call` without waiting for the receipt."""
+        with self._lock:
+            if self._next_nonce is None:
+                self._resync_nonce()
+
+            gas_price = self._current_gas_price()
+            for attempt in range(3):
+                nonce = self._next_nonce
+                tx = contract_call.build_transaction({
+                    'from': self.account.address,
+                    'nonce': nonce,
+                    'gas': gas,
+                    'gasPrice': gas_price,
+                    'chainId': self.chain_id,
+                    'value': value
+                })
+                raw_tx = self._sign(tx)
+                try:
+                    tx_hash = self.w3.eth.send_raw_transaction(raw_tx)
+                except Exception as e:
+                    if _matches(e, ALREADY_KNOWN_ERRORS):
+                        # Same signed bytes are already in the pool: this broadcast succeeded
+                        tx_hash = self.w3.keccak(raw_tx)
+                    elif attempt < 2 and _matches(e, NONCE_TOO_LOW_ERRORS):
+                        # Another process (or a restart) used this nonce - resync and retry
+                        print(f"⚠️ Nonce {nonce} rejected ({e}), resyncing from node...")
+                        self._resync_nonce()
+                        continue
+                    elif attempt < 2 and _matches(e, UNDERPRICED_ERRORS):
+                        gas_price = self._bumped_gas_price(gas_price)
+                        print(f"⚠️ Nonce {nonce} has an underpriced replacement, retrying at gasPrice {gas_price}")
+                        continue
+                    else:
+                        # The nonce was never consumed, so it stays reserved for the next submit
+                        raise
+
+                self._next_nonce = nonce + 1
+                print(f"⏳ Transaction sent{f' ({label})' if label else ''}: {tx_hash.hex()} (nonce {nonce})")
+                return PendingTx(nonce=nonce, tx=tx, raw_transaction=raw_tx, tx_hashes=[tx_hash], label=label)
+
+        raise RuntimeError("Unable to obtain a valid nonce")
+
+    def _sign(self, tx: Dict[str, Any]) -> bytes:
+        signed_tx = self.w3.eth.account.sign_transaction(tx, self.account.key)
+        # web3 v7 uses raw_transaction, v6 rawTransaction
+        return getattr(signed_tx, "raw_transaction", None) or signed_tx.rawTransaction
+
+    def _bumped_gas_price(self, gas_price: int) -> int:
+        return max(int(gas_price * self.gas_price_bump) + 1, self._current_gas_price())
+
+    def _replace(self, pending: PendingTx):
+        """Re-broadcast a stuck transaction at the same nonce with a bumped gas price."""
+        with self._lock:
+            bumped_price = self._bumped_gas_price(pending.tx['gasPrice'])
+            tx = {**pending.tx, 'gasPrice': bumped_price}
+            raw_tx = self._sign(tx)
+            try:
+                tx_hash = self.w3.eth.send_raw_transaction(raw_tx)
+            except Exception as e:
+                if not _matches(e, ALREADY_KNOWN_ERRORS):
+                    # Most likely the original was mined in the meantime; try again after another replace_after
+                    print(f"⚠️ Replacement for nonce {pending.nonce} rejected: {e}")
+                    pending.sent_at = time.time()
+                    return
+                tx_hash = self.w3.keccak(raw_tx)
+            pending.tx, pending.raw_transaction = tx, raw_tx
+            pending.tx_hashes.append(tx_hash)
+            pending.sent_at = time.time()
+            print(f"🔁 Replaced stuck tx at nonce {pending.nonce}: {tx_hash.hex()} (gasPrice {bumped_price})")
+
+    def _rebroadcast_if_dropped(self, pending: PendingTx) -> bool:
+        """Fill a nonce gap: re-send the signed bytes if the node no longer knows the tx."""
+        for tx_hash in pending.tx_hashes:
+            try:
+                self.w3.eth.get_transaction(tx_hash)
+                return False
+            except TransactionNotFound:
+                continue
+        try:
+            self.w3.eth.send_raw_transaction(pending.raw_transaction)
+            print(f"🔁 Re-broadcast dropped tx at nonce {pending.nonce}")
+        except Exception as e:
+            print(f"⚠️ Re-broadcast for nonce {pending.nonce} failed: {e}")
+        # Give the node another replace_after before re-broadcasting or replacing again
+        pending.sent_at = time.time()
+        return True
+
+    # --------------------------------------------------------------------------
+    # Receipts
+    # --------------------------------------------------------------------------
+
+    def wait_all(self, pending_txs: List[PendingTx], timeout: float = 120) -> List[Dict[str, Any]]:
+        """Wait for every pending transaction together. Results are returned in input order."""
+        results: Dict[int, Dict[str, Any]] = {}
+        deadline = time.time() + timeout
+
+        while len(results) < len(pending_txs) and time.time() < deadline:
+            for index, pending in enumerate(pending_txs):
+                if index in results:
+                    continue
+                receipt = self._find_receipt(pending)
+                if receipt is not None:
+                    results[index] = self._to_result(pending, receipt)
+                elif time.time() - pending.sent_at > self.replace_after:
+                    if not self._rebroadcast_if_dropped(pending):
+                        self._replace(pending)
+            if len(results) < len(pending_txs):
+                time.sleep(self.poll_interval)
+
+        for index, pending in enumerate(pending_txs):
+            if index not in results:
+                results[index] = {
+                    "success": False,
+                    "tx_hash": pending.tx_hash.hex(),
+                    "error": f"Timed out after {timeout}s waiting for nonce {pending.nonce}"
+                }
+        if any(not r["success"] and "Timed out" in r.get("error", "") for r in results.values()):
+            # Don't keep handing out nonces behind a transaction the node may have dropped
+            self.resync_nonce()
+
+        return [results[index] for index in range(len(pending_txs))]
+
+    def _find_receipt(self, pending: PendingTx):
+        for tx_hash in pending.tx_hashes:
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+            if receipt is not None:
+                return receipt
+        return None
+
+    def _to_result(self, pending: PendingTx, receipt) -> Dict[str, Any]:
+        tx_hash = receipt.transactionHash
+        if receipt.status == 1:
+            print(f"✅ Transaction confirmed{f' ({pending.label})' if pending.label else ''} in block: {receipt.blockNumber}")
+            return {"success": True, "receipt": receipt, "tx_hash": tx_hash.hex()}
+        print(f"❌ Transaction reverted{f' ({pending.label})' if pending.label else ''}: {tx_hash.hex()}")
+        return {"success": False, "receipt": receipt, "tx_hash": tx_hash.hex(), "error": "Transaction reverted"}
+
+    def send_and_wait(self, contract_call, gas: int, value: int = 0, label: str = "", timeout: float = 120) -> Dict[str, Any]:
+        """Submit a single transaction and wait for its receipt."""
+        try:
+            pending = self.submit(contract_call, gas, value=value, label=label)
+        except ContractLogicError as e:
+            print(f"❌ Transaction reverted: {e}")
+            return {"success": False, "error": f"Contract logic error: {e}"}
+        except Exception as e:
+            print(f"❌ Transaction error: {e}")
+            return {"success": False, "error": str(e)}
+        return self.wait_all([pending], timeout=timeout)[0]
+
+    def submit_and_wait_all(self, calls: List[Dict[str, Any]], timeout: float = 120) -> List[Dict[str, Any]]:
+        """
+        Pipeline several transactions: broadcast all of them back-to-back, then wait on all receipts.
+        Each entry is {"call": contract_call, "gas": int, "label": str}. A submission error stops
+        the pipeline; later entries are reported as not sent.
+        """
+        pending_txs, results = [], []
+        for index, entry in enumerate(calls):
+            try:
+                pending_txs.append(self.submit(entry["call"], entry["gas"], value=entry.get("value", 0), label=entry.get("label", "")))
+            except Exception as e:
+                print(f"❌ Failed to submit {entry.get('label', 'transaction')}: {e}")
+                results = [{"success": False, "error": str(e)}]
+                results += [{"success": False, "error": "Not sent: earlier transaction failed"} for _ in calls[index + 1:]]
+                break
+        return self.wait_all(pending_txs, timeout=timeout) + results
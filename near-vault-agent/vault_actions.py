@@ -1,8 +1,6 @@
-import time
 from coinbase_agentkit import ActionProvider, action
 from coinbase_agentkit.wallet import LocalWalletProvider
 from pydantic import BaseModel, Field
-from web3.exceptions import ContractLogicError
 
 # Import our setup from config.py
 from config import (
@@ -13,22 +11,13 @@ from config import (
     usdc_contract,
     VAULT_ADDRESS,
     VRF_STRATEGY_ADDRESS,
-    CHAIN_ID
+    tx_submitter
 )
 
 # --- Helper function for sending transactions ---
-# This remains the same, as it's a reliable way to handle tx logic.
-def send_transaction(tx):
-    try:
-        signed_tx = w3.eth.account.sign_transaction(tx, agent_account.key)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        print(f"⏳ Tx Sent: {tx_hash.hex()}. Waiting...")
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-        print(f"✅ Tx Confirmed in block: {receipt.blockNumber}")
-        return {"success": True, "receipt": receipt}
-    except Exception as e:
-        print(f"❌ Tx Error: {e}")
-        return {"success": False, "error": str(e)}
+# Goes through the shared submitter so the nonce is tracked locally across actions.
+def send_transaction(contract_call, gas):
+    return tx_submitter.send_and_wait(contract_call, gas=gas)
 
 # --- Define Input Schemas for our Actions using Pydantic ---
 class SimulateYieldInput(BaseModel):
@@ -67,10 +56,8 @@ class VaultActionProvider(ActionProvider):
         if liquid_usdc_wei == 0:
             return "No new funds to deposit."
         
-        tx = vault_contract.functions.depositToStrategy(VRF_STRATEGY_ADDRESS, liquid_usdc_wei, b'').build_transaction({
-            'from': agent_account.address, 'nonce': w3.eth.get_transaction_count(agent_account.address), 'gas': 2000000, 'gasPrice': w3.eth.gas_price, 'chainId': CHAIN_ID
-        })
-        result = send_transaction(tx)
+        tx = vault_contract.functions.depositToStrategy(VRF_STRATEGY_ADDRESS, liquid_usdc_wei, b'')
+        result = send_transaction(tx, gas=2000000)
         return f"Successfully deposited {liquid_usdc_wei / 10**6} USDC." if result["success"] else f"Failed: {result['error']}"
 
     @action(
@@ -82,24 +69,19 @@ class VaultActionProvider(ActionProvider):
         print(f"Action: simulate_yield_harvest_and_deposit (Amount: {args.amount_usdc})")
         amount_wei = int(args.amount_usdc * (10**6))
         
-        # This action now performs 3 transactions, which is a great candidate for batching with Cadence in the future.
-        # 1. Mint
-        mint_tx = usdc_contract.functions.mint(agent_account.address, amount_wei).build_transaction({
-            'from': agent_account.address, 'nonce': w3.eth.get_transaction_count(agent_account.address), 'gas': 500000, 'gasPrice': w3.eth.gas_price, 'chainId': CHAIN_ID
-        })
-        if not send_transaction(mint_tx)["success"]: return "Failed to mint mock yield."
-        
-        # 2. Approve
-        approve_tx = usdc_contract.functions.approve(VRF_STRATEGY_ADDRESS, amount_wei).build_transaction({
-            'from': agent_account.address, 'nonce': w3.eth.get_transaction_count(agent_account.address), 'gas': 500000, 'gasPrice': w3.eth.gas_price, 'chainId': CHAIN_ID
-        })
-        if not send_transaction(approve_tx)["success"]: return "Failed to approve yield deposit."
-
-        # 3. Deposit Yield
-        deposit_tx = vrf_strategy_contract.functions.depositYield(amount_wei).build_transaction({
-            'from': agent_account.address, 'nonce': w3.eth.get_transaction_count(agent_account.address), 'gas': 1000000, 'gasPrice': w3.eth.gas_price, 'chainId': CHAIN_ID
-        })
-        return f"Successfully deposited {args.amount_usdc} USDC as prize pool." if send_transaction(deposit_tx)["success"] else "Failed to deposit yield."
+        # This action performs 3 transactions with consecutive nonces - they are broadcast
+        # back-to-back and confirmed together instead of waiting a block between each.
+        mint_result, approve_result, deposit_result = tx_submitter.submit_and_wait_all([
+            # 1. Mint
+            {"call": usdc_contract.functions.mint(agent_account.address, amount_wei), "gas": 500000, "label": "mint"},
+            # 2. Approve
+            {"call": usdc_contract.functions.approve(VRF_STRATEGY_ADDRESS, amount_wei), "gas": 500000, "label": "approve"},
+            # 3. Deposit Yield
+            {"call": vrf_strategy_contract.functions.depositYield(amount_wei), "gas": 1000000, "label": "depositYield"}
+        ])
+        if not mint_result["success"]: return "Failed to mint mock yield."
+        if not approve_result["success"]: return "Failed to approve yield deposit."
+        return f"Successfully deposited {args.amount_usdc} USDC as prize pool." if deposit_result["success"] else "Failed to deposit yield."
 
     @action(
         name="trigger_lottery_draw",
@@ -112,11 +94,9 @@ class VaultActionProvider(ActionProvider):
         if prize_pool_wei == 0:
             return "Cannot trigger draw: Prize pool is zero."
 
-        tx = vault_contract.functions.harvestStrategy(VRF_STRATEGY_ADDRESS, b'').build_transaction({
-            'from': agent_account.address, 'nonce': w3.eth.get_transaction_count(agent_account.address), 'gas': 2000000, 'gasPrice': w3.eth.gas_price, 'chainId': CHAIN_ID
-        })
-        result = send_transaction(tx)
+        tx = vault_contract.functions.harvestStrategy(VRF_STRATEGY_ADDRESS, b'')
+        result = send_transaction(tx, gas=2000000)
         if result["success"]:
-            new_winner = vrf_strategy_contract.functions.lastWinner().call()
+            new_winner = vrf_strategy_contract.functions.lastWinner().call(block_identifier=result["receipt"].blockNumber)
             return f"Lottery draw successful! The new winner is {new_winner}."
         return f"Failed to trigger draw: {result['error']}"
@@ -4,12 +4,15 @@ import time
 import asyncio
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from pydantic import BaseModel
 from langchain_openai import ChatOpenAI
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain_core.prompts import PromptTemplate
 from langchain.tools import tool
+from metrics import PROMETHEUS_CONTENT_TYPE, instrument_tools, llm_callbacks, render as render_metrics
+from abi_registry import load_abi
+from background_loop import BackgroundEventLoop
 
 # NEAR-specific imports
 try:
@@ -31,7 +34,7 @@ except ImportError as e:
 import sys
 sys.path.append('./ml-risk')
 try:
-    from risk_api import RiskAssessmentAPI
+    from risk_api import StrategyRiskAPI
     RISK_MODEL_AVAILABLE = True
     print("✅ Risk model imported successfully")
 except ImportError as e:
@@ -41,7 +44,8 @@ except ImportError as e:
 
 # Import OpenAI LLM planner
 try:
-    from ollama_llm_planner import ai_strategy_advisor  # Uses OpenAI now
+    from ollama_llm_planner import ai_strategy_advisor, strategy_cache  # Uses OpenAI now
+    from http_session import circuit_breaker
     OPENAI_AI_AVAILABLE = True
     print("✅ OpenAI LLM planner imported successfully")
 except ImportError as e:
@@ -79,12 +83,17 @@ ETHEREUM_STRATEGIES = {
 }
 
 # --- NEAR Account Setup ---
-try:
+# One long-lived loop owns the NEAR provider/account so their connections are reused by every
+# tool call (sync tools submit coroutines with near_loop.run, async routes await run_async)
+near_loop = BackgroundEventLoop("near-loop", default_timeout=float(os.getenv("NEAR_CALL_TIMEOUT", 120)))
+
+async def _connect_near():
+    """Create the NEAR provider and account on the NEAR loop."""
     if not AGENT_ACCOUNT_ID or not AGENT_PRIVATE_KEY:
         raise ValueError("AGENT_ACCOUNT_ID and AGENT_PRIVATE_KEY must be set in .env")
     
     # Initialize NEAR connection
-    near_provider = JsonProvider(NEAR_RPC_URL)
+    provider = JsonProvider(NEAR_RPC_URL)
     key_store = InMemoryKeyStore()
     
     # Add agent key to keystore
@@ -92,11 +101,15 @@ try:
     key_store.set_key(NEAR_NETWORK, AGENT_ACCOUNT_ID, agent_key_pair)
     
     # Create NEAR account
-    near_account = Account(
+    account = Account(
         account_id=AGENT_ACCOUNT_ID,
-        provider=near_provider,
+        provider=provider,
         signer=key_store
     )
+    return provider, account
+
+try:
+    near_provider, near_account = near_loop.run(_connect_near())
     
     print(f"🤖 NEAR Agent Account: {AGENT_ACCOUNT_ID}")
     print(f"🌐 NEAR Network: {NEAR_NETWORK}")
@@ -109,40 +122,17 @@ except Exception as e:
 # --- Risk Model Setup ---
 if RISK_MODEL_AVAILABLE:
     try:
-        risk_api = RiskAssessmentAPI("ml-risk/models/anomaly_risk_model.joblib")
-        print("✅ Risk assessment model loaded")
+        risk_api = StrategyRiskAPI("ml-risk/models/anomaly_risk_model.joblib")
+        if not risk_api.registry.model_exists():
+            raise FileNotFoundError(f"model file not found at {risk_api.model_path}")
+        print("✅ Risk assessment model found (loads on first use)")
     except Exception as e:
         risk_api = None
         print(f"⚠️ Risk model loading failed: {e}")
 else:
     risk_api = None
 
-# --- Load ABIs ---
-def load_abi(filename):
-    """Loads a contract ABI from the abi directory with robust path handling."""
-    possible_paths = [
-        os.path.join("abi", filename),
-        os.path.join("..", "abi", filename),
-        os.path.join("../abi", filename),
-        filename
-    ]
-    
-    for path in possible_paths:
-        try:
-            if os.path.exists(path):
-                with open(path, "r") as f:
-                    abi_data = json.load(f)
-                    if isinstance(abi_data, dict) and "abi" in abi_data:
-                        return abi_data["abi"]
-                    elif isinstance(abi_data, list):
-                        return abi_data
-                    else:
-                        raise ValueError(f"Invalid ABI format in {filename}")
-        except (FileNotFoundError, KeyError, json.JSONDecodeError):
-            continue
-    
-    raise FileNotFoundError(f"Could not find {filename} in any of these locations: {possible_paths}")
-
+# --- Load ABIs (shared precompiled registry, see abi_registry.py) ---
 try:
     vault_abi = load_abi("Vault.json")
     near_vrf_strategy_abi = load_abi("NearVrfYieldStrategy.json")  # Your provided ABI
@@ -264,17 +254,9 @@ def get_enhanced_near_protocol_status() -> str:
         except Exception as e:
             return f"Error getting enhanced NEAR protocol status: {e}"
     
-    # Run async function in event loop
+    # Runs on the persistent NEAR loop (warm provider connections)
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # If already in an async context, create a new task
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _get_status())
-                return future.result()
-        else:
-            return asyncio.run(_get_status())
+        return near_loop.run(_get_status())
     except Exception as e:
         return f"Error running async status check: {e}"
 
@@ -408,15 +390,9 @@ def deploy_to_near_strategy_with_risk_check(strategy_name: str, amount: float =
         except Exception as e:
             return f"❌ Error in NEAR risk-checked deployment: {e}"
     
+    # Runs on the persistent NEAR loop (warm provider connections)
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _deploy())
-                return future.result()
-        else:
-            return asyncio.run(_deploy())
+        return near_loop.run(_deploy())
     except Exception as e:
         return f"Error running async deployment: {e}"
 
@@ -487,15 +463,9 @@ async def simulate_near_yield_harvest_and_deposit(amount_usdc: float) -> str:
 @tool
 def simulate_near_yield_harvest_and_deposit_sync(amount_usdc: float) -> str:
     """Synchronous wrapper for NEAR yield harvest simulation."""
+    # Runs on the persistent NEAR loop (warm provider connections)
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, simulate_near_yield_harvest_and_deposit(amount_usdc))
-                return future.result()
-        else:
-            return asyncio.run(simulate_near_yield_harvest_and_deposit(amount_usdc))
+        return near_loop.run(simulate_near_yield_harvest_and_deposit(amount_usdc))
     except Exception as e:
         return f"Error running async NEAR yield simulation: {e}"
 
@@ -535,15 +505,9 @@ def trigger_near_lottery_draw() -> str:
         except Exception as e:
             return f"Error triggering NEAR lottery draw: {e}"
     
+    # Runs on the persistent NEAR loop (warm provider connections)
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _trigger())
-                return future.result()
-        else:
-            return asyncio.run(_trigger())
+        return near_loop.run(_trigger())
     except Exception as e:
         return f"Error running async NEAR lottery trigger: {e}"
 
@@ -578,32 +542,35 @@ def emergency_near_risk_assessment() -> str:
                 })
                 risk_summary["total_at_risk"] += prize_pool_formatted
             
-            # Check other NEAR strategies
-            for strategy_name, address in NEAR_STRATEGIES.items():
-                if address and risk_api:
-                    try:
-                        risk_score = risk_api.assess_strategy_risk(address)
-                        balance = 0.0  # Would need strategy contract calls to get actual balance
-                        
-                        strategy_info = {
-                            "name": strategy_name,
-                            "address": address,
-                            "balance": balance,
-                            "risk_score": risk_score,
-                            "network": "NEAR"
-                        }
-                        
-                        if risk_score > 0.7:
-                            risk_summary["high_risk_strategies"].append(strategy_info)
-                            risk_summary["recommendations"].append(f"URGENT: Exit NEAR {strategy_name}")
-                        elif risk_score > 0.5:
-                            risk_summary["medium_risk_strategies"].append(strategy_info)
-                            risk_summary["recommendations"].append(f"MONITOR: Watch NEAR {strategy_name}")
-                        else:
-                            risk_summary["low_risk_strategies"].append(strategy_info)
-                            
-                    except Exception as e:
-                        print(f"Risk check failed for NEAR {strategy_name}: {e}")
+            # Check other NEAR strategies - scored together in one batched model pass
+            deployed = {name: address for name, address in NEAR_STRATEGIES.items() if address}
+            strategy_risks = {}
+            if deployed and risk_api:
+                try:
+                    batch = risk_api.assess_many(list(deployed.values()))
+                    strategy_risks = dict(zip(deployed, batch["risk_scores"].tolist()))
+                except Exception as e:
+                    print(f"Risk check failed for NEAR strategies: {e}")
+            
+            for strategy_name, risk_score in strategy_risks.items():
+                balance = 0.0  # Would need strategy contract calls to get actual balance
+                
+                strategy_info = {
+                    "name": strategy_name,
+                    "address": deployed[strategy_name],
+                    "balance": balance,
+                    "risk_score": risk_score,
+                    "network": "NEAR"
+                }
+                
+                if risk_score > 0.7:
+                    risk_summary["high_risk_strategies"].append(strategy_info)
+                    risk_summary["recommendations"].append(f"URGENT: Exit NEAR {strategy_name}")
+                elif risk_score > 0.5:
+                    risk_summary["medium_risk_strategies"].append(strategy_info)
+                    risk_summary["recommendations"].append(f"MONITOR: Watch NEAR {strategy_name}")
+                else:
+                    risk_summary["low_risk_strategies"].append(strategy_info)
             
             total_strategies = len(risk_summary["high_risk_strategies"]) + \
                               len(risk_summary["medium_risk_strategies"]) + \
@@ -627,15 +594,9 @@ def emergency_near_risk_assessment() -> str:
         except Exception as e:
             return f"Emergency NEAR risk assessment failed: {e}"
     
+    # Runs on the persistent NEAR loop (warm provider connections)
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _assess())
-                return future.result()
-        else:
-            return asyncio.run(_assess())
+        return near_loop.run(_assess())
     except Exception as e:
         return f"Error running async NEAR risk assessment: {e}"
 
@@ -772,7 +733,10 @@ Thought: {agent_scratchpad}
 prompt = PromptTemplate.from_template(enhanced_near_prompt_template)
 
 # Initialize enhanced LLM and Agent
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, api_key=OPENAI_API_KEY)
+# Latency / error histograms for every tool, served on /metrics
+instrument_tools(tools)
+
+llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, api_key=OPENAI_API_KEY, callbacks=llm_callbacks("agent"))
 react_agent = create_react_agent(llm, tools, prompt)
 agent_executor = AgentExecutor(
     agent=react_agent, 
@@ -802,6 +766,11 @@ class RiskAssessmentRequest(BaseModel):
 class YieldRequest(BaseModel):
     amount_usdc: float
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the NEAR loop thread."""
+    near_loop.stop()
+
 @app.post("/invoke-agent")
 async def invoke_agent(request: AgentRequest):
     """Enhanced NEAR agent endpoint with risk management and AI strategy advisor."""
@@ -924,16 +893,23 @@ def read_root():
         ]
     }
 
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint: tool, RPC, provider and LLM latency histograms and error counts."""
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.get("/health")
 async def health_check():
     """Comprehensive NEAR health check endpoint."""
     try:
-        # Test NEAR connection and account
-        account_balance = await near_account.get_account_balance()
-        
-        # Test contract connectivity
-        vault_balance = await call_near_view_method(VAULT_ADDRESS, "get_balance", {})
-        prize_pool = await call_near_view_method(NEAR_VRF_STRATEGY_ADDRESS, "getBalance", {})
+        # Test NEAR connection, account and contract connectivity (on the loop that owns the provider)
+        async def _check_near():
+            return await asyncio.gather(
+                near_account.get_account_balance(),
+                call_near_view_method(VAULT_ADDRESS, "get_balance", {}),
+                call_near_view_method(NEAR_VRF_STRATEGY_ADDRESS, "getBalance", {})
+            )
+        account_balance, vault_balance, prize_pool = await near_loop.run_async(_check_near())
         
         health_status = {
             "status": "healthy",
@@ -947,6 +923,9 @@ async def health_check():
             "prize_pool_usdc": float(prize_pool or 0) / 10**6,
             "risk_model_loaded": risk_api is not None,
             "openai_ai_available": OPENAI_AI_AVAILABLE,
+            "llm_cache": strategy_cache.stats() if OPENAI_AI_AVAILABLE else None,
+            "openai_circuit": circuit_breaker("openai").stats() if OPENAI_AI_AVAILABLE else None,
+            "near_loop": near_loop.stats(),
             "contracts_accessible": True
         }
         
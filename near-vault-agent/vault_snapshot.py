@@ -0,0 +1,218 @@
+"""
+Multicall-batched snapshot reader for the Aurora Multi-Strategy Vault.
+
+Aggregates every vault, USDC and strategy view call into a single Multicall3
+`aggregate3` eth_call so all values come from the same block.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from eth_abi.exceptions import DecodingError
+from web3 import Web3
+from web3.exceptions import BadFunctionCallOutput
+
+from abi_registry import compile_abi
+
+# Multicall3 is deployed at the same address on Aurora mainnet/testnet and most EVM chains
+MULTICALL3_ADDRESS = os.getenv("MULTICALL3_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11")
+
+MULTICALL3_ABI = [
+    {
+        "name": "aggregate3",
+        "type": "function",
+        "stateMutability": "payable",
+        "inputs": [{
+            "name": "calls",
+            "type": "tuple[]",
+            "components": [
+                {"name": "target", "type": "address"},
+                {"name": "allowFailure", "type": "bool"},
+                {"name": "callData", "type": "bytes"}
+            ]
+        }],
+        "outputs": [{
+            "name": "returnData",
+            "type": "tuple[]",
+            "components": [
+                {"name": "success", "type": "bool"},
+                {"name": "returnData", "type": "bytes"}
+            ]
+        }]
+    },
+    {"name": "getBlockNumber", "type": "function", "inputs": [], "outputs": [{"name": "blockNumber", "type": "uint256"}], "stateMutability": "view"},
+    {"name": "getEthBalance", "type": "function", "inputs": [{"name": "addr", "type": "address"}], "outputs": [{"name": "balance", "type": "uint256"}], "stateMutability": "view"}
+]
+
+USDC_DECIMALS = 10**6
+SHARE_DECIMALS = 10**18
+
+
+@dataclass(frozen=True)
+class VaultSnapshot:
+    """Point-in-time view of the vault, pinned to a single block."""
+    block_number: int
+    total_assets: int
+    total_supply: int
+    vault_idle: int
+    agent_shares: int
+    agent_usdc: int
+    agent_eth_balance: int
+    strategy_balances: Dict[str, int] = field(default_factory=dict)
+    failed_reads: Tuple[str, ...] = ()
+    batched: bool = True
+
+    @property
+    def total_usdc(self) -> float:
+        return self.total_assets / USDC_DECIMALS
+
+    @property
+    def idle_usdc(self) -> float:
+        return self.vault_idle / USDC_DECIMALS
+
+    @property
+    def deployed_usdc(self) -> float:
+        return self.total_usdc - self.idle_usdc
+
+    @property
+    def total_shares(self) -> float:
+        return self.total_supply / SHARE_DECIMALS
+
+    @property
+    def share_price(self) -> float:
+        return self.total_assets / self.total_supply if self.total_supply > 0 else 1
+
+    @property
+    def strategy_total_usdc(self) -> float:
+        return sum(self.strategy_balances.values()) / USDC_DECIMALS
+
+    def strategy_usdc(self, key: str) -> float:
+        return self.strategy_balances.get(key, 0) / USDC_DECIMALS
+
+
+class VaultSnapshotReader:
+    """Reads a `VaultSnapshot` with one Multicall3 round-trip (sequential fallback)."""
+
+    def __init__(self, w3: Web3, vault_contract, usdc_contract,
+                 strategy_contracts: Union[Dict[str, Any], Callable[[], Dict[str, Any]]],
+                 account_address: str, multicall_address: str = MULTICALL3_ADDRESS):
+        self.w3 = w3
+        self.vault_contract = vault_contract
+        self.usdc_contract = usdc_contract
+        self.strategy_contracts = strategy_contracts
+        self.account_address = account_address
+        self.multicall = w3.eth.contract(address=Web3.to_checksum_address(multicall_address), abi=MULTICALL3_ABI)
+        self.multicall_available = True
+        # Calldata never changes for a (contract, function, args) triple; encode each once
+        self._calldata: Dict[Tuple[str, str, tuple], bytes] = {}
+
+    def read(self) -> VaultSnapshot:
+        """Read every view call the status/health/rebalance paths need."""
+        calls = self._build_calls()
+
+        if self.multicall_available:
+            try:
+                return self._to_snapshot(*self._read_multicall(calls), batched=True)
+            except Exception as e:
+                if self._multicall_unusable(e):
+                    # Multicall3 missing on this chain (e.g. a local dev node) - don't retry every request
+                    print(f"⚠️ Multicall3 unavailable, falling back to sequential reads: {e}")
+                    self.multicall_available = False
+                else:
+                    # Timeouts / 5xx: read sequentially this time, batch again on the next read
+                    print(f"⚠️ Multicall3 read failed, reading sequentially this time: {e}")
+
+        return self._to_snapshot(*self._read_sequential(calls), batched=False)
+
+    def _multicall_unusable(self, error: Exception) -> bool:
+        """True when batching can never work here: no code at the Multicall3 address or undecodable output."""
+        if isinstance(error, (BadFunctionCallOutput, DecodingError)):
+            return True
+        try:
+            return len(self.w3.eth.get_code(self.multicall.address)) == 0
+        except Exception:
+            return False
+
+    def _build_calls(self) -> List[Tuple[str, Any, str, list]]:
+        """(field, contract, function name, args) for every value in the snapshot."""
+        calls = [
+            ("agent_eth_balance", self.multicall, "getEthBalance", [self.account_address]),
+            ("total_assets", self.vault_contract, "totalAssets", []),
+            ("total_supply", self.vault_contract, "totalSupply", []),
+            ("agent_shares", self.vault_contract, "balanceOf", [self.account_address]),
+            ("vault_idle", self.usdc_contract, "balanceOf", [self.vault_contract.address]),
+            ("agent_usdc", self.usdc_contract, "balanceOf", [self.account_address]),
+        ]
+        # A callable (e.g. a strategy registry) is re-read on every snapshot so new strategies show up
+        strategy_contracts = self.strategy_contracts() if callable(self.strategy_contracts) else self.strategy_contracts
+        for key, contract in strategy_contracts.items():
+            calls.append((f"strategy:{key}", contract, "getBalance", []))
+        return calls
+
+    def _read_multicall(self, calls) -> Tuple[int, Dict[str, Optional[Any]]]:
+        aggregate = [(self.multicall.address, False, self._encoded(self.multicall, "getBlockNumber", []))]
+        aggregate += [(contract.address, True, self._encoded(contract, fn_name, args)) for _, contract, fn_name, args in calls]
+
+        results = self.multicall.functions.aggregate3(aggregate).call()
+
+        block_number = self.w3.codec.decode(["uint256"], results[0][1])[0]
+        values = {}
+        for (name, contract, fn_name, _), (success, data) in zip(calls, results[1:]):
+            if not success or not data:
+                values[name] = None
+                continue
+            decoded = self.w3.codec.decode(_output_types(contract, fn_name), data)
+            values[name] = decoded[0] if len(decoded) == 1 else decoded
+        return block_number, values
+
+    def _encoded(self, contract, fn_name: str, args: list) -> bytes:
+        key = (contract.address, fn_name, tuple(args))
+        data = self._calldata.get(key)
+        if data is None:
+            data = self._calldata[key] = _encode_call(contract, fn_name, args)
+        return data
+
+    def _read_sequential(self, calls) -> Tuple[int, Dict[str, Optional[Any]]]:
+        block_number = self.w3.eth.block_number
+        values = {}
+        for name, contract, fn_name, args in calls:
+            try:
+                if name == "agent_eth_balance":
+                    values[name] = self.w3.eth.get_balance(args[0], block_identifier=block_number)
+                else:
+                    values[name] = contract.get_function_by_name(fn_name)(*args).call(block_identifier=block_number)
+            except Exception as e:
+                print(f"⚠️ Error reading {name}: {e}")
+                values[name] = None
+        return block_number, values
+
+    def _to_snapshot(self, block_number: int, values: Dict[str, Optional[Any]], batched: bool) -> VaultSnapshot:
+        failed = tuple(name for name, value in values.items() if value is None)
+        if "total_assets" in failed:
+            raise RuntimeError(f"Vault totalAssets() unreadable at block {block_number}")
+
+        return VaultSnapshot(
+            block_number=block_number,
+            total_assets=values["total_assets"],
+            total_supply=values["total_supply"] or 0,
+            vault_idle=values["vault_idle"] or 0,
+            agent_shares=values["agent_shares"] or 0,
+            agent_usdc=values["agent_usdc"] or 0,
+            agent_eth_balance=values["agent_eth_balance"] or 0,
+            strategy_balances={
+                name.split(":", 1)[1]: value or 0
+                for name, value in values.items() if name.startswith("strategy:")
+            },
+            failed_reads=failed,
+            batched=batched
+        )
+
+
+def _encode_call(contract, fn_name: str, args: list) -> bytes:
+    """ABI-encode calldata from the registry's precomputed selector and input types."""
+    return compile_abi(contract.abi).function(fn_name).encode_call(contract.w3.codec, args)
+
+
+def _output_types(contract, fn_name: str) -> List[str]:
+    return compile_abi(contract.abi).function(fn_name).output_types